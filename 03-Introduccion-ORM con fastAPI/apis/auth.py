@@ -4,21 +4,38 @@ API de Autenticación - Endpoints para login y autenticación
 
 from uuid import UUID
 
-from crud.usuario_crud import UsuarioCRUD
-from database.config import get_db
+from auth.tokens import (
+    TIPO_REFRESCO,
+    SesionToken,
+    TokenInvalido,
+    firmador_tokens,
+    obtener_sesion,
+)
+from crud.usuario_crud import UsuarioCRUDAsync
+from database.config import get_async_db
 from fastapi import APIRouter, Depends, HTTPException, status
-from schemas import RespuestaAPI, UsuarioLogin, UsuarioResponse
-from sqlalchemy.orm import Session
+from schemas import RefrescoToken, RespuestaAPI, UsuarioLogin, loginResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/auth", tags=["autenticación"])
 
 
-@router.post("/login", response_model=UsuarioResponse)
-async def login(login_data: UsuarioLogin, db: Session = Depends(get_db)):
-    """Autenticar un usuario con nombre de usuario/email y contraseña."""
+def _respuesta_login(usuario) -> loginResponse:
+    """Emitir el par de tokens de acceso y refresco para un usuario"""
+    return loginResponse(
+        clave=firmador_tokens.emitir_acceso(usuario),
+        nombre_usuario=usuario,
+        refresco=firmador_tokens.emitir_refresco(usuario),
+        expira_en=firmador_tokens.acceso_segundos,
+    )
+
+
+@router.post("/login", response_model=loginResponse)
+async def login(login_data: UsuarioLogin, db: AsyncSession = Depends(get_async_db)):
+    """Autenticar un usuario y emitir sus tokens de acceso y refresco."""
     try:
-        usuario_crud = UsuarioCRUD(db)
-        usuario = usuario_crud.autenticar_usuario(
+        usuario_crud = UsuarioCRUDAsync(db)
+        usuario = await usuario_crud.autenticar_usuario(
             login_data.nombre_usuario, login_data.contraseña
         )
 
@@ -28,7 +45,7 @@ async def login(login_data: UsuarioLogin, db: Session = Depends(get_db)):
                 detail="Credenciales incorrectas o usuario inactivo",
             )
 
-        return usuario
+        return _respuesta_login(usuario)
     except HTTPException:
         raise
     except Exception as e:
@@ -38,14 +55,66 @@ async def login(login_data: UsuarioLogin, db: Session = Depends(get_db)):
         )
 
 
+@router.post("/refrescar", response_model=loginResponse)
+async def refrescar_token(
+    datos: RefrescoToken, db: AsyncSession = Depends(get_async_db)
+):
+    """Cambiar un token de refresco por un nuevo par de tokens, sin contraseña."""
+    try:
+        reclamos = firmador_tokens.verificar(datos.refresco, TIPO_REFRESCO)
+    except TokenInvalido as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+    try:
+        usuario_crud = UsuarioCRUDAsync(db)
+        usuario = await usuario_crud.obtener_usuario(UUID(reclamos["sub"]))
+
+        # Una sola lectura por clave primaria: el usuario debe seguir activo y
+        # con la misma contraseña que cuando se emitió el token
+        if (
+            not usuario
+            or not usuario.activo
+            or firmador_tokens.huella_contraseña(usuario.contraseña_hash)
+            != reclamos.get("pwd")
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="El token de refresco ya no es válido",
+            )
+
+        return _respuesta_login(usuario)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al refrescar el token: {str(e)}",
+        )
+
+
+@router.get("/sesion", response_model=RespuestaAPI)
+async def obtener_sesion_actual(sesion: SesionToken = Depends(obtener_sesion)):
+    """Obtener los datos del token de acceso enviado (sin consultar la base de datos)."""
+    return RespuestaAPI(
+        mensaje="Token de acceso válido",
+        exito=True,
+        datos={
+            "usuario_id": str(sesion.usuario_id),
+            "nombre_usuario": sesion.nombre_usuario,
+            "es_admin": sesion.es_admin,
+            "expira": sesion.expira,
+        },
+    )
+
+
 @router.post("/crear-admin", response_model=RespuestaAPI)
-async def crear_usuario_admin(db: Session = Depends(get_db)):
+async def crear_usuario_admin(db: AsyncSession = Depends(get_async_db)):
     """Crear usuario administrador por defecto."""
     try:
-        usuario_crud = UsuarioCRUD(db)
+        usuario_crud = UsuarioCRUDAsync(db)
 
         # Verificar si ya existe un admin por defecto
-        admin_existente = usuario_crud.obtener_admin_por_defecto()
+        admin_existente = await usuario_crud.obtener_admin_por_defecto()
         if admin_existente:
             return RespuestaAPI(
                 mensaje="Ya existe un usuario administrador por defecto",
@@ -58,7 +127,7 @@ async def crear_usuario_admin(db: Session = Depends(get_db)):
 
         contraseña_admin = PasswordManager.generate_secure_password(12)
 
-        admin = usuario_crud.crear_usuario(
+        admin = await usuario_crud.crear_usuario(
             nombre="Administrador del Sistema",
             nombre_usuario="admin",
             email="admin@system.com",
@@ -85,11 +154,11 @@ async def crear_usuario_admin(db: Session = Depends(get_db)):
 
 
 @router.get("/verificar/{usuario_id}", response_model=RespuestaAPI)
-async def verificar_usuario(usuario_id: UUID, db: Session = Depends(get_db)):
+async def verificar_usuario(usuario_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Verificar si un usuario existe y está activo."""
     try:
-        usuario_crud = UsuarioCRUD(db)
-        usuario = usuario_crud.obtener_usuario(usuario_id)
+        usuario_crud = UsuarioCRUDAsync(db)
+        usuario = await usuario_crud.obtener_usuario(usuario_id)
 
         if not usuario:
             raise HTTPException(
@@ -2,27 +2,81 @@
 API de Categorías - Endpoints para gestión de categorías
 """
 
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from crud.categoria_crud import CategoriaCRUD
-from database.config import get_db
-from fastapi import APIRouter, Depends, HTTPException, status
-from schemas import CategoriaCreate, CategoriaResponse, CategoriaUpdate, RespuestaAPI
-from sqlalchemy.orm import Session
+from apis.condicionales import (
+    cabeceras_validacion,
+    no_modificado,
+    respuesta_entidad,
+    respuesta_no_modificada,
+    validador_coleccion,
+)
+from apis.serializacion import respuesta_json
+from crud.categoria_crud import (
+    MAX_MUESTRAS_RESUMEN,
+    MUESTRAS_RESUMEN,
+    CategoriaCRUDAsync,
+)
+from crud.paginacion import CABECERA_SIGUIENTE_CURSOR, MAX_TAMANO_PAGINA
+from crud.producto_crud import ProductoCRUDAsync
+from database.config import get_async_db
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from schemas import (
+    CategoriaCreate,
+    CategoriaResponse,
+    CategoriaResumen,
+    CategoriaUpdate,
+    RespuestaAPI,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/categorias", tags=["categorias"])
 
 
 @router.get("/", response_model=List[CategoriaResponse])
 async def obtener_categorias(
-    skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_TAMANO_PAGINA, ge=1, le=MAX_TAMANO_PAGINA),
+    skip: int = Query(0, ge=0, deprecated=True),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Obtener todas las categorías con paginación."""
+    """
+    Obtener categorías paginadas por cursor.
+
+    Si hay más resultados, la cabecera X-Next-Cursor trae el cursor que se
+    envía como ?cursor= para pedir la página siguiente. Con If-None-Match
+    o If-Modified-Since se responde 304 si las categorías no cambiaron.
+    """
     try:
-        categoria_crud = CategoriaCRUD(db)
-        categorias = categoria_crud.obtener_categorias(skip=skip, limit=limit)
+        categoria_crud = CategoriaCRUDAsync(db)
+        etag, modificado = validador_coleccion(
+            request, await categoria_crud.version_categorias()
+        )
+        if no_modificado(request, etag, modificado):
+            return respuesta_no_modificada(etag, modificado)
+        response.headers.update(cabeceras_validacion(etag, modificado))
+        if skip:
+            # Paginación por desplazamiento: obsoleta, se mantiene por compatibilidad
+            return await categoria_crud.obtener_categorias(skip=skip, limit=limit)
+        categorias, siguiente_cursor = await categoria_crud.obtener_categorias_pagina(
+            cursor=cursor, limit=limit
+        )
+        if siguiente_cursor:
+            response.headers[CABECERA_SIGUIENTE_CURSOR] = siguiente_cursor
         return categorias
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -30,17 +84,61 @@ async def obtener_categorias(
         )
 
 
+@router.get("/resumen", response_model=List[CategoriaResumen])
+async def obtener_resumen_categorias(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_TAMANO_PAGINA, ge=1, le=MAX_TAMANO_PAGINA),
+    muestras: int = Query(MUESTRAS_RESUMEN, ge=0, le=MAX_MUESTRAS_RESUMEN),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Obtener categorías con su número de productos, stock total y los
+    productos más recientes de cada una.
+
+    Una sola consulta por página (funciones de ventana por categoría),
+    paginada por cursor como GET /categorias/. El ETag cambia con cualquier
+    cambio en categorías o productos.
+    """
+    try:
+        categoria_crud = CategoriaCRUDAsync(db)
+        etag, modificado = validador_coleccion(
+            request,
+            await categoria_crud.version_categorias(),
+            await ProductoCRUDAsync(db).version_productos(),
+        )
+        if no_modificado(request, etag, modificado):
+            return respuesta_no_modificada(etag, modificado)
+        response.headers.update(cabeceras_validacion(etag, modificado))
+        categorias, siguiente_cursor = await categoria_crud.obtener_resumen_categorias(
+            cursor=cursor, limit=limit, muestras=muestras
+        )
+        if siguiente_cursor:
+            response.headers[CABECERA_SIGUIENTE_CURSOR] = siguiente_cursor
+        return respuesta_json(categorias, response)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener el resumen de categorías: {str(e)}",
+        )
+
+
 @router.get("/{categoria_id}", response_model=CategoriaResponse)
-async def obtener_categoria(categoria_id: UUID, db: Session = Depends(get_db)):
-    """Obtener una categoría por ID."""
+async def obtener_categoria(
+    categoria_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener una categoría por ID (304 si el ETag del cliente sigue vigente)."""
     try:
-        categoria_crud = CategoriaCRUD(db)
-        categoria = categoria_crud.obtener_categoria(categoria_id)
+        categoria_crud = CategoriaCRUDAsync(db)
+        categoria = await categoria_crud.obtener_categoria(categoria_id)
         if not categoria:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Categoría no encontrada"
             )
-        return categoria
+        return respuesta_entidad(request, CategoriaResponse, categoria)
     except HTTPException:
         raise
     except Exception as e:
@@ -51,16 +149,18 @@ async def obtener_categoria(categoria_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/nombre/{nombre}", response_model=CategoriaResponse)
-async def obtener_categoria_por_nombre(nombre: str, db: Session = Depends(get_db)):
-    """Obtener una categoría por nombre."""
+async def obtener_categoria_por_nombre(
+    nombre: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener una categoría por nombre (304 si el ETag del cliente sigue vigente)."""
     try:
-        categoria_crud = CategoriaCRUD(db)
-        categoria = categoria_crud.obtener_categoria_por_nombre(nombre)
+        categoria_crud = CategoriaCRUDAsync(db)
+        categoria = await categoria_crud.obtener_categoria_por_nombre(nombre)
         if not categoria:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Categoría no encontrada"
             )
-        return categoria
+        return respuesta_entidad(request, CategoriaResponse, categoria)
     except HTTPException:
         raise
     except Exception as e:
@@ -72,12 +172,12 @@ async def obtener_categoria_por_nombre(nombre: str, db: Session = Depends(get_db
 
 @router.post("/", response_model=CategoriaResponse, status_code=status.HTTP_201_CREATED)
 async def crear_categoria(
-    categoria_data: CategoriaCreate, db: Session = Depends(get_db)
+    categoria_data: CategoriaCreate, db: AsyncSession = Depends(get_async_db)
 ):
     """Crear una nueva categoría."""
     try:
-        categoria_crud = CategoriaCRUD(db)
-        categoria = categoria_crud.crear_categoria(
+        categoria_crud = CategoriaCRUDAsync(db)
+        categoria = await categoria_crud.crear_categoria(
             nombre=categoria_data.nombre,
             descripcion=categoria_data.descripcion,
         )
@@ -93,31 +193,32 @@ async def crear_categoria(
 
 @router.put("/{categoria_id}", response_model=CategoriaResponse)
 async def actualizar_categoria(
-    categoria_id: UUID, categoria_data: CategoriaUpdate, db: Session = Depends(get_db)
+    categoria_id: UUID,
+    categoria_data: CategoriaUpdate,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Actualizar una categoría existente."""
     try:
-        categoria_crud = CategoriaCRUD(db)
-
-        # Verificar que la categoría existe
-        categoria_existente = categoria_crud.obtener_categoria(categoria_id)
-        if not categoria_existente:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Categoría no encontrada"
-            )
+        categoria_crud = CategoriaCRUDAsync(db)
 
         # Filtrar campos None para actualización
         campos_actualizacion = {
             k: v for k, v in categoria_data.dict().items() if v is not None
         }
 
+        # Sin cambios solo se consulta; si hay cambios, el CRUD ya verifica
+        # que la categoría existe (None) sin una consulta previa duplicada
         if not campos_actualizacion:
-            return categoria_existente
-
-        categoria_actualizada = categoria_crud.actualizar_categoria(
-            categoria_id, **campos_actualizacion
-        )
-        return categoria_actualizada
+            categoria = await categoria_crud.obtener_categoria(categoria_id)
+        else:
+            categoria = await categoria_crud.actualizar_categoria(
+                categoria_id, **campos_actualizacion
+            )
+        if not categoria:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Categoría no encontrada"
+            )
+        return categoria
     except HTTPException:
         raise
     except ValueError as e:
@@ -130,26 +231,20 @@ async def actualizar_categoria(
 
 
 @router.delete("/{categoria_id}", response_model=RespuestaAPI)
-async def eliminar_categoria(categoria_id: UUID, db: Session = Depends(get_db)):
+async def eliminar_categoria(
+    categoria_id: UUID, db: AsyncSession = Depends(get_async_db)
+):
     """Eliminar una categoría."""
     try:
-        categoria_crud = CategoriaCRUD(db)
+        categoria_crud = CategoriaCRUDAsync(db)
 
-        # Verificar que la categoría existe
-        categoria_existente = categoria_crud.obtener_categoria(categoria_id)
-        if not categoria_existente:
+        # eliminar_categoria devuelve False si la categoría no existe
+        eliminada = await categoria_crud.eliminar_categoria(categoria_id)
+        if not eliminada:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Categoría no encontrada"
             )
-
-        eliminada = categoria_crud.eliminar_categoria(categoria_id)
-        if eliminada:
-            return RespuestaAPI(mensaje="Categoría eliminada exitosamente", exito=True)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al eliminar categoría",
-            )
+        return RespuestaAPI(mensaje="Categoría eliminada exitosamente", exito=True)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,160 @@
+"""
+Peticiones GET condicionales: ETag, Last-Modified y 304 Not Modified
+
+- Recursos individuales: el ETag es el hash del JSON de la respuesta y
+  Last-Modified es fecha_edicion (o fecha_creacion si nunca se editó).
+- Colecciones: el validador se calcula con una consulta mínima (número de
+  filas y última modificación) más la ruta y los parámetros de la petición,
+  así que una lista sin cambios responde 304 sin leer ni serializar filas.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+TIPO_JSON = "application/json"
+
+# El cliente puede guardar la respuesta pero debe revalidarla en cada uso
+CACHE_CONTROL = "no-cache"
+
+
+def _etiqueta(datos: bytes) -> str:
+    return f'"{hashlib.blake2b(datos, digest_size=16).hexdigest()}"'
+
+
+def _utc(fecha: Optional[datetime]) -> Optional[datetime]:
+    """Normalizar a UTC sin microsegundos (resolución de las cabeceras HTTP)"""
+    if fecha is None:
+        return None
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def ultima_modificacion(entidad) -> Optional[datetime]:
+    """Fecha de la última edición de una entidad, o la de creación"""
+    return entidad.fecha_edicion or entidad.fecha_creacion
+
+
+def cabeceras_validacion(etag: str, modificado: Optional[datetime]) -> Dict[str, str]:
+    """Cabeceras ETag, Last-Modified y Cache-Control de una respuesta"""
+    cabeceras = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    modificado = _utc(modificado)
+    if modificado is not None:
+        cabeceras["Last-Modified"] = format_datetime(modificado, usegmt=True)
+    return cabeceras
+
+
+def no_modificado(request: Request, etag: str, modificado: Optional[datetime]) -> bool:
+    """
+    Evaluar If-None-Match e If-Modified-Since
+
+    Si llega If-None-Match se ignora If-Modified-Since (RFC 9110, 13.2.2).
+
+    Args:
+        request: Petición recibida
+        etag: ETag actual del recurso
+        modificado: Fecha de última modificación del recurso
+
+    Returns:
+        True si el cliente ya tiene la versión actual (responder 304)
+    """
+    si_no_coincide = request.headers.get("if-none-match")
+    if si_no_coincide is not None:
+        etiquetas = {valor.strip() for valor in si_no_coincide.split(",")}
+        if "*" in etiquetas:
+            return True
+        return etag in {e[2:] if e.startswith("W/") else e for e in etiquetas}
+
+    si_modificado_desde = request.headers.get("if-modified-since")
+    modificado = _utc(modificado)
+    if si_modificado_desde is None or modificado is None:
+        return False
+    try:
+        fecha_cliente = parsedate_to_datetime(si_modificado_desde)
+    except (TypeError, ValueError):
+        return False
+    if fecha_cliente.tzinfo is None:
+        return False
+    return modificado <= fecha_cliente
+
+
+def respuesta_no_modificada(etag: str, modificado: Optional[datetime]) -> Response:
+    """Respuesta 304 sin cuerpo con los mismos validadores"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=cabeceras_validacion(etag, modificado),
+    )
+
+
+def respuesta_entidad(request: Request, modelo: type, entidad) -> Response:
+    """
+    Serializar una entidad con su ETag, o responder 304 si no cambió
+
+    Args:
+        request: Petición recibida
+        modelo: Esquema Pydantic de la respuesta (p. ej. ProductoResponse)
+        entidad: Entidad ORM a devolver
+
+    Returns:
+        Respuesta 200 con el JSON o 304 sin cuerpo
+    """
+    contenido = modelo.model_validate(entidad).model_dump_json().encode("utf-8")
+    return respuesta_contenido(request, contenido, ultima_modificacion(entidad))
+
+
+def respuesta_contenido(
+    request: Request, contenido: bytes, modificado: Optional[datetime]
+) -> Response:
+    """
+    Responder un cuerpo JSON ya codificado con su ETag, o 304 si no cambió
+
+    Args:
+        request: Petición recibida
+        contenido: Cuerpo JSON de la respuesta
+        modificado: Fecha de última modificación del recurso
+
+    Returns:
+        Respuesta 200 con el JSON o 304 sin cuerpo
+    """
+    etag = _etiqueta(contenido)
+    if no_modificado(request, etag, modificado):
+        return respuesta_no_modificada(etag, modificado)
+    return Response(
+        content=contenido,
+        media_type=TIPO_JSON,
+        headers=cabeceras_validacion(etag, modificado),
+    )
+
+
+def validador_coleccion(
+    request: Request,
+    version: Tuple[int, Optional[datetime]],
+    *relacionadas: Tuple[int, Optional[datetime]],
+) -> Tuple[str, Optional[datetime]]:
+    """
+    ETag de un listado a partir de su versión y de la URL pedida
+
+    Args:
+        request: Petición recibida (la ruta y los parámetros forman parte del ETag)
+        version: Tupla (número de filas, última modificación) de la colección
+        *relacionadas: Versiones de las tablas incluidas en la respuesta
+            (p. ej. con ?expand=); un cambio en ellas también cambia el ETag
+
+    Returns:
+        Tupla (ETag, última modificación)
+    """
+    partes = [request.url.path, request.url.query]
+    for total, fecha in (version, *relacionadas):
+        partes += [str(total), fecha.isoformat() if fecha else ""]
+    modificado = mas_reciente(version[1], *(fecha for _, fecha in relacionadas))
+    return _etiqueta("|".join(partes).encode("utf-8")), modificado
+
+
+def mas_reciente(*fechas: Optional[datetime]) -> Optional[datetime]:
+    """La fecha más reciente de las dadas (en UTC), o None si no hay ninguna"""
+    return max((_utc(fecha) for fecha in fechas if fecha is not None), default=None)
@@ -0,0 +1,76 @@
+"""
+API de Monitoreo - Endpoints con métricas internas del servicio
+"""
+
+from auth.pool_hash import pool_hash
+from auth.tokens import obtener_sesion_admin
+from crud.categoria_crud import cache_categorias
+from database.config import obtener_estadisticas_pool
+from database.instrumentacion import instrumentacion_activa, registro_sql
+from fastapi import APIRouter, Depends, HTTPException, status
+from schemas import RespuestaAPI
+
+router = APIRouter(prefix="/monitoreo", tags=["monitoreo"])
+
+
+@router.get("/pool", response_model=RespuestaAPI)
+async def estado_pool():
+    """Obtener la configuración y el uso actual del pool de conexiones."""
+    try:
+        return RespuestaAPI(
+            mensaje="Estado del pool de conexiones",
+            exito=True,
+            datos=obtener_estadisticas_pool(),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener el estado del pool: {str(e)}",
+        )
+
+
+@router.get("/sql", response_model=RespuestaAPI)
+async def estadisticas_sql(top: int = 20):
+    """Obtener los histogramas de latencia SQL por endpoint y las sentencias más costosas."""
+    try:
+        return RespuestaAPI(
+            mensaje="Estadísticas de sentencias SQL",
+            exito=True,
+            datos={"activa": instrumentacion_activa(), **registro_sql.resumen(top)},
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener las estadísticas SQL: {str(e)}",
+        )
+
+
+@router.delete(
+    "/sql",
+    response_model=RespuestaAPI,
+    dependencies=[Depends(obtener_sesion_admin)],
+)
+async def reiniciar_estadisticas_sql():
+    """Reiniciar las estadísticas de sentencias SQL (solo administradores)."""
+    registro_sql.reiniciar()
+    return RespuestaAPI(mensaje="Estadísticas SQL reiniciadas", exito=True)
+
+
+@router.get("/hash", response_model=RespuestaAPI)
+async def estado_pool_hash():
+    """Obtener la cola y las latencias del pool de hash de contraseñas."""
+    return RespuestaAPI(
+        mensaje="Estado del pool de hash de contraseñas",
+        exito=True,
+        datos=pool_hash.resumen(),
+    )
+
+
+@router.get("/cache", response_model=RespuestaAPI)
+async def estado_cache():
+    """Obtener los aciertos, fallos e invalidaciones de la caché de categorías."""
+    return RespuestaAPI(
+        mensaje="Estado de la caché de categorías",
+        exito=True,
+        datos={"categorias": cache_categorias.resumen()},
+    )
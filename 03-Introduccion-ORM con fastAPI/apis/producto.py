@@ -2,27 +2,188 @@
 API de Productos - Endpoints para gestión de productos
 """
 
-from typing import List
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, List, Optional, Tuple
 from uuid import UUID
 
-from crud.producto_crud import ProductoCRUD
-from database.config import get_db
-from fastapi import APIRouter, Depends, HTTPException, status
-from schemas import ProductoCreate, ProductoResponse, ProductoUpdate, RespuestaAPI
-from sqlalchemy.orm import Session
+from apis.condicionales import (
+    cabeceras_validacion,
+    mas_reciente,
+    no_modificado,
+    respuesta_contenido,
+    respuesta_entidad,
+    respuesta_no_modificada,
+    ultima_modificacion,
+    validador_coleccion,
+)
+from apis.serializacion import (
+    codificar,
+    listados_desde_filas,
+    respuesta_filas,
+    respuesta_json,
+)
+from crud.categoria_crud import CategoriaCRUDAsync
+from crud.paginacion import CABECERA_SIGUIENTE_CURSOR, MAX_TAMANO_PAGINA
+from crud.producto_crud import (
+    COLUMNAS_EXPORTACION,
+    COLUMNAS_RESPUESTA,
+    LIMITE_BUSQUEDA,
+    MAX_TAMANO_LOTE_CARGA,
+    RELACIONES_EXPANDIBLES,
+    TAMANO_LOTE_CARGA,
+    ProductoCRUDAsync,
+    StockInsuficiente,
+)
+from crud.usuario_crud import UsuarioCRUDAsync
+from database.config import get_async_db, get_fabrica_sesiones_async
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from schemas import (
+    AjusteStock,
+    ErrorCargaProducto,
+    ProductoCreate,
+    ProductoExpandido,
+    ProductoResponse,
+    ProductoUpdate,
+    ReservaStock,
+    RespuestaAPI,
+    ResultadoCargaProductos,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/productos", tags=["productos"])
 
+# Tipos de contenido aceptados como NDJSON (un objeto JSON por línea)
+TIPOS_NDJSON = ("application/x-ndjson", "application/ndjson", "application/jsonl")
 
-@router.get("/", response_model=List[ProductoResponse])
+
+def relaciones_expandidas(
+    expand: Optional[str] = Query(
+        None,
+        description=(
+            "Relaciones a incluir separadas por comas: "
+            + ", ".join(RELACIONES_EXPANDIBLES)
+        ),
+    )
+) -> Tuple[str, ...]:
+    """
+    Leer ?expand= (dependencia de las rutas GET de productos)
+
+    Raises:
+        HTTPException: 400 si alguna relación no está en RELACIONES_EXPANDIBLES
+    """
+    nombres = (nombre.strip() for nombre in (expand or "").split(","))
+    relaciones = tuple(dict.fromkeys(nombre for nombre in nombres if nombre))
+    desconocidas = [
+        nombre for nombre in relaciones if nombre not in RELACIONES_EXPANDIBLES
+    ]
+    if desconocidas:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"No se puede expandir: {', '.join(desconocidas)}. "
+                f"Opciones: {', '.join(RELACIONES_EXPANDIBLES)}"
+            ),
+        )
+    return relaciones
+
+
+async def _versiones_relaciones(
+    db: AsyncSession, relaciones: Tuple[str, ...]
+) -> List[Tuple[int, Optional[datetime]]]:
+    """Versiones de las tablas de las relaciones expandidas (para el ETag)"""
+    versiones = []
+    if "categoria" in relaciones:
+        versiones.append(await CategoriaCRUDAsync(db).version_categorias())
+    if {"usuario_crea", "usuario_edita"} & set(relaciones):
+        versiones.append(await UsuarioCRUDAsync(db).version_usuarios())
+    return versiones
+
+
+def _producto_expandido(producto, relaciones: Tuple[str, ...]) -> dict:
+    """
+    ProductoExpandido con las relaciones pedidas, ya cargadas por el CRUD
+
+    Solo se leen las relaciones de relaciones: las demás no están cargadas
+    y acceder a ellas lanzaría una consulta por producto. Las relaciones no
+    pedidas no aparecen en el JSON.
+    """
+    datos = ProductoResponse.model_validate(producto).model_dump()
+    datos.update({relacion: getattr(producto, relacion) for relacion in relaciones})
+    return ProductoExpandido.model_validate(datos).model_dump(
+        mode="json", exclude_unset=True
+    )
+
+
+def _respuesta_expandida(productos, relaciones: Tuple[str, ...], response: Response):
+    # Se serializa aquí y no con el response_model: validar las entidades con
+    # ProductoExpandido leería también las relaciones no cargadas
+    return respuesta_json(
+        [_producto_expandido(producto, relaciones) for producto in productos],
+        response,
+    )
+
+
+@router.get("/", response_model=List[ProductoExpandido])
 async def obtener_productos(
-    skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_TAMANO_PAGINA, ge=1, le=MAX_TAMANO_PAGINA),
+    skip: int = Query(0, ge=0, deprecated=True),
+    relaciones: Tuple[str, ...] = Depends(relaciones_expandidas),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Obtener todos los productos con paginación."""
+    """
+    Obtener productos paginados por cursor.
+
+    Si hay más resultados, la cabecera X-Next-Cursor trae el cursor que se
+    envía como ?cursor= para pedir la página siguiente. Con If-None-Match
+    o If-Modified-Since se responde 304 si los productos no cambiaron.
+    Con LISTADOS_DESDE_FILAS la página se serializa desde tuplas de columnas.
+    Con ?expand=categoria,usuario_crea se incluyen esas relaciones, cargadas
+    en bloque para toda la página.
+    """
     try:
-        producto_crud = ProductoCRUD(db)
-        productos = producto_crud.obtener_productos(skip=skip, limit=limit)
-        return productos
+        producto_crud = ProductoCRUDAsync(db)
+        etag, modificado = validador_coleccion(
+            request,
+            await producto_crud.version_productos(),
+            *await _versiones_relaciones(db, relaciones),
+        )
+        if no_modificado(request, etag, modificado):
+            return respuesta_no_modificada(etag, modificado)
+        response.headers.update(cabeceras_validacion(etag, modificado))
+        if skip:
+            # Paginación por desplazamiento: obsoleta, se mantiene por compatibilidad
+            productos = await producto_crud.obtener_productos(
+                skip=skip, limit=limit, expandir=relaciones
+            )
+            return _respuesta_expandida(productos, relaciones, response)
+        desde_filas = listados_desde_filas() and not relaciones
+        productos, siguiente_cursor = await producto_crud.obtener_productos_pagina(
+            cursor=cursor, limit=limit, filas=desde_filas, expandir=relaciones
+        )
+        if siguiente_cursor:
+            response.headers[CABECERA_SIGUIENTE_CURSOR] = siguiente_cursor
+        if desde_filas:
+            return respuesta_filas(COLUMNAS_RESPUESTA, productos, response)
+        return _respuesta_expandida(productos, relaciones, response)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -30,17 +191,111 @@ async def obtener_productos(
         )
 
 
-@router.get("/{producto_id}", response_model=ProductoResponse)
-async def obtener_producto(producto_id: UUID, db: Session = Depends(get_db)):
-    """Obtener un producto por ID."""
+def _valor_exportable(valor: Any) -> Any:
+    """Convertir UUID, Decimal y fechas a tipos serializables"""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, UUID):
+        return str(valor)
+    return valor
+
+
+def _lote_csv(lote, encabezado: bool = False) -> str:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    if encabezado:
+        escritor.writerow(COLUMNAS_EXPORTACION)
+    escritor.writerows([_valor_exportable(valor) for valor in fila] for fila in lote)
+    return buffer.getvalue()
+
+
+def _lote_ndjson(lote) -> str:
+    return "".join(
+        json.dumps(
+            {
+                columna: _valor_exportable(valor)
+                for columna, valor in zip(COLUMNAS_EXPORTACION, fila)
+            },
+            ensure_ascii=False,
+        )
+        + "\n"
+        for fila in lote
+    )
+
+
+@router.get("/export")
+async def exportar_productos(
+    formato: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    abrir_sesion=Depends(get_fabrica_sesiones_async),
+):
+    """
+    Exportar el catálogo completo en CSV o NDJSON.
+
+    La respuesta se envía por partes mientras se lee un cursor del servidor:
+    el primer lote sale enseguida y la memoria no crece con el catálogo.
+    """
+
+    # La sesión se abre y se cierra en el generador: las dependencias con
+    # yield (get_async_db) pueden cerrarse antes de terminar de enviar
+    async def contenido():
+        encabezado = True
+        async with abrir_sesion("GET") as db:
+            async for lote in ProductoCRUDAsync(db).exportar_productos():
+                if formato == "csv":
+                    yield _lote_csv(lote, encabezado)
+                else:
+                    yield _lote_ndjson(lote)
+                encabezado = False
+        if formato == "csv" and encabezado:
+            # Catálogo vacío: solo la fila de encabezado
+            yield _lote_csv([], encabezado=True)
+
+    tipo = "text/csv; charset=utf-8" if formato == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        contenido(),
+        media_type=tipo,
+        headers={"Content-Disposition": f'attachment; filename="productos.{formato}"'},
+    )
+
+
+@router.get("/{producto_id}", response_model=ProductoExpandido)
+async def obtener_producto(
+    producto_id: UUID,
+    request: Request,
+    relaciones: Tuple[str, ...] = Depends(relaciones_expandidas),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Obtener un producto por ID (304 si el ETag del cliente sigue vigente).
+
+    Con ?expand= se incluyen las relaciones pedidas en la misma respuesta.
+    """
     try:
-        producto_crud = ProductoCRUD(db)
-        producto = producto_crud.obtener_producto(producto_id)
+        producto_crud = ProductoCRUDAsync(db)
+        producto = await producto_crud.obtener_producto(
+            producto_id, expandir=relaciones
+        )
         if not producto:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado"
             )
-        return producto
+        if not relaciones:
+            return respuesta_entidad(request, ProductoResponse, producto)
+        # El ETag es el hash del cuerpo, que ya incluye las relaciones
+        relacionados = [getattr(producto, relacion) for relacion in relaciones]
+        return respuesta_contenido(
+            request,
+            codificar(_producto_expandido(producto, relaciones)),
+            mas_reciente(
+                *(
+                    ultima_modificacion(entidad)
+                    for entidad in (producto, *relacionados)
+                    if entidad is not None
+                )
+            ),
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -50,15 +305,32 @@ async def obtener_producto(producto_id: UUID, db: Session = Depends(get_db)):
         )
 
 
-@router.get("/categoria/{categoria_id}", response_model=List[ProductoResponse])
+@router.get("/categoria/{categoria_id}", response_model=List[ProductoExpandido])
 async def obtener_productos_por_categoria(
-    categoria_id: UUID, db: Session = Depends(get_db)
+    categoria_id: UUID,
+    request: Request,
+    response: Response,
+    relaciones: Tuple[str, ...] = Depends(relaciones_expandidas),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Obtener productos por categoría."""
+    """Obtener productos por categoría (304 si no cambiaron)."""
     try:
-        producto_crud = ProductoCRUD(db)
-        productos = producto_crud.obtener_productos_por_categoria(categoria_id)
-        return productos
+        producto_crud = ProductoCRUDAsync(db)
+        etag, modificado = validador_coleccion(
+            request,
+            await producto_crud.version_productos(categoria_id=categoria_id),
+            *await _versiones_relaciones(db, relaciones),
+        )
+        if no_modificado(request, etag, modificado):
+            return respuesta_no_modificada(etag, modificado)
+        response.headers.update(cabeceras_validacion(etag, modificado))
+        desde_filas = listados_desde_filas() and not relaciones
+        productos = await producto_crud.obtener_productos_por_categoria(
+            categoria_id, filas=desde_filas, expandir=relaciones
+        )
+        if desde_filas:
+            return respuesta_filas(COLUMNAS_RESPUESTA, productos, response)
+        return _respuesta_expandida(productos, relaciones, response)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -66,15 +338,32 @@ async def obtener_productos_por_categoria(
         )
 
 
-@router.get("/usuario/{usuario_id}", response_model=List[ProductoResponse])
+@router.get("/usuario/{usuario_id}", response_model=List[ProductoExpandido])
 async def obtener_productos_por_usuario(
-    usuario_id: UUID, db: Session = Depends(get_db)
+    usuario_id: UUID,
+    request: Request,
+    response: Response,
+    relaciones: Tuple[str, ...] = Depends(relaciones_expandidas),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Obtener productos por usuario."""
+    """Obtener productos por usuario (304 si no cambiaron)."""
     try:
-        producto_crud = ProductoCRUD(db)
-        productos = producto_crud.obtener_productos_por_usuario(usuario_id)
-        return productos
+        producto_crud = ProductoCRUDAsync(db)
+        etag, modificado = validador_coleccion(
+            request,
+            await producto_crud.version_productos(usuario_id=usuario_id),
+            *await _versiones_relaciones(db, relaciones),
+        )
+        if no_modificado(request, etag, modificado):
+            return respuesta_no_modificada(etag, modificado)
+        response.headers.update(cabeceras_validacion(etag, modificado))
+        desde_filas = listados_desde_filas() and not relaciones
+        productos = await producto_crud.obtener_productos_por_usuario(
+            usuario_id, filas=desde_filas, expandir=relaciones
+        )
+        if desde_filas:
+            return respuesta_filas(COLUMNAS_RESPUESTA, productos, response)
+        return _respuesta_expandida(productos, relaciones, response)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -82,13 +371,30 @@ async def obtener_productos_por_usuario(
         )
 
 
-@router.get("/buscar/{nombre}", response_model=List[ProductoResponse])
-async def buscar_productos_por_nombre(nombre: str, db: Session = Depends(get_db)):
-    """Buscar productos por nombre (búsqueda parcial)."""
+@router.get("/buscar/{nombre}", response_model=List[ProductoExpandido])
+async def buscar_productos_por_nombre(
+    nombre: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(LIMITE_BUSQUEDA, ge=1, le=MAX_TAMANO_PAGINA),
+    relaciones: Tuple[str, ...] = Depends(relaciones_expandidas),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Buscar productos por nombre y descripción, los más relevantes primero."""
     try:
-        producto_crud = ProductoCRUD(db)
-        productos = producto_crud.buscar_productos_por_nombre(nombre)
-        return productos
+        producto_crud = ProductoCRUDAsync(db)
+        etag, modificado = validador_coleccion(
+            request,
+            await producto_crud.version_productos(),
+            *await _versiones_relaciones(db, relaciones),
+        )
+        if no_modificado(request, etag, modificado):
+            return respuesta_no_modificada(etag, modificado)
+        response.headers.update(cabeceras_validacion(etag, modificado))
+        productos = await producto_crud.buscar_productos_por_nombre(
+            nombre, limit=limit, expandir=relaciones
+        )
+        return _respuesta_expandida(productos, relaciones, response)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -97,11 +403,13 @@ async def buscar_productos_por_nombre(nombre: str, db: Session = Depends(get_db)
 
 
 @router.post("/", response_model=ProductoResponse, status_code=status.HTTP_201_CREATED)
-async def crear_producto(producto_data: ProductoCreate, db: Session = Depends(get_db)):
+async def crear_producto(
+    producto_data: ProductoCreate, db: AsyncSession = Depends(get_async_db)
+):
     """Crear un nuevo producto."""
     try:
-        producto_crud = ProductoCRUD(db)
-        producto = producto_crud.crear_producto(
+        producto_crud = ProductoCRUDAsync(db)
+        producto = await producto_crud.crear_producto(
             nombre=producto_data.nombre,
             descripcion=producto_data.descripcion,
             precio=producto_data.precio,
@@ -119,33 +427,143 @@ async def crear_producto(producto_data: ProductoCreate, db: Session = Depends(ge
         )
 
 
+async def _filas_carga(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Recorrer las filas de una carga masiva
+
+    Un cuerpo NDJSON se lee por trozos y se entrega línea a línea (bytes),
+    sin cargarlo entero en memoria; un array JSON se entrega elemento a
+    elemento.
+    """
+    tipo = request.headers.get("content-type", "").split(";")[0].strip()
+    if tipo in TIPOS_NDJSON:
+        indice, pendiente = 0, b""
+        async for trozo in request.stream():
+            *lineas, pendiente = (pendiente + trozo).split(b"\n")
+            for linea in lineas:
+                if linea.strip():
+                    yield indice, linea
+                    indice += 1
+        if pendiente.strip():
+            yield indice, pendiente
+        return
+
+    try:
+        filas = await request.json()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El cuerpo no es JSON válido",
+        )
+    if not isinstance(filas, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Se esperaba un array JSON o NDJSON (un producto por línea)",
+        )
+    for indice, fila in enumerate(filas):
+        yield indice, fila
+
+
+def _validar_fila_carga(fila: Any) -> dict:
+    """
+    Convertir una fila de la carga en los campos de ProductoCreate
+
+    Raises:
+        ValueError: Si la fila no es JSON válido o no cumple el esquema
+    """
+    if isinstance(fila, bytes):
+        fila = json.loads(fila)
+    try:
+        return ProductoCreate.model_validate(fila).model_dump()
+    except ValidationError as e:
+        raise ValueError(
+            "; ".join(
+                f"{'.'.join(str(campo) for campo in error['loc']) or 'fila'}: "
+                f"{error['msg']}"
+                for error in e.errors()
+            )
+        )
+
+
+@router.post("/bulk", response_model=ResultadoCargaProductos)
+async def crear_productos_bulk(
+    request: Request,
+    tamano_lote: int = Query(TAMANO_LOTE_CARGA, ge=1, le=MAX_TAMANO_LOTE_CARGA),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Crear productos en bloque desde un array JSON o NDJSON.
+
+    Cada lote de tamano_lote filas se valida con una consulta IN por tabla
+    referenciada y se inserta con un solo INSERT de varias filas. Las filas
+    inválidas se devuelven en "errores" (con su índice) sin detener la carga.
+    """
+    try:
+        producto_crud = ProductoCRUDAsync(db)
+        total, creados = 0, 0
+        errores: List[ErrorCargaProducto] = []
+        lote: List[Tuple[int, dict]] = []
+
+        async def insertar_lote():
+            nonlocal creados
+            creados_lote, errores_lote = await producto_crud.crear_productos_lote(lote)
+            creados += creados_lote
+            errores.extend(
+                ErrorCargaProducto(indice=indice, error=error)
+                for indice, error in errores_lote
+            )
+            lote.clear()
+
+        async for indice, fila in _filas_carga(request):
+            total += 1
+            try:
+                lote.append((indice, _validar_fila_carga(fila)))
+            except ValueError as e:
+                errores.append(ErrorCargaProducto(indice=indice, error=str(e)))
+            if len(lote) >= tamano_lote:
+                await insertar_lote()
+        if lote:
+            await insertar_lote()
+
+        errores.sort(key=lambda error: error.indice)
+        return ResultadoCargaProductos(total=total, creados=creados, errores=errores)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error en la carga masiva de productos: {str(e)}",
+        )
+
+
 @router.put("/{producto_id}", response_model=ProductoResponse)
 async def actualizar_producto(
-    producto_id: UUID, producto_data: ProductoUpdate, db: Session = Depends(get_db)
+    producto_id: UUID,
+    producto_data: ProductoUpdate,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Actualizar un producto existente."""
     try:
-        producto_crud = ProductoCRUD(db)
-
-        # Verificar que el producto existe
-        producto_existente = producto_crud.obtener_producto(producto_id)
-        if not producto_existente:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado"
-            )
+        producto_crud = ProductoCRUDAsync(db)
 
         # Filtrar campos None para actualización
         campos_actualizacion = {
             k: v for k, v in producto_data.dict().items() if v is not None
         }
 
+        # Sin cambios solo se consulta; si hay cambios, el CRUD ya verifica
+        # que el producto existe (None) sin una consulta previa duplicada
         if not campos_actualizacion:
-            return producto_existente
-
-        producto_actualizado = producto_crud.actualizar_producto(
-            producto_id, **campos_actualizacion
-        )
-        return producto_actualizado
+            producto = await producto_crud.obtener_producto(producto_id)
+        else:
+            producto = await producto_crud.actualizar_producto(
+                producto_id, **campos_actualizacion
+            )
+        if not producto:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado"
+            )
+        return producto
     except HTTPException:
         raise
     except ValueError as e:
@@ -159,18 +577,11 @@ async def actualizar_producto(
 
 @router.patch("/{producto_id}/stock", response_model=ProductoResponse)
 async def actualizar_stock(
-    producto_id: UUID, nuevo_stock: int, db: Session = Depends(get_db)
+    producto_id: UUID, nuevo_stock: int, db: AsyncSession = Depends(get_async_db)
 ):
     """Actualizar el stock de un producto."""
     try:
-        producto_crud = ProductoCRUD(db)
-
-        # Verificar que el producto existe
-        producto_existente = producto_crud.obtener_producto(producto_id)
-        if not producto_existente:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado"
-            )
+        producto_crud = ProductoCRUDAsync(db)
 
         if nuevo_stock < 0:
             raise HTTPException(
@@ -178,10 +589,18 @@ async def actualizar_stock(
                 detail="El stock no puede ser negativo",
             )
 
-        producto_actualizado = producto_crud.actualizar_stock(producto_id, nuevo_stock)
+        producto_actualizado = await producto_crud.actualizar_stock(
+            producto_id, nuevo_stock
+        )
+        if not producto_actualizado:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado"
+            )
         return producto_actualizado
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -189,27 +608,77 @@ async def actualizar_stock(
         )
 
 
-@router.delete("/{producto_id}", response_model=RespuestaAPI)
-async def eliminar_producto(producto_id: UUID, db: Session = Depends(get_db)):
-    """Eliminar un producto."""
+@router.post("/stock/reserva", response_model=List[ProductoResponse])
+async def reservar_stock(
+    reserva: ReservaStock, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Descontar el stock de varios productos a la vez (checkout).
+
+    Todo o nada: si algún producto no existe (400) o no tiene stock
+    suficiente (409) no se descuenta ninguno.
+    """
     try:
-        producto_crud = ProductoCRUD(db)
+        producto_crud = ProductoCRUDAsync(db)
+        return await producto_crud.reservar_stock(
+            [(item.producto_id, item.cantidad) for item in reserva.items]
+        )
+    except StockInsuficiente as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al reservar stock: {str(e)}",
+        )
+
+
+@router.post("/{producto_id}/stock/ajuste", response_model=ProductoResponse)
+async def ajustar_stock(
+    producto_id: UUID, ajuste: AjusteStock, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Sumar (+n) o restar (-n) unidades al stock de forma atómica.
 
-        # Verificar que el producto existe
-        producto_existente = producto_crud.obtener_producto(producto_id)
-        if not producto_existente:
+    Responde 409 si el stock quedaría negativo; el stock no cambia.
+    """
+    try:
+        producto_crud = ProductoCRUDAsync(db)
+        producto = await producto_crud.ajustar_stock(producto_id, ajuste.delta)
+        if not producto:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado"
             )
+        return producto
+    except HTTPException:
+        raise
+    except StockInsuficiente as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al ajustar stock: {str(e)}",
+        )
 
-        eliminado = producto_crud.eliminar_producto(producto_id)
-        if eliminado:
-            return RespuestaAPI(mensaje="Producto eliminado exitosamente", exito=True)
-        else:
+
+@router.delete("/{producto_id}", response_model=RespuestaAPI)
+async def eliminar_producto(
+    producto_id: UUID, db: AsyncSession = Depends(get_async_db)
+):
+    """Eliminar un producto."""
+    try:
+        producto_crud = ProductoCRUDAsync(db)
+
+        # eliminar_producto devuelve False si el producto no existe
+        eliminado = await producto_crud.eliminar_producto(producto_id)
+        if not eliminado:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al eliminar producto",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado"
             )
+        return RespuestaAPI(mensaje="Producto eliminado exitosamente", exito=True)
     except HTTPException:
         raise
     except Exception as e:
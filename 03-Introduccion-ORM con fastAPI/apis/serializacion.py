@@ -0,0 +1,119 @@
+"""
+Serialización JSON rápida de las respuestas
+
+- clase_respuesta(): clase de respuesta por defecto de la aplicación. Con
+  RESPUESTA_JSON=orjson (el valor por defecto si orjson está instalado) el
+  cuerpo se codifica con orjson en lugar de json.dumps.
+- respuesta_filas(): cuerpo de un listado construido directamente desde
+  tuplas de columnas, sin crear entidades ORM ni validarlas con Pydantic.
+  Los listados de productos la usan si LISTADOS_DESDE_FILAS está activo
+  (por defecto).
+"""
+
+import json
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Iterable, Sequence
+from uuid import UUID
+
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json de la biblioteca estándar
+    orjson = None
+
+TIPO_JSON = "application/json"
+
+CODIFICADOR_ORJSON = "orjson"
+CODIFICADOR_JSON = "json"
+
+
+def codificador_configurado() -> str:
+    """
+    Leer RESPUESTA_JSON del entorno
+
+    Raises:
+        ValueError: Si el valor no es 'orjson' ni 'json', o si se pide orjson
+            y no está instalado
+    """
+    por_defecto = CODIFICADOR_ORJSON if orjson is not None else CODIFICADOR_JSON
+    nombre = os.getenv("RESPUESTA_JSON", "").strip().lower() or por_defecto
+    if nombre not in (CODIFICADOR_ORJSON, CODIFICADOR_JSON):
+        raise ValueError(
+            f"RESPUESTA_JSON debe ser '{CODIFICADOR_ORJSON}' o '{CODIFICADOR_JSON}'"
+        )
+    if nombre == CODIFICADOR_ORJSON and orjson is None:
+        raise ValueError("RESPUESTA_JSON=orjson requiere instalar el paquete orjson")
+    return nombre
+
+
+def clase_respuesta() -> type:
+    """Clase de respuesta por defecto (default_response_class de FastAPI)"""
+    if codificador_configurado() == CODIFICADOR_ORJSON:
+        return ORJSONResponse
+    return JSONResponse
+
+
+def listados_desde_filas() -> bool:
+    """Indicar si los listados se construyen desde tuplas (LISTADOS_DESDE_FILAS)"""
+    return os.getenv("LISTADOS_DESDE_FILAS", "1").lower() in ("1", "true", "si", "sí")
+
+
+def _valor_json(valor: Any) -> Any:
+    """Tipos que ni orjson ni json codifican por sí mismos"""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, datetime) and valor.utcoffset() == timedelta(0):
+        return valor.replace(tzinfo=None).isoformat() + "Z"
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, UUID):
+        return str(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def codificar(datos: Any) -> bytes:
+    """
+    Codificar datos a JSON con el codificador configurado
+
+    Las fechas en UTC se escriben con sufijo "Z", igual que Pydantic, para
+    que ambos caminos devuelvan el mismo cuerpo.
+    """
+    if codificador_configurado() == CODIFICADOR_ORJSON:
+        return orjson.dumps(datos, default=_valor_json, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        datos, default=_valor_json, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def respuesta_filas(
+    columnas: Sequence[str], filas: Iterable[Sequence], response: Response
+) -> Response:
+    """
+    Respuesta JSON de un listado a partir de tuplas de columnas
+
+    Args:
+        columnas: Nombres de las columnas, en el orden de cada tupla
+        filas: Filas devueltas por la consulta
+        response: Respuesta inyectada por FastAPI (se copian sus cabeceras)
+
+    Returns:
+        Respuesta con un array de objetos {columna: valor}
+    """
+    return respuesta_json([dict(zip(columnas, fila)) for fila in filas], response)
+
+
+def respuesta_json(datos: Any, response: Response) -> Response:
+    """
+    Respuesta con datos ya preparados codificados con codificar()
+
+    Args:
+        datos: Listas, diccionarios y valores que admite codificar()
+        response: Respuesta inyectada por FastAPI (se copian sus cabeceras)
+    """
+    return Response(
+        content=codificar(datos), media_type=TIPO_JSON, headers=dict(response.headers)
+    )
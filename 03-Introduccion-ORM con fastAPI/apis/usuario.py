@@ -2,12 +2,28 @@
 API de Usuarios - Endpoints para gestión de usuarios
 """
 
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from crud.usuario_crud import UsuarioCRUD
-from database.config import get_db
-from fastapi import APIRouter, Depends, HTTPException, status
+from apis.condicionales import (
+    cabeceras_validacion,
+    no_modificado,
+    respuesta_entidad,
+    respuesta_no_modificada,
+    validador_coleccion,
+)
+from crud.paginacion import CABECERA_SIGUIENTE_CURSOR, MAX_TAMANO_PAGINA
+from crud.usuario_crud import UsuarioCRUDAsync
+from database.config import get_async_db
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from schemas import (
     CambioContraseña,
     RespuestaAPI,
@@ -15,20 +31,46 @@ from schemas import (
     UsuarioResponse,
     UsuarioUpdate,
 )
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/usuarios", tags=["usuarios"])
 
 
 @router.get("/", response_model=List[UsuarioResponse])
 async def obtener_usuarios(
-    skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_TAMANO_PAGINA, ge=1, le=MAX_TAMANO_PAGINA),
+    skip: int = Query(0, ge=0, deprecated=True),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Obtener todos los usuarios con paginación."""
+    """
+    Obtener usuarios paginados por cursor.
+
+    Si hay más resultados, la cabecera X-Next-Cursor trae el cursor que se
+    envía como ?cursor= para pedir la página siguiente. Con If-None-Match
+    o If-Modified-Since se responde 304 si los usuarios no cambiaron.
+    """
     try:
-        usuario_crud = UsuarioCRUD(db)
-        usuarios = usuario_crud.obtener_usuarios(skip=skip, limit=limit)
+        usuario_crud = UsuarioCRUDAsync(db)
+        etag, modificado = validador_coleccion(
+            request, await usuario_crud.version_usuarios()
+        )
+        if no_modificado(request, etag, modificado):
+            return respuesta_no_modificada(etag, modificado)
+        response.headers.update(cabeceras_validacion(etag, modificado))
+        if skip:
+            # Paginación por desplazamiento: obsoleta, se mantiene por compatibilidad
+            return await usuario_crud.obtener_usuarios(skip=skip, limit=limit)
+        usuarios, siguiente_cursor = await usuario_crud.obtener_usuarios_pagina(
+            cursor=cursor, limit=limit
+        )
+        if siguiente_cursor:
+            response.headers[CABECERA_SIGUIENTE_CURSOR] = siguiente_cursor
         return usuarios
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -37,16 +79,18 @@ async def obtener_usuarios(
 
 
 @router.get("/{usuario_id}", response_model=UsuarioResponse)
-async def obtener_usuario(usuario_id: UUID, db: Session = Depends(get_db)):
-    """Obtener un usuario por ID."""
+async def obtener_usuario(
+    usuario_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener un usuario por ID (304 si el ETag del cliente sigue vigente)."""
     try:
-        usuario_crud = UsuarioCRUD(db)
-        usuario = usuario_crud.obtener_usuario(usuario_id)
+        usuario_crud = UsuarioCRUDAsync(db)
+        usuario = await usuario_crud.obtener_usuario(usuario_id)
         if not usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
             )
-        return usuario
+        return respuesta_entidad(request, UsuarioResponse, usuario)
     except HTTPException:
         raise
     except Exception as e:
@@ -57,16 +101,18 @@ async def obtener_usuario(usuario_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/email/{email}", response_model=UsuarioResponse)
-async def obtener_usuario_por_email(email: str, db: Session = Depends(get_db)):
-    """Obtener un usuario por email."""
+async def obtener_usuario_por_email(
+    email: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener un usuario por email (304 si el ETag del cliente sigue vigente)."""
     try:
-        usuario_crud = UsuarioCRUD(db)
-        usuario = usuario_crud.obtener_usuario_por_email(email)
+        usuario_crud = UsuarioCRUDAsync(db)
+        usuario = await usuario_crud.obtener_usuario_por_email(email)
         if not usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
             )
-        return usuario
+        return respuesta_entidad(request, UsuarioResponse, usuario)
     except HTTPException:
         raise
     except Exception as e:
@@ -78,17 +124,17 @@ async def obtener_usuario_por_email(email: str, db: Session = Depends(get_db)):
 
 @router.get("/username/{nombre_usuario}", response_model=UsuarioResponse)
 async def obtener_usuario_por_nombre_usuario(
-    nombre_usuario: str, db: Session = Depends(get_db)
+    nombre_usuario: str, request: Request, db: AsyncSession = Depends(get_async_db)
 ):
-    """Obtener un usuario por nombre de usuario."""
+    """Obtener un usuario por nombre de usuario (304 si el ETag sigue vigente)."""
     try:
-        usuario_crud = UsuarioCRUD(db)
-        usuario = usuario_crud.obtener_usuario_por_nombre_usuario(nombre_usuario)
+        usuario_crud = UsuarioCRUDAsync(db)
+        usuario = await usuario_crud.obtener_usuario_por_nombre_usuario(nombre_usuario)
         if not usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
             )
-        return usuario
+        return respuesta_entidad(request, UsuarioResponse, usuario)
     except HTTPException:
         raise
     except Exception as e:
@@ -99,11 +145,13 @@ async def obtener_usuario_por_nombre_usuario(
 
 
 @router.post("/", response_model=UsuarioResponse, status_code=status.HTTP_201_CREATED)
-async def crear_usuario(usuario_data: UsuarioCreate, db: Session = Depends(get_db)):
+async def crear_usuario(
+    usuario_data: UsuarioCreate, db: AsyncSession = Depends(get_async_db)
+):
     """Crear un nuevo usuario."""
     try:
-        usuario_crud = UsuarioCRUD(db)
-        usuario = usuario_crud.crear_usuario(
+        usuario_crud = UsuarioCRUDAsync(db)
+        usuario = await usuario_crud.crear_usuario(
             nombre=usuario_data.nombre,
             nombre_usuario=usuario_data.nombre_usuario,
             email=usuario_data.email,
@@ -123,31 +171,32 @@ async def crear_usuario(usuario_data: UsuarioCreate, db: Session = Depends(get_d
 
 @router.put("/{usuario_id}", response_model=UsuarioResponse)
 async def actualizar_usuario(
-    usuario_id: UUID, usuario_data: UsuarioUpdate, db: Session = Depends(get_db)
+    usuario_id: UUID,
+    usuario_data: UsuarioUpdate,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Actualizar un usuario existente."""
     try:
-        usuario_crud = UsuarioCRUD(db)
-
-        # Verificar que el usuario existe
-        usuario_existente = usuario_crud.obtener_usuario(usuario_id)
-        if not usuario_existente:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
-            )
+        usuario_crud = UsuarioCRUDAsync(db)
 
         # Filtrar campos None para actualización
         campos_actualizacion = {
             k: v for k, v in usuario_data.dict().items() if v is not None
         }
 
+        # Sin cambios solo se consulta; si hay cambios, el CRUD ya verifica
+        # que el usuario existe (None) sin una consulta previa duplicada
         if not campos_actualizacion:
-            return usuario_existente
-
-        usuario_actualizado = usuario_crud.actualizar_usuario(
-            usuario_id, **campos_actualizacion
-        )
-        return usuario_actualizado
+            usuario = await usuario_crud.obtener_usuario(usuario_id)
+        else:
+            usuario = await usuario_crud.actualizar_usuario(
+                usuario_id, **campos_actualizacion
+            )
+        if not usuario:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
+            )
+        return usuario
     except HTTPException:
         raise
     except ValueError as e:
@@ -160,26 +209,18 @@ async def actualizar_usuario(
 
 
 @router.delete("/{usuario_id}", response_model=RespuestaAPI)
-async def eliminar_usuario(usuario_id: UUID, db: Session = Depends(get_db)):
+async def eliminar_usuario(usuario_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Eliminar un usuario."""
     try:
-        usuario_crud = UsuarioCRUD(db)
+        usuario_crud = UsuarioCRUDAsync(db)
 
-        # Verificar que el usuario existe
-        usuario_existente = usuario_crud.obtener_usuario(usuario_id)
-        if not usuario_existente:
+        # eliminar_usuario devuelve False si el usuario no existe
+        eliminado = await usuario_crud.eliminar_usuario(usuario_id)
+        if not eliminado:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
             )
-
-        eliminado = usuario_crud.eliminar_usuario(usuario_id)
-        if eliminado:
-            return RespuestaAPI(mensaje="Usuario eliminado exitosamente", exito=True)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al eliminar usuario",
-            )
+        return RespuestaAPI(mensaje="Usuario eliminado exitosamente", exito=True)
     except HTTPException:
         raise
     except Exception as e:
@@ -190,11 +231,13 @@ async def eliminar_usuario(usuario_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.patch("/{usuario_id}/desactivar", response_model=UsuarioResponse)
-async def desactivar_usuario(usuario_id: UUID, db: Session = Depends(get_db)):
+async def desactivar_usuario(
+    usuario_id: UUID, db: AsyncSession = Depends(get_async_db)
+):
     """Desactivar un usuario (soft delete)."""
     try:
-        usuario_crud = UsuarioCRUD(db)
-        usuario = usuario_crud.desactivar_usuario(usuario_id)
+        usuario_crud = UsuarioCRUDAsync(db)
+        usuario = await usuario_crud.desactivar_usuario(usuario_id)
         if not usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
@@ -211,30 +254,23 @@ async def desactivar_usuario(usuario_id: UUID, db: Session = Depends(get_db)):
 
 @router.post("/{usuario_id}/cambiar-contraseña", response_model=RespuestaAPI)
 async def cambiar_contraseña(
-    usuario_id: UUID, cambio_data: CambioContraseña, db: Session = Depends(get_db)
+    usuario_id: UUID,
+    cambio_data: CambioContraseña,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Cambiar la contraseña de un usuario."""
     try:
-        usuario_crud = UsuarioCRUD(db)
+        usuario_crud = UsuarioCRUDAsync(db)
 
-        # Verificar que el usuario existe
-        usuario_existente = usuario_crud.obtener_usuario(usuario_id)
-        if not usuario_existente:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
-            )
-
-        cambio_exitoso = usuario_crud.cambiar_contraseña(
+        # cambiar_contraseña devuelve False si el usuario no existe
+        cambio_exitoso = await usuario_crud.cambiar_contraseña(
             usuario_id, cambio_data.contraseña_actual, cambio_data.nueva_contraseña
         )
-
-        if cambio_exitoso:
-            return RespuestaAPI(mensaje="Contraseña cambiada exitosamente", exito=True)
-        else:
+        if not cambio_exitoso:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al cambiar contraseña",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
             )
+        return RespuestaAPI(mensaje="Contraseña cambiada exitosamente", exito=True)
     except HTTPException:
         raise
     except ValueError as e:
@@ -247,11 +283,11 @@ async def cambiar_contraseña(
 
 
 @router.get("/admin/lista", response_model=List[UsuarioResponse])
-async def obtener_usuarios_admin(db: Session = Depends(get_db)):
+async def obtener_usuarios_admin(db: AsyncSession = Depends(get_async_db)):
     """Obtener todos los usuarios administradores."""
     try:
-        usuario_crud = UsuarioCRUD(db)
-        admins = usuario_crud.obtener_usuarios_admin()
+        usuario_crud = UsuarioCRUDAsync(db)
+        admins = await usuario_crud.obtener_usuarios_admin()
         return admins
     except Exception as e:
         raise HTTPException(
@@ -261,11 +297,13 @@ async def obtener_usuarios_admin(db: Session = Depends(get_db)):
 
 
 @router.get("/{usuario_id}/es-admin", response_model=RespuestaAPI)
-async def verificar_es_admin(usuario_id: UUID, db: Session = Depends(get_db)):
+async def verificar_es_admin(
+    usuario_id: UUID, db: AsyncSession = Depends(get_async_db)
+):
     """Verificar si un usuario es administrador."""
     try:
-        usuario_crud = UsuarioCRUD(db)
-        es_admin = usuario_crud.es_admin(usuario_id)
+        usuario_crud = UsuarioCRUDAsync(db)
+        es_admin = await usuario_crud.es_admin(usuario_id)
         return RespuestaAPI(
             mensaje=f"El usuario {'es' if es_admin else 'no es'} administrador",
             exito=True,
@@ -276,4 +314,6 @@ async def verificar_es_admin(usuario_id: UUID, db: Session = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al verificar administrador: {str(e)}",
         )
-# body, string_parameter, path parameter
\ No newline at end of file
+
+
+# body, string_parameter, path parameter
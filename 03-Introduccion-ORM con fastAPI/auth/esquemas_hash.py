@@ -0,0 +1,319 @@
+"""
+Esquemas de hash de contraseñas versionados
+
+Cada hash guarda el algoritmo y sus parámetros, así que se pueden cambiar
+los costes por despliegue y migrar los hashes antiguos al iniciar sesión:
+
+- pbkdf2_sha256:<iteraciones>:<salt>:<hash>
+- scrypt:<n>:<r>:<p>:<salt>:<hash>
+- <salt>:<hash>  (formato original: PBKDF2-SHA256 con 100.000 iteraciones)
+
+El esquema con el que se generan los hashes nuevos se elige con
+HASH_ESQUEMA y sus parámetros con HASH_PBKDF2_ITERACIONES o
+HASH_SCRYPT_N/R/P (ver calibrar_hash.py).
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import statistics
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+PBKDF2 = "pbkdf2_sha256"
+SCRYPT = "scrypt"
+
+ITERACIONES_LEGADO = 100000
+PBKDF2_ITERACIONES_DEFECTO = 100000
+SCRYPT_N_DEFECTO = 2**14
+SCRYPT_R_DEFECTO = 8
+SCRYPT_P_DEFECTO = 1
+
+
+def _entero_env(nombre: str, por_defecto: int, minimo: int = 1) -> int:
+    """
+    Leer un parámetro de coste entero del entorno
+
+    Raises:
+        ValueError: Si el valor no es un entero mayor o igual a minimo
+    """
+    valor = os.getenv(nombre, "").strip()
+    if not valor:
+        return por_defecto
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ValueError(f"La variable {nombre} debe ser un número entero")
+    if numero < minimo:
+        raise ValueError(f"{nombre} debe ser mayor o igual a {minimo}")
+    return numero
+
+
+class EsquemaHash(ABC):
+    """Algoritmo de hash con sus parámetros de coste"""
+
+    nombre = ""
+
+    @abstractmethod
+    def parametros(self) -> Tuple[int, ...]:
+        """Parámetros de coste que se guardan en el hash"""
+
+    @staticmethod
+    @abstractmethod
+    def derivar(password: str, salt: str, parametros: Tuple[int, ...]) -> str:
+        """Calcular el hash (hex) de una contraseña con unos parámetros dados"""
+
+    def hashear(self, password: str) -> str:
+        """
+        Generar el hash versionado de una contraseña
+
+        Args:
+            password: Contraseña en texto plano
+
+        Returns:
+            "<esquema>:<parámetros>:<salt>:<hash>"
+        """
+        salt = secrets.token_hex(32)
+        parametros = self.parametros()
+        derivado = self.derivar(password, salt, parametros)
+        campos = [self.nombre, *map(str, parametros), salt, derivado]
+        return ":".join(campos)
+
+
+class EsquemaPBKDF2(EsquemaHash):
+    """PBKDF2-HMAC-SHA256 con número de iteraciones configurable"""
+
+    nombre = PBKDF2
+
+    def __init__(self, iteraciones: int = PBKDF2_ITERACIONES_DEFECTO):
+        self.iteraciones = iteraciones
+
+    def parametros(self) -> Tuple[int, ...]:
+        return (self.iteraciones,)
+
+    @staticmethod
+    def derivar(password: str, salt: str, parametros: Tuple[int, ...]) -> str:
+        (iteraciones,) = parametros
+        return hashlib.pbkdf2_hmac(
+            "sha256", password.encode("utf-8"), salt.encode("utf-8"), iteraciones
+        ).hex()
+
+
+class EsquemaScrypt(EsquemaHash):
+    """scrypt de hashlib (coste de memoria 128 * n * r bytes)"""
+
+    nombre = SCRYPT
+
+    def __init__(
+        self,
+        n: int = SCRYPT_N_DEFECTO,
+        r: int = SCRYPT_R_DEFECTO,
+        p: int = SCRYPT_P_DEFECTO,
+    ):
+        if n < 2 or n & (n - 1):
+            raise ValueError("El parámetro n de scrypt debe ser una potencia de 2")
+        self.n = n
+        self.r = r
+        self.p = p
+
+    def parametros(self) -> Tuple[int, ...]:
+        return (self.n, self.r, self.p)
+
+    @staticmethod
+    def derivar(password: str, salt: str, parametros: Tuple[int, ...]) -> str:
+        n, r, p = parametros
+        return hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=salt.encode("utf-8"),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=128 * r * (2 * n + p + 2),
+            dklen=32,
+        ).hex()
+
+
+# Número de parámetros que guarda cada esquema
+_CLASES: Dict[str, Tuple[type, int]] = {
+    PBKDF2: (EsquemaPBKDF2, 1),
+    SCRYPT: (EsquemaScrypt, 3),
+}
+
+
+def esquema_configurado() -> EsquemaHash:
+    """
+    Obtener el esquema para los hashes nuevos según el entorno
+
+    Raises:
+        ValueError: Si HASH_ESQUEMA o sus parámetros no son válidos
+    """
+    nombre = os.getenv("HASH_ESQUEMA", PBKDF2).strip() or PBKDF2
+    if nombre == PBKDF2:
+        return EsquemaPBKDF2(
+            _entero_env(
+                "HASH_PBKDF2_ITERACIONES", PBKDF2_ITERACIONES_DEFECTO, minimo=1000
+            )
+        )
+    if nombre == SCRYPT:
+        return EsquemaScrypt(
+            _entero_env("HASH_SCRYPT_N", SCRYPT_N_DEFECTO, minimo=2),
+            _entero_env("HASH_SCRYPT_R", SCRYPT_R_DEFECTO),
+            _entero_env("HASH_SCRYPT_P", SCRYPT_P_DEFECTO),
+        )
+    raise ValueError(f"HASH_ESQUEMA debe ser '{PBKDF2}' o '{SCRYPT}'")
+
+
+def descomponer_hash(
+    password_hash: str,
+) -> Optional[Tuple[str, Tuple[int, ...], str, str]]:
+    """
+    Separar un hash almacenado en sus campos
+
+    Args:
+        password_hash: Hash en cualquiera de los formatos soportados
+
+    Returns:
+        Tupla (esquema, parámetros, salt, hash) o None si no es reconocible
+    """
+    try:
+        campos = password_hash.split(":")
+    except AttributeError:
+        return None
+
+    if len(campos) == 2:
+        return PBKDF2, (ITERACIONES_LEGADO,), campos[0], campos[1]
+
+    clase = _CLASES.get(campos[0])
+    if clase is None or len(campos) != clase[1] + 3:
+        return None
+    try:
+        parametros = tuple(int(valor) for valor in campos[1:-2])
+    except ValueError:
+        return None
+    return campos[0], parametros, campos[-2], campos[-1]
+
+
+def verificar_hash(password: str, password_hash: str) -> bool:
+    """
+    Verificar una contraseña contra un hash de cualquier formato soportado
+
+    Returns:
+        True si la contraseña es correcta, False si no lo es o el hash no es válido
+    """
+    partes = descomponer_hash(password_hash)
+    if partes is None:
+        return False
+    nombre, parametros, salt, esperado = partes
+    clase, _ = _CLASES[nombre]
+    try:
+        calculado = clase.derivar(password, salt, parametros)
+    except (ValueError, MemoryError):
+        return False
+    return hmac.compare_digest(calculado.encode(), esperado.encode("utf-8"))
+
+
+def necesita_rehash(password_hash: str, esquema: Optional[EsquemaHash] = None) -> bool:
+    """
+    Indicar si un hash no corresponde al esquema y costes configurados
+
+    Los hashes en el formato original siempre se actualizan.
+
+    Args:
+        password_hash: Hash almacenado
+        esquema: Esquema de referencia (por defecto el configurado)
+    """
+    esquema = esquema or esquema_configurado()
+    if len(password_hash.split(":")) == 2:
+        return True
+    partes = descomponer_hash(password_hash)
+    if partes is None:
+        return True
+    nombre, parametros, _, _ = partes
+    return nombre != esquema.nombre or parametros != esquema.parametros()
+
+
+def medir_ms(esquema: EsquemaHash, repeticiones: int = 3) -> float:
+    """
+    Medir el tiempo de verificación de un esquema en este equipo
+
+    Args:
+        esquema: Esquema con los parámetros a medir
+        repeticiones: Número de mediciones (se devuelve la mediana)
+
+    Returns:
+        Milisegundos por verificación
+    """
+    salt = secrets.token_hex(32)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        esquema.derivar("Calibracion123!", salt, esquema.parametros())
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def calibrar_pbkdf2(objetivo_ms: float, repeticiones: int = 3) -> EsquemaPBKDF2:
+    """
+    Elegir las iteraciones de PBKDF2 para una latencia de verificación objetivo
+
+    El coste de PBKDF2 es lineal en las iteraciones: se mide un punto y se
+    escala; el resultado se vuelve a medir y a escalar una vez para corregir
+    el ruido de la primera medición. Se redondea a miles.
+
+    Args:
+        objetivo_ms: Latencia deseada por verificación
+        repeticiones: Mediciones por punto
+    """
+    iteraciones = PBKDF2_ITERACIONES_DEFECTO
+    for _ in range(2):
+        medido = medir_ms(EsquemaPBKDF2(iteraciones), repeticiones)
+        iteraciones = max(1000, round(int(iteraciones * objetivo_ms / medido), -3))
+    return EsquemaPBKDF2(iteraciones)
+
+
+def calibrar_scrypt(
+    objetivo_ms: float,
+    r: int = SCRYPT_R_DEFECTO,
+    p: int = SCRYPT_P_DEFECTO,
+    max_memoria_mb: int = 64,
+    repeticiones: int = 3,
+) -> EsquemaScrypt:
+    """
+    Elegir el n de scrypt para una latencia de verificación objetivo
+
+    Se dobla n desde 2**12 mientras la verificación no supere el objetivo y
+    la memoria (128 * n * r bytes) no supere max_memoria_mb.
+
+    Args:
+        objetivo_ms: Latencia deseada por verificación
+        r: Tamaño de bloque
+        p: Paralelismo
+        max_memoria_mb: Memoria máxima por verificación
+        repeticiones: Mediciones por punto
+    """
+    elegido = EsquemaScrypt(2**12, r, p)
+    n = 2**13
+    while 128 * n * r <= max_memoria_mb * 1024 * 1024:
+        candidato = EsquemaScrypt(n, r, p)
+        if medir_ms(candidato, repeticiones) > objetivo_ms:
+            break
+        elegido = candidato
+        n *= 2
+    return elegido
+
+
+def variables_entorno(esquema: EsquemaHash) -> Dict[str, str]:
+    """Variables de entorno que seleccionan un esquema y sus parámetros"""
+    if isinstance(esquema, EsquemaScrypt):
+        return {
+            "HASH_ESQUEMA": SCRYPT,
+            "HASH_SCRYPT_N": str(esquema.n),
+            "HASH_SCRYPT_R": str(esquema.r),
+            "HASH_SCRYPT_P": str(esquema.p),
+        }
+    return {
+        "HASH_ESQUEMA": PBKDF2,
+        "HASH_PBKDF2_ITERACIONES": str(esquema.parametros()[0]),
+    }
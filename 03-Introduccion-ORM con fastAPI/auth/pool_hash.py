@@ -0,0 +1,156 @@
+"""
+Pool acotado de hilos para calcular y verificar hashes de contraseñas
+
+PBKDF2 y scrypt (hashlib) liberan el GIL mientras calculan, así que un pool
+de hilos los ejecuta en paralelo sin bloquear el event loop de uvicorn. El
+número de hilos limita cuánta CPU puede consumir una ráfaga de logins.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from database.instrumentacion import Histograma
+
+# Hilos de hash por worker de uvicorn/gunicorn
+HASH_WORKERS_DEFECTO = 2
+
+
+def workers_hash() -> int:
+    """
+    Leer HASH_WORKERS del entorno
+
+    Raises:
+        ValueError: Si el valor no es un entero mayor o igual a 1
+    """
+    valor = os.getenv("HASH_WORKERS", "").strip()
+    if not valor:
+        return HASH_WORKERS_DEFECTO
+    try:
+        workers = int(valor)
+    except ValueError:
+        raise ValueError("La variable HASH_WORKERS debe ser un número entero")
+    if workers < 1:
+        raise ValueError("HASH_WORKERS debe ser mayor o igual a 1")
+    return workers
+
+
+class PoolHash:
+    """
+    Ejecuta funciones de hash en un ThreadPoolExecutor de tamaño fijo
+
+    Registra la profundidad de la cola (tareas esperando un hilo), las
+    tareas en curso y dos histogramas: espera en cola y tiempo de cálculo.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.en_cola = 0
+        self.en_curso = 0
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Poner a cero los contadores (las tareas en curso se conservan)"""
+        with self._lock:
+            self.en_cola_max = 0
+            self.completadas = 0
+            self.espera = Histograma()
+            self.calculo = Histograma()
+
+    def _obtener_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="hash"
+                )
+            return self._executor
+
+    async def ejecutar(self, funcion: Callable, *args):
+        """
+        Ejecutar funcion(*args) en el pool y esperar el resultado
+
+        Args:
+            funcion: Función de hash o verificación (bloqueante)
+            *args: Argumentos de la función
+
+        Returns:
+            El resultado de la función
+        """
+        encolada = time.perf_counter()
+        fuera_de_cola = False
+        with self._lock:
+            self.en_cola += 1
+            self.en_cola_max = max(self.en_cola_max, self.en_cola)
+
+        def salir_de_cola():
+            # Lo llama el hilo al empezar o el llamador si se cancela antes;
+            # solo el primero descuenta (se ejecuta con el lock tomado)
+            nonlocal fuera_de_cola
+            if not fuera_de_cola:
+                fuera_de_cola = True
+                self.en_cola -= 1
+
+        def tarea():
+            inicio = time.perf_counter()
+            with self._lock:
+                salir_de_cola()
+                self.en_curso += 1
+                self.espera.registrar((inicio - encolada) * 1000, None)
+            try:
+                return funcion(*args)
+            finally:
+                with self._lock:
+                    self.en_curso -= 1
+                    self.completadas += 1
+                    self.calculo.registrar((time.perf_counter() - inicio) * 1000, None)
+
+        executor = self._obtener_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, tarea)
+        finally:
+            # Si el llamador se cancela mientras la tarea espera un hilo, la
+            # tarea se cancela y nunca sale de la cola por sí misma
+            with self._lock:
+                salir_de_cola()
+
+    def cerrar(self):
+        """Detener los hilos; el pool se vuelve a crear si se usa de nuevo"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _latencias(histograma: Histograma) -> Dict[str, float]:
+        return {
+            "promedio_ms": (
+                round(histograma.total_ms / histograma.conteo, 3)
+                if histograma.conteo
+                else 0
+            ),
+            "p50_ms": histograma.percentil(50),
+            "p95_ms": histograma.percentil(95),
+            "p99_ms": histograma.percentil(99),
+            "max_ms": round(histograma.max_ms, 3),
+        }
+
+    def resumen(self) -> Dict:
+        """Obtener el estado del pool y las latencias de espera y cálculo"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "en_cola": self.en_cola,
+                "en_cola_max": self.en_cola_max,
+                "en_curso": self.en_curso,
+                "completadas": self.completadas,
+                "espera": self._latencias(self.espera),
+                "calculo": self._latencias(self.calculo),
+            }
+
+
+pool_hash = PoolHash(workers_hash())
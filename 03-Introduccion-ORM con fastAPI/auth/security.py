@@ -2,10 +2,11 @@
 Módulo de seguridad para manejo de contraseñas
 """
 
-import hashlib
 import secrets
 from typing import Tuple
 
+from auth.esquemas_hash import esquema_configurado, necesita_rehash, verificar_hash
+
 
 class PasswordManager:
     """Gestor de contraseñas con hash seguro"""
@@ -15,23 +16,23 @@ class PasswordManager:
         """
         Generar hash seguro de una contraseña
 
+        Se usa el esquema configurado (HASH_ESQUEMA, ver auth.esquemas_hash).
+
         Args:
             password: Contraseña en texto plano
 
         Returns:
-            Hash de la contraseña con salt
+            Hash versionado de la contraseña con salt
         """
-        salt = secrets.token_hex(32)
-        password_hash = hashlib.pbkdf2_hmac(
-            "sha256", password.encode("utf-8"), salt.encode("utf-8"), 100000
-        )
-        return f"{salt}:{password_hash.hex()}"
+        return esquema_configurado().hashear(password)
 
     @staticmethod
     def verify_password(password: str, password_hash: str) -> bool:
         """
         Verificar si una contraseña coincide con su hash
 
+        Acepta cualquier esquema soportado y el formato original salt:hash.
+
         Args:
             password: Contraseña en texto plano
             password_hash: Hash almacenado
@@ -39,14 +40,55 @@ class PasswordManager:
         Returns:
             True si la contraseña es correcta, False en caso contrario
         """
-        try:
-            salt, hash_part = password_hash.split(":")
-            password_hash_check = hashlib.pbkdf2_hmac(
-                "sha256", password.encode("utf-8"), salt.encode("utf-8"), 100000
-            )
-            return password_hash_check.hex() == hash_part
-        except (ValueError, AttributeError):
-            return False
+        return verificar_hash(password, password_hash)
+
+    @staticmethod
+    def needs_rehash(password_hash: str) -> bool:
+        """
+        Indicar si un hash se generó con otro esquema o con otros costes
+
+        Args:
+            password_hash: Hash almacenado
+
+        Returns:
+            True si conviene recalcularlo con el esquema configurado
+        """
+        return necesita_rehash(password_hash)
+
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        """
+        Generar el hash de una contraseña en el pool de hash
+
+        No bloquea el event loop: el cálculo se hace en un hilo de pool_hash.
+
+        Args:
+            password: Contraseña en texto plano
+
+        Returns:
+            Hash de la contraseña con salt
+        """
+        from auth.pool_hash import pool_hash
+
+        return await pool_hash.ejecutar(PasswordManager.hash_password, password)
+
+    @staticmethod
+    async def verify_password_async(password: str, password_hash: str) -> bool:
+        """
+        Verificar una contraseña en el pool de hash
+
+        Args:
+            password: Contraseña en texto plano
+            password_hash: Hash almacenado
+
+        Returns:
+            True si la contraseña es correcta, False en caso contrario
+        """
+        from auth.pool_hash import pool_hash
+
+        return await pool_hash.ejecutar(
+            PasswordManager.verify_password, password, password_hash
+        )
 
     @staticmethod
     def validate_password_strength(password: str) -> Tuple[bool, str]:
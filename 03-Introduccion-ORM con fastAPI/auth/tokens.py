@@ -0,0 +1,277 @@
+"""
+Tokens de sesión firmados con HMAC-SHA256
+
+Formato compacto: base64url(datos JSON).base64url(firma). La firma cubre los
+datos, así que verificar un token no consulta la base de datos: basta un
+HMAC y la comprobación de la expiración.
+
+- Token de acceso (tipo "acceso"): vida corta, se envía en cada petición
+  como "Authorization: Bearer <token>".
+- Token de refresco (tipo "refresco"): vida larga, solo sirve en
+  POST /auth/refrescar. Lleva una huella del hash de la contraseña, así que
+  cambiar la contraseña invalida los refrescos emitidos antes.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+logger = logging.getLogger(__name__)
+
+TIPO_ACCESO = "acceso"
+TIPO_REFRESCO = "refresco"
+
+# Vida por defecto de cada tipo de token
+TOKEN_ACCESO_MINUTOS_DEFECTO = 15
+TOKEN_REFRESCO_DIAS_DEFECTO = 7
+
+
+class TokenInvalido(ValueError):
+    """El token está mal formado, su firma no coincide o ya expiró"""
+
+
+def _entero_positivo_env(nombre: str, por_defecto: int) -> int:
+    """
+    Leer una variable de entorno entera mayor o igual a 1
+
+    Raises:
+        ValueError: Si el valor no es un entero positivo
+    """
+    valor = os.getenv(nombre, "").strip()
+    if not valor:
+        return por_defecto
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ValueError(f"La variable {nombre} debe ser un número entero")
+    if numero < 1:
+        raise ValueError(f"{nombre} debe ser mayor o igual a 1")
+    return numero
+
+
+def _b64(datos: bytes) -> str:
+    return base64.urlsafe_b64encode(datos).decode().rstrip("=")
+
+
+def _desde_b64(texto: str) -> bytes:
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+@dataclass(frozen=True)
+class SesionToken:
+    """Datos de un token de acceso verificado"""
+
+    usuario_id: UUID
+    nombre_usuario: str
+    es_admin: bool
+    expira: int
+
+
+class FirmadorTokens:
+    """Emite y verifica tokens de acceso y de refresco"""
+
+    def __init__(
+        self,
+        secreto: bytes,
+        acceso_segundos: int = TOKEN_ACCESO_MINUTOS_DEFECTO * 60,
+        refresco_segundos: int = TOKEN_REFRESCO_DIAS_DEFECTO * 86400,
+    ):
+        self._secreto = secreto
+        self.acceso_segundos = acceso_segundos
+        self.refresco_segundos = refresco_segundos
+
+    @classmethod
+    def desde_entorno(cls) -> "FirmadorTokens":
+        """
+        Crear el firmador con TOKEN_SECRETO, TOKEN_ACCESO_MINUTOS y
+        TOKEN_REFRESCO_DIAS
+
+        Sin TOKEN_SECRETO cada proceso tendría su propio secreto y un token
+        emitido por un worker no valdría en los demás, así que se exige.
+        Solo con TOKEN_SECRETO_TEMPORAL=1 (pruebas, desarrollo con un único
+        proceso) se usa un secreto aleatorio.
+
+        Raises:
+            ValueError: Si falta TOKEN_SECRETO o una duración no es válida
+        """
+        secreto = os.getenv("TOKEN_SECRETO", "").strip()
+        if not secreto:
+            if os.getenv("TOKEN_SECRETO_TEMPORAL", "").strip() != "1":
+                raise ValueError(
+                    "Se requiere TOKEN_SECRETO (común a todos los workers); "
+                    "TOKEN_SECRETO_TEMPORAL=1 usa un secreto aleatorio por proceso"
+                )
+            logger.warning(
+                "TOKEN_SECRETO no está configurado; se usa un secreto temporal"
+            )
+            secreto = secrets.token_urlsafe(32)
+        return cls(
+            secreto.encode("utf-8"),
+            _entero_positivo_env("TOKEN_ACCESO_MINUTOS", TOKEN_ACCESO_MINUTOS_DEFECTO)
+            * 60,
+            _entero_positivo_env("TOKEN_REFRESCO_DIAS", TOKEN_REFRESCO_DIAS_DEFECTO)
+            * 86400,
+        )
+
+    def _firma(self, datos: bytes) -> bytes:
+        return hmac.new(self._secreto, datos, hashlib.sha256).digest()
+
+    def huella_contraseña(self, contraseña_hash: str) -> str:
+        """Huella corta del hash de la contraseña para los tokens de refresco"""
+        return _b64(self._firma(contraseña_hash.encode("utf-8"))[:12])
+
+    def _emitir(self, datos: dict) -> str:
+        cuerpo = _b64(json.dumps(datos, separators=(",", ":")).encode("utf-8"))
+        return f"{cuerpo}.{_b64(self._firma(cuerpo.encode('ascii')))}"
+
+    def emitir_acceso(self, usuario, ahora: Optional[int] = None) -> str:
+        """
+        Emitir un token de acceso para un usuario
+
+        Args:
+            usuario: Usuario autenticado
+            ahora: Marca de tiempo (segundos) de emisión, por defecto la actual
+
+        Returns:
+            Token firmado
+        """
+        ahora = int(time.time()) if ahora is None else ahora
+        return self._emitir(
+            {
+                "sub": str(usuario.id),
+                "usr": usuario.nombre_usuario,
+                "adm": bool(usuario.es_admin),
+                "typ": TIPO_ACCESO,
+                "exp": ahora + self.acceso_segundos,
+            }
+        )
+
+    def emitir_refresco(self, usuario, ahora: Optional[int] = None) -> str:
+        """
+        Emitir un token de refresco para un usuario
+
+        Args:
+            usuario: Usuario autenticado
+            ahora: Marca de tiempo (segundos) de emisión, por defecto la actual
+
+        Returns:
+            Token firmado
+        """
+        ahora = int(time.time()) if ahora is None else ahora
+        return self._emitir(
+            {
+                "sub": str(usuario.id),
+                "typ": TIPO_REFRESCO,
+                "pwd": self.huella_contraseña(usuario.contraseña_hash),
+                "exp": ahora + self.refresco_segundos,
+            }
+        )
+
+    def verificar(self, token: str, tipo: str, ahora: Optional[int] = None) -> dict:
+        """
+        Comprobar la firma, el tipo y la expiración de un token
+
+        Args:
+            token: Token recibido del cliente
+            tipo: TIPO_ACCESO o TIPO_REFRESCO
+            ahora: Marca de tiempo (segundos) de referencia
+
+        Returns:
+            Datos del token
+
+        Raises:
+            TokenInvalido: Si el token no es válido para ese tipo o expiró
+        """
+        try:
+            cuerpo, firma = token.split(".")
+            valida = hmac.compare_digest(
+                _desde_b64(firma), self._firma(cuerpo.encode("ascii"))
+            )
+            if not valida:
+                raise TokenInvalido("La firma del token no es válida")
+            datos = json.loads(_desde_b64(cuerpo))
+            expira = int(datos["exp"])
+            UUID(datos["sub"])
+        except TokenInvalido:
+            raise
+        except (binascii.Error, ValueError, TypeError, KeyError, UnicodeError):
+            raise TokenInvalido("El token está mal formado")
+
+        if datos.get("typ") != tipo:
+            raise TokenInvalido("El tipo de token no es válido")
+        ahora = int(time.time()) if ahora is None else ahora
+        if expira <= ahora:
+            raise TokenInvalido("El token expiró")
+        return datos
+
+    def verificar_acceso(self, token: str) -> SesionToken:
+        """
+        Verificar un token de acceso sin consultar la base de datos
+
+        Raises:
+            TokenInvalido: Si el token no es válido o expiró
+        """
+        datos = self.verificar(token, TIPO_ACCESO)
+        return SesionToken(
+            usuario_id=UUID(datos["sub"]),
+            nombre_usuario=datos.get("usr", ""),
+            es_admin=bool(datos.get("adm")),
+            expira=int(datos["exp"]),
+        )
+
+
+firmador_tokens = FirmadorTokens.desde_entorno()
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def obtener_sesion(
+    credenciales: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> SesionToken:
+    """
+    Dependencia de FastAPI que exige un token de acceso válido
+
+    Raises:
+        HTTPException: 401 si falta el token o no es válido
+    """
+    if credenciales is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Se requiere un token de acceso",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        return firmador_tokens.verificar_acceso(credenciales.credentials)
+    except TokenInvalido as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def obtener_sesion_admin(sesion: SesionToken = Depends(obtener_sesion)) -> SesionToken:
+    """
+    Dependencia de FastAPI que exige un token de acceso de administrador
+
+    Raises:
+        HTTPException: 403 si el usuario del token no es administrador
+    """
+    if not sesion.es_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Se requieren permisos de administrador",
+        )
+    return sesion
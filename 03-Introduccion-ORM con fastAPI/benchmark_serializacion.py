@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Script para comparar los caminos de serialización de los listados
+
+Mide una página de productos (consulta + JSON) de tres formas:
+
+- orm+pydantic+json: entidades ORM validadas con ProductoResponse y
+  codificadas con json (el camino por defecto de FastAPI).
+- orm+pydantic+orjson: lo mismo con ORJSONResponse como clase por defecto.
+- filas+orjson: tuplas de columnas codificadas directamente
+  (LISTADOS_DESDE_FILAS).
+
+Por defecto usa una base SQLite en memoria con datos generados, así que
+mide sobre todo el coste en CPU de Python; con --url se mide contra otra
+base de datos que ya tenga productos.
+
+Uso:
+    python benchmark_serializacion.py --filas 100 --repeticiones 200
+    python benchmark_serializacion.py --url postgresql://... --filas 100
+"""
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import orjson
+from apis.serializacion import codificar
+from crud.producto_crud import COLUMNAS_RESPUESTA, ProductoCRUD
+from database.config import Base
+from entities.categoria import Categoria  # noqa: F401 (tablas de las FK)
+from entities.producto import Producto
+from entities.usuario import Usuario  # noqa: F401
+from fastapi.encoders import jsonable_encoder
+from schemas import ProductoResponse
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+
+@compiles(UUID, "sqlite")
+def _uuid_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+
+def preparar_sqlite(total: int):
+    """Crear una base SQLite en memoria con total productos"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    categoria_id, usuario_id = uuid.uuid4(), uuid.uuid4()
+    inicio = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conexion:
+        conexion.execute(
+            insert(Producto),
+            [
+                {
+                    "id_producto": uuid.uuid4(),
+                    "nombre": f"Producto {i}",
+                    "descripcion": f"Descripción del producto {i}",
+                    "precio": 10 + i % 100,
+                    "stock": i % 50,
+                    "categoria_id": categoria_id,
+                    "usuario_id": usuario_id,
+                    "id_usuario_crea": usuario_id,
+                    "fecha_creacion": inicio + timedelta(seconds=i),
+                }
+                for i in range(total)
+            ],
+        )
+    return engine
+
+
+def _orm_pydantic(crud: ProductoCRUD, filas: int, codificador) -> bytes:
+    productos, _ = crud.obtener_productos_pagina(limit=filas)
+    contenido = jsonable_encoder(
+        [ProductoResponse.model_validate(producto) for producto in productos]
+    )
+    return codificador(contenido)
+
+
+def _json(contenido) -> bytes:
+    # Mismos argumentos que JSONResponse.render
+    return json.dumps(
+        contenido, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _filas(crud: ProductoCRUD, filas: int) -> bytes:
+    productos, _ = crud.obtener_productos_pagina(limit=filas, filas=True)
+    return codificar([dict(zip(COLUMNAS_RESPUESTA, fila)) for fila in productos])
+
+
+CAMINOS = {
+    "orm+pydantic+json": lambda crud, filas: _orm_pydantic(crud, filas, _json),
+    "orm+pydantic+orjson": lambda crud, filas: _orm_pydantic(crud, filas, orjson.dumps),
+    "filas+orjson": _filas,
+}
+
+
+def medir(engine, camino: str, filas: int, repeticiones: int) -> dict:
+    """
+    Medir un camino de serialización
+
+    Cada repetición usa una sesión nueva, como una petición.
+
+    Returns:
+        Diccionario con la mediana y el p95 en ms y el tamaño del cuerpo
+    """
+    funcion = CAMINOS[camino]
+    tiempos = []
+    for _ in range(repeticiones):
+        with Session(engine) as sesion:
+            inicio = time.perf_counter()
+            cuerpo = funcion(ProductoCRUD(sesion), filas)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        "mediana_ms": statistics.median(tiempos),
+        "p95_ms": tiempos[int(len(tiempos) * 0.95) - 1],
+        "bytes": len(cuerpo),
+    }
+
+
+def main():
+    """Funcion principal"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, default=100, help="Filas por página")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument(
+        "--url",
+        help="Base de datos con productos (por defecto SQLite en memoria)",
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.url) if args.url else preparar_sqlite(args.filas)
+
+    # Calentamiento: compilación de consultas y caché de Pydantic
+    for camino in CAMINOS:
+        medir(engine, camino, args.filas, 5)
+
+    resultados = {
+        camino: medir(engine, camino, args.filas, args.repeticiones)
+        for camino in CAMINOS
+    }
+    base = resultados["orm+pydantic+json"]["mediana_ms"]
+    print(f"Página de {args.filas} productos, {args.repeticiones} repeticiones\n")
+    print(f"{'camino':<22}{'mediana ms':>12}{'p95 ms':>10}{'bytes':>9}{'x':>7}")
+    for camino, datos in resultados.items():
+        print(
+            f"{camino:<22}{datos['mediana_ms']:>12.3f}{datos['p95_ms']:>10.3f}"
+            f"{datos['bytes']:>9}{base / datos['mediana_ms']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
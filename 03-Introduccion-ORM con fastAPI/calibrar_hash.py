@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Script para calibrar el coste del hash de contraseñas en este equipo
+
+Mide PBKDF2 y scrypt y propone los parámetros con los que una verificación
+tarda aproximadamente el tiempo objetivo. Las variables resultantes se
+copian al archivo .env del despliegue.
+
+Uso:
+    python calibrar_hash.py --objetivo-ms 250
+    python calibrar_hash.py --esquema scrypt --max-memoria-mb 32
+"""
+
+import argparse
+
+from auth.esquemas_hash import (
+    PBKDF2,
+    SCRYPT,
+    calibrar_pbkdf2,
+    calibrar_scrypt,
+    medir_ms,
+    variables_entorno,
+)
+
+
+def main():
+    """Funcion principal"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--objetivo-ms",
+        type=float,
+        default=250,
+        help="Latencia deseada por verificación (ms)",
+    )
+    parser.add_argument("--esquema", choices=[PBKDF2, SCRYPT, "todos"], default="todos")
+    parser.add_argument(
+        "--max-memoria-mb",
+        type=int,
+        default=64,
+        help="Memoria máxima de scrypt por verificación (MB)",
+    )
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    esquemas = []
+    if args.esquema in (PBKDF2, "todos"):
+        esquemas.append(calibrar_pbkdf2(args.objetivo_ms, args.repeticiones))
+    if args.esquema in (SCRYPT, "todos"):
+        esquemas.append(
+            calibrar_scrypt(
+                args.objetivo_ms,
+                max_memoria_mb=args.max_memoria_mb,
+                repeticiones=args.repeticiones,
+            )
+        )
+
+    print(f"Objetivo: {args.objetivo_ms:.0f} ms por verificación\n")
+    for esquema in esquemas:
+        print(
+            f"=== {esquema.nombre} ({medir_ms(esquema, args.repeticiones):.0f} ms) ==="
+        )
+        for nombre, valor in variables_entorno(esquema).items():
+            print(f"{nombre}={valor}")
+        print()
+    print(
+        "Ten en cuenta HASH_WORKERS: cada hilo de hash ocupa un núcleo durante "
+        "la verificación."
+    )
+
+
+if __name__ == "__main__":
+    main()
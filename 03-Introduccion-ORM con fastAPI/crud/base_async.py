@@ -0,0 +1,38 @@
+"""
+Base para las variantes asíncronas de las clases CRUD
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class CRUDAsyncBase:
+    """
+    Adaptador asíncrono sobre una clase CRUD síncrona
+
+    Cada operación se ejecuta con AsyncSession.run_sync, de modo que las
+    validaciones y consultas viven en un solo lugar (la clase síncrona) y la
+    E/S pasa por el driver asíncrono (asyncpg) sin bloquear el event loop.
+    """
+
+    crud_sync = None
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _ejecutar(self, metodo: str, *args, **kwargs):
+        """
+        Ejecutar un método de la clase CRUD síncrona sobre la sesión asíncrona
+
+        Args:
+            metodo: Nombre del método de la clase CRUD síncrona
+            *args: Argumentos posicionales del método
+            **kwargs: Argumentos con nombre del método
+
+        Returns:
+            El resultado del método síncrono
+        """
+
+        def _llamar(sesion):
+            return getattr(self.crud_sync(sesion), metodo)(*args, **kwargs)
+
+        return await self.db.run_sync(_llamar)
@@ -2,17 +2,126 @@
 Operaciones CRUD para Categoría
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
 from uuid import UUID
 
+from crud.base_async import CRUDAsyncBase
+from crud.escritura import actualizar_returning
+from crud.paginacion import (
+    MAX_TAMANO_PAGINA,
+    codificar_cursor,
+    filtro_cursor,
+    paginar_keyset,
+    validar_limite,
+)
+from crud.versiones import version_coleccion
+from database.cache import CacheTTL, CanalInvalidacion
+from database.routing import CLAVE_ESCRITO, CLAVE_PRIMARIO, en_primario, solo_lectura
 from entities.categoria import Categoria
-from sqlalchemy.orm import Session
+from entities.producto import Producto
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+# Caché de categorías por proceso (CACHE_CATEGORIAS_TTL, CACHE_CATEGORIAS_MAX)
+cache_categorias = CacheTTL.desde_entorno(
+    "CACHE_CATEGORIAS", ttl_defecto=60, max_defecto=1000
+)
+
+# Aviso a los demás workers cuando cambia la tabla categorias
+canal_categorias = CanalInvalidacion("categorias_cambios")
+canal_categorias.suscribir(cache_categorias.invalidar)
+
+# Crear o borrar la tabla (migraciones, pruebas) también invalida la caché
+event.listen(
+    Categoria.__table__,
+    "after_create",
+    lambda *args, **kw: cache_categorias.invalidar(),
+)
+event.listen(
+    Categoria.__table__, "after_drop", lambda *args, **kw: cache_categorias.invalidar()
+)
+
+_COLUMNAS = tuple(columna.key for columna in Categoria.__table__.columns)
+
+# Productos de muestra por categoría en el resumen (por defecto y máximo)
+MUESTRAS_RESUMEN = 3
+MAX_MUESTRAS_RESUMEN = 10
+
+# Columnas de cada producto de muestra del resumen
+COLUMNAS_MUESTRA = ("id_producto", "nombre", "precio", "stock")
+
+
+def _instantanea(categoria: Categoria) -> dict:
+    """Copia de las columnas de una categoría para guardarla en la caché"""
+    return {columna: getattr(categoria, columna) for columna in _COLUMNAS}
 
 
 class CategoriaCRUD:
     def __init__(self, db: Session):
         self.db = db
 
+    def _admite_cache(self) -> bool:
+        """
+        Indicar si las lecturas pueden servirse desde la caché
+
+        Las lecturas de validación de una escritura (@en_primario o petición
+        POST/PUT/DELETE) y las posteriores a escribir van a la base de datos.
+        """
+        info = self.db.info
+        return (
+            cache_categorias.activa
+            and info.get(CLAVE_PRIMARIO, 0) == 0
+            and not info.get(CLAVE_ESCRITO, False)
+        )
+
+    def _desde_cache(self, datos: dict) -> Categoria:
+        """Incorporar a la sesión una categoría de la caché sin consultar la BD"""
+        categoria = Categoria(**datos)
+        make_transient_to_detached(categoria)
+        return self.db.merge(categoria, load=False)
+
+    def _cacheado(self, clave: Hashable, consulta: Callable, a_cache, desde_cache):
+        """
+        Resolver una lectura con la caché y guardarla si hubo que consultar
+
+        Args:
+            clave: Clave de la caché
+            consulta: Función que lee de la base de datos
+            a_cache: Convierte el resultado en un valor inmutable
+            desde_cache: Convierte el valor guardado en el resultado
+
+        Returns:
+            El resultado de la lectura (los None no se guardan)
+        """
+        if not self._admite_cache():
+            return consulta()
+        encontrado, valor = cache_categorias.obtener(clave)
+        if encontrado:
+            return desde_cache(valor)
+        generacion = cache_categorias.generacion
+        resultado = consulta()
+        if resultado is not None:
+            cache_categorias.guardar(clave, a_cache(resultado), generacion)
+        return resultado
+
+    def _lista_a_cache(self, categorias: List[Categoria]) -> tuple:
+        return tuple(_instantanea(categoria) for categoria in categorias)
+
+    def _lista_desde_cache(self, datos: tuple) -> List[Categoria]:
+        return [self._desde_cache(fila) for fila in datos]
+
+    def _confirmar_cambio(self):
+        """
+        Confirmar una escritura de categorías e invalidar las cachés
+
+        El aviso a los demás workers viaja en la misma transacción.
+        """
+        canal_categorias.publicar(self.db)
+        self.db.commit()
+        cache_categorias.invalidar()
+
+    @en_primario
     def crear_categoria(
         self, nombre: str, descripcion: str = None, id_usuario_crea: UUID = None
     ) -> Categoria:
@@ -47,7 +156,7 @@ class CategoriaCRUD:
                 raise ValueError(
                     "No se encontró un usuario administrador para crear la categoría"
                 )
-            id_usuario_crea = admin.id_usuario
+            id_usuario_crea = admin.id
 
         categoria = Categoria(
             nombre=nombre.strip(),
@@ -55,10 +164,10 @@ class CategoriaCRUD:
             id_usuario_crea=id_usuario_crea,
         )
         self.db.add(categoria)
-        self.db.commit()
-        self.db.refresh(categoria)
+        self._confirmar_cambio()
         return categoria
 
+    @solo_lectura
     def obtener_categoria(self, categoria_id: UUID) -> Optional[Categoria]:
         """
         Obtener una categoría por ID
@@ -69,12 +178,16 @@ class CategoriaCRUD:
         Returns:
             Categoría encontrada o None
         """
-        return (
-            self.db.query(Categoria)
+        return self._cacheado(
+            ("id", categoria_id),
+            lambda: self.db.query(Categoria)
             .filter(Categoria.id_categoria == categoria_id)
-            .first()
+            .first(),
+            _instantanea,
+            self._desde_cache,
         )
 
+    @solo_lectura
     def obtener_categoria_por_nombre(self, nombre: str) -> Optional[Categoria]:
         """
         Obtener una categoría por nombre
@@ -85,10 +198,15 @@ class CategoriaCRUD:
         Returns:
             Categoría encontrada o None
         """
-        return (
-            self.db.query(Categoria).filter(Categoria.nombre == nombre.strip()).first()
+        nombre = nombre.strip()
+        return self._cacheado(
+            ("nombre", nombre),
+            lambda: self.db.query(Categoria).filter(Categoria.nombre == nombre).first(),
+            _instantanea,
+            self._desde_cache,
         )
 
+    @solo_lectura
     def obtener_categorias(self, skip: int = 0, limit: int = 100) -> List[Categoria]:
         """
         Obtener lista de categorías con paginación
@@ -100,8 +218,211 @@ class CategoriaCRUD:
         Returns:
             Lista de categorías
         """
-        return self.db.query(Categoria).offset(skip).limit(limit).all()
+        return self._cacheado(
+            ("lista", skip, limit),
+            lambda: self.db.query(Categoria).offset(skip).limit(limit).all(),
+            self._lista_a_cache,
+            self._lista_desde_cache,
+        )
+
+    @solo_lectura
+    def obtener_categorias_pagina(
+        self, cursor: Optional[str] = None, limit: int = MAX_TAMANO_PAGINA
+    ) -> Tuple[List[Categoria], Optional[str]]:
+        """
+        Obtener una página de categorias con paginación por cursor
+
+        Args:
+            cursor: Cursor devuelto por la página anterior (None = primera)
+            limit: Tamaño de página (máximo MAX_TAMANO_PAGINA)
+
+        Returns:
+            Tupla (lista de categorías, cursor de la siguiente página o None)
+
+        Raises:
+            ValueError: Si el cursor o el límite no son válidos
+        """
+        return self._cacheado(
+            ("pagina", cursor, limit),
+            lambda: paginar_keyset(
+                self.db.query(Categoria),
+                Categoria.fecha_creacion,
+                Categoria.id_categoria,
+                cursor,
+                limit,
+            ),
+            lambda pagina: (self._lista_a_cache(pagina[0]), pagina[1]),
+            lambda datos: (self._lista_desde_cache(datos[0]), datos[1]),
+        )
+
+    @solo_lectura
+    def obtener_resumen_categorias(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = MAX_TAMANO_PAGINA,
+        muestras: int = MUESTRAS_RESUMEN,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Obtener una página de categorías con sus totales y productos de muestra
+
+        Una sola consulta: la página de categorías (CTE con paginación por
+        cursor) unida a los productos de esas categorías numerados con
+        row_number() por categoría, del más reciente al más antiguo. count()
+        y sum() sobre la misma partición dan los totales, así que solo se
+        leen muestras filas por categoría aunque tenga miles de productos.
+
+        No se guarda en la caché de categorías: depende también de productos.
+
+        Args:
+            cursor: Cursor devuelto por la página anterior (None = primera)
+            limit: Tamaño de página (máximo MAX_TAMANO_PAGINA)
+            muestras: Productos de muestra por categoría (0..MAX_MUESTRAS_RESUMEN)
+
+        Returns:
+            Tupla (lista de diccionarios con las columnas de la categoría,
+            total_productos, stock_total y productos, cursor de la siguiente
+            página o None)
+
+        Raises:
+            ValueError: Si el cursor, el límite o muestras no son válidos
+        """
+        validar_limite(limit)
+        if muestras < 0 or muestras > MAX_MUESTRAS_RESUMEN:
+            raise ValueError(
+                f"Las muestras deben estar entre 0 y {MAX_MUESTRAS_RESUMEN}"
+            )
+
+        pagina = select(Categoria)
+        if cursor:
+            pagina = pagina.where(
+                filtro_cursor(Categoria.fecha_creacion, Categoria.id_categoria, cursor)
+            )
+        pagina = (
+            pagina.order_by(Categoria.fecha_creacion, Categoria.id_categoria)
+            .limit(limit + 1)
+            .cte("pagina")
+        )
 
+        particion = Producto.categoria_id
+        ranking = (
+            select(
+                Producto.categoria_id,
+                *(
+                    getattr(Producto, columna).label(f"producto_{columna}")
+                    for columna in COLUMNAS_MUESTRA
+                ),
+                func.row_number()
+                .over(
+                    partition_by=particion,
+                    order_by=(
+                        Producto.fecha_creacion.desc(),
+                        Producto.id_producto.desc(),
+                    ),
+                )
+                .label("posicion"),
+                func.count().over(partition_by=particion).label("total_productos"),
+                func.sum(func.coalesce(Producto.stock, 0))
+                .over(partition_by=particion)
+                .label("stock_total"),
+            )
+            .where(Producto.categoria_id.in_(select(pagina.c.id_categoria)))
+            .subquery("ranking")
+        )
+
+        # Con muestras=0 se une igualmente la primera fila, que trae los totales
+        consulta = (
+            select(
+                *(pagina.c[columna] for columna in _COLUMNAS),
+                ranking.c.total_productos,
+                ranking.c.stock_total,
+                ranking.c.posicion,
+                *(ranking.c[f"producto_{columna}"] for columna in COLUMNAS_MUESTRA),
+            )
+            .outerjoin(
+                ranking,
+                and_(
+                    ranking.c.categoria_id == pagina.c.id_categoria,
+                    ranking.c.posicion <= max(muestras, 1),
+                ),
+            )
+            .order_by(
+                pagina.c.fecha_creacion, pagina.c.id_categoria, ranking.c.posicion
+            )
+        )
+
+        resumen: Dict[UUID, Dict] = {}
+        for fila in self.db.execute(consulta).mappings():
+            categoria = resumen.get(fila["id_categoria"])
+            if categoria is None:
+                categoria = {columna: fila[columna] for columna in _COLUMNAS}
+                categoria["total_productos"] = fila["total_productos"] or 0
+                categoria["stock_total"] = fila["stock_total"] or 0
+                categoria["productos"] = []
+                resumen[fila["id_categoria"]] = categoria
+            if fila["posicion"] is not None and fila["posicion"] <= muestras:
+                categoria["productos"].append(
+                    {
+                        columna: fila[f"producto_{columna}"]
+                        for columna in COLUMNAS_MUESTRA
+                    }
+                )
+
+        categorias = list(resumen.values())
+        if len(categorias) <= limit:
+            return categorias, None
+        categorias = categorias[:limit]
+        ultima = categorias[-1]
+        return categorias, codificar_cursor(
+            ultima["fecha_creacion"], ultima["id_categoria"]
+        )
+
+    @solo_lectura
+    def version_categorias(self) -> Tuple[int, Optional[datetime]]:
+        """
+        Obtener el número de categorías y su última modificación
+
+        Returns:
+            Tupla (número de categorías, última fecha de edición o creación)
+        """
+        return self._cacheado(
+            ("version",),
+            lambda: version_coleccion(self.db, Categoria),
+            tuple,
+            tuple,
+        )
+
+    def categorias_existentes(self, categoria_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Comprobar qué categorías existen, usando la caché cuando es posible
+
+        A diferencia de las demás lecturas, se consulta la caché también
+        dentro de una escritura: la clave foránea de productos.categoria_id
+        rechaza igualmente una categoría borrada hace instantes en otro worker.
+
+        Args:
+            categoria_ids: UUIDs a comprobar
+
+        Returns:
+            Conjunto de los UUIDs que existen
+        """
+        existentes, pendientes = set(), set()
+        for categoria_id in set(categoria_ids):
+            encontrado, _ = cache_categorias.obtener(("id", categoria_id))
+            (existentes if encontrado else pendientes).add(categoria_id)
+        if not pendientes:
+            return existentes
+
+        generacion = cache_categorias.generacion
+        for categoria in self.db.scalars(
+            select(Categoria).where(Categoria.id_categoria.in_(pendientes))
+        ):
+            existentes.add(categoria.id_categoria)
+            cache_categorias.guardar(
+                ("id", categoria.id_categoria), _instantanea(categoria), generacion
+            )
+        return existentes
+
+    @en_primario
     def actualizar_categoria(
         self, categoria_id: UUID, id_usuario_edita: UUID = None, **kwargs
     ) -> Optional[Categoria]:
@@ -119,21 +440,14 @@ class CategoriaCRUD:
         Raises:
             ValueError: Si los datos no son válidos
         """
-        categoria = self.obtener_categoria(categoria_id)
-        if not categoria:
-            return None
-
         if "nombre" in kwargs:
             nombre = kwargs["nombre"]
             if not nombre or len(nombre.strip()) == 0:
                 raise ValueError("El nombre de la categoría es obligatorio")
             if len(nombre) > 100:
                 raise ValueError("El nombre no puede exceder 100 caracteres")
-            if (
-                self.obtener_categoria_por_nombre(nombre)
-                and self.obtener_categoria_por_nombre(nombre).id_categoria
-                != categoria_id
-            ):
+            existente = self.obtener_categoria_por_nombre(nombre)
+            if existente and existente.id_categoria != categoria_id:
                 raise ValueError("Ya existe una categoría con ese nombre")
             kwargs["nombre"] = nombre.strip()
 
@@ -148,17 +462,21 @@ class CategoriaCRUD:
                 raise ValueError(
                     "No se encontró un usuario administrador para editar la categoría"
                 )
-            id_usuario_edita = admin.id_usuario
+            id_usuario_edita = admin.id
 
-        categoria.id_usuario_edita = id_usuario_edita
-
-        for key, value in kwargs.items():
-            if hasattr(categoria, key):
-                setattr(categoria, key, value)
-        self.db.commit()
-        self.db.refresh(categoria)
+        categoria = actualizar_returning(
+            self.db,
+            Categoria,
+            Categoria.id_categoria == categoria_id,
+            {**kwargs, "id_usuario_edita": id_usuario_edita},
+        )
+        if categoria is None:
+            self.db.rollback()
+            return None
+        self._confirmar_cambio()
         return categoria
 
+    @en_primario
     def eliminar_categoria(self, categoria_id: UUID) -> bool:
         """
         Eliminar una categoría
@@ -172,6 +490,69 @@ class CategoriaCRUD:
         categoria = self.obtener_categoria(categoria_id)
         if categoria:
             self.db.delete(categoria)
-            self.db.commit()
+            self._confirmar_cambio()
             return True
         return False
+
+
+class CategoriaCRUDAsync(CRUDAsyncBase):
+    """Variante asíncrona de CategoriaCRUD sobre AsyncSession"""
+
+    crud_sync = CategoriaCRUD
+
+    async def crear_categoria(
+        self, nombre: str, descripcion: str = None, id_usuario_crea: UUID = None
+    ) -> Categoria:
+        """Crear una nueva categoría (ver CategoriaCRUD.crear_categoria)"""
+        return await self._ejecutar(
+            "crear_categoria", nombre, descripcion, id_usuario_crea
+        )
+
+    async def obtener_categoria(self, categoria_id: UUID) -> Optional[Categoria]:
+        """Obtener una categoría por ID"""
+        return await self._ejecutar("obtener_categoria", categoria_id)
+
+    async def obtener_categoria_por_nombre(self, nombre: str) -> Optional[Categoria]:
+        """Obtener una categoría por nombre"""
+        return await self._ejecutar("obtener_categoria_por_nombre", nombre)
+
+    async def obtener_categorias(
+        self, skip: int = 0, limit: int = 100
+    ) -> List[Categoria]:
+        """Obtener lista de categorías con paginación"""
+        return await self._ejecutar("obtener_categorias", skip=skip, limit=limit)
+
+    async def obtener_categorias_pagina(
+        self, cursor: Optional[str] = None, limit: int = MAX_TAMANO_PAGINA
+    ) -> Tuple[List[Categoria], Optional[str]]:
+        """Obtener una página de categorias con paginación por cursor"""
+        return await self._ejecutar(
+            "obtener_categorias_pagina", cursor=cursor, limit=limit
+        )
+
+    async def obtener_resumen_categorias(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = MAX_TAMANO_PAGINA,
+        muestras: int = MUESTRAS_RESUMEN,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Obtener categorías con totales y productos de muestra en una consulta"""
+        return await self._ejecutar(
+            "obtener_resumen_categorias", cursor=cursor, limit=limit, muestras=muestras
+        )
+
+    async def version_categorias(self) -> Tuple[int, Optional[datetime]]:
+        """Obtener el número de categorías y su última modificación"""
+        return await self._ejecutar("version_categorias")
+
+    async def actualizar_categoria(
+        self, categoria_id: UUID, id_usuario_edita: UUID = None, **kwargs
+    ) -> Optional[Categoria]:
+        """Actualizar una categoría (ver CategoriaCRUD.actualizar_categoria)"""
+        return await self._ejecutar(
+            "actualizar_categoria", categoria_id, id_usuario_edita, **kwargs
+        )
+
+    async def eliminar_categoria(self, categoria_id: UUID) -> bool:
+        """Eliminar una categoría"""
+        return await self._ejecutar("eliminar_categoria", categoria_id)
@@ -0,0 +1,40 @@
+"""
+Escrituras en un solo viaje a la base de datos (INSERT/UPDATE ... RETURNING)
+"""
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, inspect, update
+
+
+def actualizar_returning(
+    db, entidad, condicion, valores: Dict[str, Any]
+) -> Optional[Any]:
+    """
+    Actualizar una fila sin leerla antes y devolverla ya actualizada
+
+    Ejecuta "UPDATE ... SET valores, fecha_edicion = now() WHERE condicion
+    RETURNING *". fecha_edicion se fija de forma explícita porque la usan los
+    validadores de los listados (ETag). Si la entidad ya estaba en la sesión
+    se sobrescribe con los valores devueltos.
+
+    Args:
+        db: Sesión síncrona
+        entidad: Clase ORM con fecha_edicion
+        condicion: Filtro de la fila (normalmente por clave primaria)
+        valores: Columnas a actualizar (se ignoran las claves que no son
+            columnas mapeadas: relaciones, propiedades o métodos)
+
+    Returns:
+        La entidad actualizada, o None si ninguna fila cumple la condición
+    """
+    columnas = inspect(entidad).column_attrs.keys()
+    valores = {clave: valor for clave, valor in valores.items() if clave in columnas}
+    sentencia = (
+        update(entidad)
+        .where(condicion)
+        .values(**valores, fecha_edicion=func.now())
+        .returning(entidad)
+        .execution_options(populate_existing=True)
+    )
+    return db.execute(sentencia).scalar_one_or_none()
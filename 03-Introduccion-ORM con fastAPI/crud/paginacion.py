@@ -0,0 +1,138 @@
+"""
+Paginación por cursor (keyset) sobre (fecha_creacion, clave primaria)
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select
+
+# Tamaño máximo de página aceptado por los endpoints de listado
+MAX_TAMANO_PAGINA = 100
+
+# Cabecera HTTP con el cursor de la página siguiente
+CABECERA_SIGUIENTE_CURSOR = "X-Next-Cursor"
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido no es un token de paginación válido"""
+
+
+def codificar_cursor(fecha: Optional[datetime], clave: UUID) -> str:
+    """
+    Crear el token opaco que apunta a la última fila de una página
+
+    Args:
+        fecha: fecha_creacion de la última fila
+        clave: Clave primaria de la última fila
+
+    Returns:
+        Cursor en base64 url-safe
+    """
+    datos = json.dumps([fecha.isoformat() if fecha else None, str(clave)])
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[Optional[datetime], UUID]:
+    """
+    Leer un cursor creado con codificar_cursor
+
+    Args:
+        cursor: Token recibido del cliente
+
+    Returns:
+        Tupla (fecha_creacion, clave primaria)
+
+    Raises:
+        CursorInvalido: Si el token está mal formado
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, clave = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return (datetime.fromisoformat(fecha) if fecha else None, UUID(clave))
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise CursorInvalido("El cursor de paginación no es válido")
+
+
+def validar_limite(limit: int) -> int:
+    """
+    Comprobar el tamaño de página solicitado
+
+    Raises:
+        ValueError: Si el límite está fuera de 1..MAX_TAMANO_PAGINA
+    """
+    if limit < 1 or limit > MAX_TAMANO_PAGINA:
+        raise ValueError(
+            f"El límite debe estar entre 1 y {MAX_TAMANO_PAGINA} registros"
+        )
+    return limit
+
+
+def filtro_cursor(columna_fecha, columna_clave, cursor: str):
+    """
+    Condición "(fecha, clave) > posición del cursor" para la página siguiente
+
+    Args:
+        columna_fecha: Columna fecha_creacion de la entidad
+        columna_clave: Columna de clave primaria de la entidad
+        cursor: Token de la página anterior
+
+    Raises:
+        CursorInvalido: Si el cursor está mal formado
+    """
+    fecha, clave = decodificar_cursor(cursor)
+    # La fecha se vuelve a leer por clave primaria para compararla con el
+    # mismo formato que tiene almacenado; la del cursor solo se usa si la
+    # fila ya no existe
+    fecha_cursor = func.coalesce(
+        select(columna_fecha).where(columna_clave == clave).scalar_subquery(),
+        fecha,
+    )
+    return or_(
+        columna_fecha > fecha_cursor,
+        and_(columna_fecha == fecha_cursor, columna_clave > clave),
+    )
+
+
+def paginar_keyset(
+    query, columna_fecha, columna_clave, cursor: Optional[str], limit: int
+) -> Tuple[List, Optional[str]]:
+    """
+    Obtener una página ordenada por (fecha, clave) a partir de un cursor
+
+    La página siguiente se filtra con "(fecha, clave) > (fecha_cursor,
+    clave_cursor)" en lugar de OFFSET, así que su coste no depende de la
+    profundidad. Se lee una fila extra para saber si hay más páginas.
+
+    Args:
+        query: Query de SQLAlchemy sobre la entidad
+        columna_fecha: Columna fecha_creacion de la entidad
+        columna_clave: Columna de clave primaria de la entidad
+        cursor: Token de la página anterior (None = primera página)
+        limit: Tamaño de página
+
+    Returns:
+        Tupla (filas de la página, cursor de la siguiente o None)
+
+    Raises:
+        CursorInvalido: Si el cursor está mal formado
+        ValueError: Si el límite excede MAX_TAMANO_PAGINA
+    """
+    validar_limite(limit)
+    if cursor:
+        query = query.filter(filtro_cursor(columna_fecha, columna_clave, cursor))
+
+    filas = query.order_by(columna_fecha, columna_clave).limit(limit + 1).all()
+    if len(filas) <= limit:
+        return filas, None
+
+    filas = filas[:limit]
+    ultima = filas[-1]
+    siguiente = codificar_cursor(
+        getattr(ultima, columna_fecha.key), getattr(ultima, columna_clave.key)
+    )
+    return filas, siguiente
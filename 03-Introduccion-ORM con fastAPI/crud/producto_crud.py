@@ -2,17 +2,119 @@
 Operaciones CRUD para Producto
 """
 
-from typing import List, Optional
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, Tuple
 from uuid import UUID
 
+from crud.base_async import CRUDAsyncBase
+from crud.categoria_crud import CategoriaCRUD
+from crud.escritura import actualizar_returning
+from crud.paginacion import MAX_TAMANO_PAGINA, paginar_keyset
+from crud.versiones import version_coleccion
+from database.busqueda import (
+    CONFIG_TEXTO,
+    DOCUMENTO_PG,
+    TABLA_FTS,
+    consulta_fts5,
+    consulta_tsquery,
+    patron_subcadena,
+    terminos_busqueda,
+)
+from database.routing import en_primario, solo_lectura
 from entities.producto import Producto
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Row,
+    and_,
+    column,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    table,
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, joinedload
+
+# Resultados devueltos por defecto en la búsqueda de productos
+LIMITE_BUSQUEDA = 20
+
+# Filas por lote (un INSERT y un COMMIT) en la carga masiva de productos
+TAMANO_LOTE_CARGA = 1000
+MAX_TAMANO_LOTE_CARGA = 5000
+
+# Filas leídas del cursor del servidor por cada lote de la exportación
+TAMANO_LOTE_EXPORTACION = 1000
+
+# Columnas incluidas en la exportación del catálogo, en orden
+COLUMNAS_EXPORTACION = (
+    "id_producto",
+    "nombre",
+    "descripcion",
+    "precio",
+    "stock",
+    "categoria_id",
+    "usuario_id",
+    "fecha_creacion",
+    "fecha_edicion",
+)
+
+# Columnas de ProductoResponse, en su orden, para los listados leídos como tuplas
+COLUMNAS_RESPUESTA = (
+    "nombre",
+    "descripcion",
+    "precio",
+    "stock",
+    "categoria_id",
+    "usuario_id",
+    "id_producto",
+    "fecha_creacion",
+    "fecha_edicion",
+)
+
+
+# Relaciones de Producto que se pueden incluir en las respuestas (?expand=)
+RELACIONES_EXPANDIBLES = ("categoria", "usuario_crea", "usuario_edita")
+
+# Productos distintos admitidos en una reserva de stock
+MAX_ITEMS_RESERVA = 100
+
+
+class StockInsuficiente(ValueError):
+    """El ajuste dejaría el stock del producto por debajo de cero"""
 
 
 class ProductoCRUD:
     def __init__(self, db: Session):
         self.db = db
 
+    def _consulta(self, filas: bool = False, expandir: Sequence[str] = ()):
+        """
+        Query de entidades Producto, o de tuplas con COLUMNAS_RESPUESTA
+
+        Las relaciones de expandir se cargan con LEFT JOIN en la misma
+        consulta. Todas son muchos-a-uno, así que el JOIN no multiplica filas
+        (LIMIT sigue contando productos) y la página cuesta una sola consulta
+        con independencia del número de productos.
+
+        Raises:
+            ValueError: Si alguna relación no está en RELACIONES_EXPANDIBLES
+        """
+        if filas:
+            return self.db.query(
+                *(getattr(Producto, nombre) for nombre in COLUMNAS_RESPUESTA)
+            )
+        desconocidas = set(expandir) - set(RELACIONES_EXPANDIBLES)
+        if desconocidas:
+            raise ValueError(
+                f"No se puede expandir: {', '.join(sorted(desconocidas))}. "
+                f"Opciones: {', '.join(RELACIONES_EXPANDIBLES)}"
+            )
+        opciones = [joinedload(getattr(Producto, relacion)) for relacion in expandir]
+        return self.db.query(Producto).options(*opciones)
+
+    @en_primario
     def crear_producto(
         self,
         nombre: str,
@@ -41,36 +143,14 @@ class ProductoCRUD:
         Raises:
             ValueError: Si los datos no son válidos
         """
-        if not nombre or len(nombre.strip()) == 0:
-            raise ValueError("El nombre del producto es obligatorio")
-
-        if len(nombre) > 200:
-            raise ValueError("El nombre no puede exceder 200 caracteres")
-
-        if not descripcion or len(descripcion.strip()) == 0:
-            raise ValueError("La descripción del producto es obligatoria")
-
-        if precio <= 0:
-            raise ValueError("El precio debe ser mayor a 0")
-
-        if stock < 0:
-            raise ValueError("El stock no puede ser negativo")
-
-        from entities.categoria import Categoria
+        self._validar_datos(nombre, descripcion, precio, stock)
 
-        categoria = (
-            self.db.query(Categoria)
-            .filter(Categoria.id_categoria == categoria_id)
-            .first()
-        )
-        if not categoria:
+        if not CategoriaCRUD(self.db).categorias_existentes([categoria_id]):
             raise ValueError("La categoría especificada no existe")
 
         from entities.usuario import Usuario
 
-        usuario = (
-            self.db.query(Usuario).filter(Usuario.id == usuario_id).first()
-        )
+        usuario = self.db.query(Usuario).filter(Usuario.id == usuario_id).first()
         if not usuario:
             raise ValueError("El usuario especificado no existe")
 
@@ -86,76 +166,333 @@ class ProductoCRUD:
             usuario_id=usuario_id,
             id_usuario_crea=id_usuario_crea,
         )
+        # fecha_creacion vuelve en el mismo INSERT (RETURNING): sin refresh()
         self.db.add(producto)
         self.db.commit()
-        self.db.refresh(producto)
         return producto
 
-    def obtener_producto(self, producto_id: UUID) -> Optional[Producto]:
+    @staticmethod
+    def _validar_datos(nombre: str, descripcion: str, precio: float, stock: int):
+        """
+        Validar los campos de un producto nuevo
+
+        Raises:
+            ValueError: Si algún campo no es válido
+        """
+        if not nombre or len(nombre.strip()) == 0:
+            raise ValueError("El nombre del producto es obligatorio")
+
+        if len(nombre) > 200:
+            raise ValueError("El nombre no puede exceder 200 caracteres")
+
+        if not descripcion or len(descripcion.strip()) == 0:
+            raise ValueError("La descripción del producto es obligatoria")
+
+        if precio <= 0:
+            raise ValueError("El precio debe ser mayor a 0")
+
+        if stock < 0:
+            raise ValueError("El stock no puede ser negativo")
+
+    @en_primario
+    def crear_productos_lote(
+        self, filas: List[Tuple[int, dict]]
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Crear un lote de productos con validación por conjuntos
+
+        Las categorías y usuarios referenciados se comprueban con una consulta
+        IN por tabla para todo el lote, y las filas válidas se insertan con un
+        único INSERT de varias filas (executemany) y un solo COMMIT. Una fila
+        inválida no impide insertar las demás.
+
+        Args:
+            filas: Pares (índice en la carga, datos del producto) con los
+                campos de ProductoCreate
+
+        Returns:
+            Tupla (productos creados, lista de errores (índice, mensaje))
+        """
+        from entities.usuario import Usuario
+
+        categoria_ids = {datos["categoria_id"] for _, datos in filas}
+        usuario_ids = {datos["usuario_id"] for _, datos in filas}
+        categorias_existentes = CategoriaCRUD(self.db).categorias_existentes(
+            categoria_ids
+        )
+        usuarios_existentes = set()
+        if usuario_ids:
+            usuarios_existentes = set(
+                self.db.scalars(select(Usuario.id).where(Usuario.id.in_(usuario_ids)))
+            )
+
+        nuevos, indices, errores = [], [], []
+        for indice, datos in filas:
+            try:
+                self._validar_datos(
+                    datos["nombre"],
+                    datos["descripcion"],
+                    datos["precio"],
+                    datos["stock"],
+                )
+                if datos["categoria_id"] not in categorias_existentes:
+                    raise ValueError("La categoría especificada no existe")
+                if datos["usuario_id"] not in usuarios_existentes:
+                    raise ValueError("El usuario especificado no existe")
+            except ValueError as e:
+                errores.append((indice, str(e)))
+                continue
+            nuevos.append(
+                {
+                    "id_producto": uuid.uuid4(),
+                    "nombre": datos["nombre"].strip(),
+                    "descripcion": datos["descripcion"].strip(),
+                    "precio": datos["precio"],
+                    "stock": datos["stock"],
+                    "categoria_id": datos["categoria_id"],
+                    "usuario_id": datos["usuario_id"],
+                    "id_usuario_crea": datos["usuario_id"],
+                }
+            )
+            indices.append(indice)
+
+        if not nuevos:
+            return 0, errores
+        try:
+            self.db.execute(insert(Producto), nuevos)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            errores.extend(
+                (indice, f"Error al insertar el lote: {e}") for indice in indices
+            )
+            return 0, sorted(errores)
+        return len(nuevos), errores
+
+    @solo_lectura
+    def obtener_producto(
+        self, producto_id: UUID, expandir: Sequence[str] = ()
+    ) -> Optional[Producto]:
         """
         Obtener un producto por ID
 
         Args:
             producto_id: UUID del producto
+            expandir: Relaciones a cargar junto con el producto
 
         Returns:
             Producto encontrado o None
         """
         return (
-            self.db.query(Producto).filter(Producto.id_producto == producto_id).first()
+            self._consulta(expandir=expandir)
+            .filter(Producto.id_producto == producto_id)
+            .first()
         )
 
-    def obtener_productos(self, skip: int = 0, limit: int = 100) -> List[Producto]:
+    @solo_lectura
+    def obtener_productos(
+        self, skip: int = 0, limit: int = 100, expandir: Sequence[str] = ()
+    ) -> List[Producto]:
         """
         Obtener lista de productos con paginación
 
         Args:
             skip: Número de registros a omitir
             limit: Límite de registros a retornar
+            expandir: Relaciones a cargar junto con los productos
 
         Returns:
             Lista de productos
         """
-        return self.db.query(Producto).offset(skip).limit(limit).all()
+        return self._consulta(expandir=expandir).offset(skip).limit(limit).all()
+
+    @solo_lectura
+    def exportar_productos(
+        self, tamano_lote: int = TAMANO_LOTE_EXPORTACION
+    ) -> Iterator[List[Row]]:
+        """
+        Leer todo el catálogo en lotes con un cursor del lado del servidor
+
+        La consulta se ejecuta con yield_per: el driver no descarga el
+        resultado completo, solo tamano_lote filas (tuplas, sin objetos ORM)
+        cada vez que se pide el siguiente lote.
+
+        Args:
+            tamano_lote: Filas por lote
+
+        Returns:
+            Iterador de lotes de filas con las columnas COLUMNAS_EXPORTACION
+        """
+        columnas = [getattr(Producto, nombre) for nombre in COLUMNAS_EXPORTACION]
+        resultado = self.db.execute(
+            select(*columnas).execution_options(yield_per=tamano_lote)
+        )
+        return resultado.partitions()
 
-    def obtener_productos_por_categoria(self, categoria_id: UUID) -> List[Producto]:
+    @solo_lectura
+    def obtener_productos_pagina(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = MAX_TAMANO_PAGINA,
+        filas: bool = False,
+        expandir: Sequence[str] = (),
+    ) -> Tuple[List[Producto], Optional[str]]:
+        """
+        Obtener una página de productos con paginación por cursor
+
+        Args:
+            cursor: Cursor devuelto por la página anterior (None = primera)
+            limit: Tamaño de página (máximo MAX_TAMANO_PAGINA)
+            filas: Devolver tuplas con COLUMNAS_RESPUESTA en lugar de entidades
+            expandir: Relaciones a cargar junto con los productos
+
+        Returns:
+            Tupla (lista de productos, cursor de la siguiente página o None)
+
+        Raises:
+            ValueError: Si el cursor o el límite no son válidos
+        """
+        return paginar_keyset(
+            self._consulta(filas, expandir),
+            Producto.fecha_creacion,
+            Producto.id_producto,
+            cursor,
+            limit,
+        )
+
+    @solo_lectura
+    def version_productos(
+        self, categoria_id: Optional[UUID] = None, usuario_id: Optional[UUID] = None
+    ) -> Tuple[int, Optional[datetime]]:
+        """
+        Obtener el número de productos y su última modificación
+
+        Args:
+            categoria_id: Limitar a una categoría
+            usuario_id: Limitar a un usuario
+
+        Returns:
+            Tupla (número de productos, última fecha de edición o creación)
+        """
+        condiciones = []
+        if categoria_id is not None:
+            condiciones.append(Producto.categoria_id == categoria_id)
+        if usuario_id is not None:
+            condiciones.append(Producto.usuario_id == usuario_id)
+        return version_coleccion(self.db, Producto, *condiciones)
+
+    @solo_lectura
+    def obtener_productos_por_categoria(
+        self, categoria_id: UUID, filas: bool = False, expandir: Sequence[str] = ()
+    ) -> List[Producto]:
         """
         Obtener productos por categoría
 
         Args:
             categoria_id: UUID de la categoría
+            filas: Devolver tuplas con COLUMNAS_RESPUESTA en lugar de entidades
+            expandir: Relaciones a cargar junto con los productos
 
         Returns:
             Lista de productos de la categoría
         """
         return (
-            self.db.query(Producto).filter(Producto.categoria_id == categoria_id).all()
+            self._consulta(filas, expandir)
+            .filter(Producto.categoria_id == categoria_id)
+            .all()
         )
 
-    def obtener_productos_por_usuario(self, usuario_id: UUID) -> List[Producto]:
+    @solo_lectura
+    def obtener_productos_por_usuario(
+        self, usuario_id: UUID, filas: bool = False, expandir: Sequence[str] = ()
+    ) -> List[Producto]:
         """
         Obtener productos por usuario
 
         Args:
             usuario_id: UUID del usuario
+            filas: Devolver tuplas con COLUMNAS_RESPUESTA en lugar de entidades
+            expandir: Relaciones a cargar junto con los productos
 
         Returns:
             Lista de productos del usuario
         """
-        return self.db.query(Producto).filter(Producto.usuario_id == usuario_id).all()
+        return (
+            self._consulta(filas, expandir)
+            .filter(Producto.usuario_id == usuario_id)
+            .all()
+        )
 
-    def buscar_productos_por_nombre(self, nombre: str) -> List[Producto]:
+    @solo_lectura
+    def buscar_productos_por_nombre(
+        self, nombre: str, limit: int = LIMITE_BUSQUEDA, expandir: Sequence[str] = ()
+    ) -> List[Producto]:
         """
-        Buscar productos por nombre (búsqueda parcial)
+        Buscar productos por nombre y descripción, ordenados por relevancia
+
+        Usa los índices de búsqueda de texto: en PostgreSQL tsvector (palabras
+        por prefijo) más pg_trgm sobre el nombre (subcadenas); en SQLite la
+        tabla FTS5. En otros motores se recurre a LIKE sobre el nombre.
 
         Args:
-            nombre: Texto a buscar en el nombre
+            nombre: Texto a buscar
+            limit: Número máximo de resultados
+            expandir: Relaciones a cargar junto con los productos
 
         Returns:
-            Lista de productos que coinciden
+            Lista de productos que coinciden, los más relevantes primero
         """
-        return self.db.query(Producto).filter(Producto.nombre.contains(nombre)).all()
+        terminos = terminos_busqueda(nombre)
+        if not terminos:
+            return []
+
+        consulta = self._consulta(expandir=expandir)
+        dialecto = self.db.get_bind().dialect.name
+        if dialecto == "postgresql":
+            return self._buscar_postgres(consulta, nombre, terminos, limit)
+        if dialecto == "sqlite":
+            return self._buscar_sqlite(consulta, terminos, limit)
+        return (
+            consulta.filter(Producto.nombre.contains(nombre, autoescape=True))
+            .limit(limit)
+            .all()
+        )
+
+    def _buscar_postgres(
+        self, consulta_base, texto: str, terminos: List[str], limit: int
+    ) -> List[Producto]:
+        documento = literal_column(DOCUMENTO_PG)
+        consulta = func.to_tsquery(
+            literal_column(f"'{CONFIG_TEXTO}'"), consulta_tsquery(terminos)
+        )
+        relevancia = func.ts_rank_cd(documento, consulta) + func.similarity(
+            Producto.nombre, texto
+        )
+        return (
+            consulta_base.filter(
+                or_(
+                    documento.op("@@")(consulta),
+                    Producto.nombre.ilike(patron_subcadena(texto), escape="\\"),
+                )
+            )
+            .order_by(relevancia.desc(), Producto.id_producto)
+            .limit(limit)
+            .all()
+        )
 
+    def _buscar_sqlite(
+        self, consulta_base, terminos: List[str], limit: int
+    ) -> List[Producto]:
+        fts = table(TABLA_FTS, column("rowid"))
+        return (
+            consulta_base.join(fts, fts.c.rowid == literal_column("productos.rowid"))
+            .filter(literal_column(TABLA_FTS).op("MATCH")(consulta_fts5(terminos)))
+            .order_by(func.bm25(literal_column(TABLA_FTS)))
+            .limit(limit)
+            .all()
+        )
+
+    @en_primario
     def actualizar_producto(
         self, producto_id: UUID, id_usuario_edita: UUID = None, **kwargs
     ) -> Optional[Producto]:
@@ -173,10 +510,6 @@ class ProductoCRUD:
         Raises:
             ValueError: Si los datos no son válidos
         """
-        producto = self.obtener_producto(producto_id)
-        if not producto:
-            return None
-
         if "nombre" in kwargs:
             nombre = kwargs["nombre"]
             if not nombre or len(nombre.strip()) == 0:
@@ -202,14 +535,9 @@ class ProductoCRUD:
                 raise ValueError("El stock no puede ser negativo")
 
         if "categoria_id" in kwargs:
-            from entities.categoria import Categoria
-
-            categoria = (
-                self.db.query(Categoria)
-                .filter(Categoria.id_categoria == kwargs["categoria_id"])
-                .first()
-            )
-            if not categoria:
+            if not CategoriaCRUD(self.db).categorias_existentes(
+                [kwargs["categoria_id"]]
+            ):
                 raise ValueError("La categoría especificada no existe")
 
         if "usuario_id" in kwargs:
@@ -233,15 +561,20 @@ class ProductoCRUD:
                 )
             id_usuario_edita = admin.id
 
-        producto.id_usuario_edita = id_usuario_edita
-
-        for key, value in kwargs.items():
-            if hasattr(producto, key):
-                setattr(producto, key, value)
+        # UPDATE ... RETURNING sin leer la fila antes; None si no existe
+        producto = actualizar_returning(
+            self.db,
+            Producto,
+            Producto.id_producto == producto_id,
+            {**kwargs, "id_usuario_edita": id_usuario_edita},
+        )
+        if producto is None:
+            self.db.rollback()
+            return None
         self.db.commit()
-        self.db.refresh(producto)
         return producto
 
+    @en_primario
     def actualizar_stock(
         self, producto_id: UUID, nuevo_stock: int
     ) -> Optional[Producto]:
@@ -257,6 +590,130 @@ class ProductoCRUD:
         """
         return self.actualizar_producto(producto_id, stock=nuevo_stock)
 
+    @en_primario
+    def ajustar_stock(self, producto_id: UUID, delta: int) -> Optional[Producto]:
+        """
+        Sumar o restar unidades al stock de forma atómica
+
+        Un solo "UPDATE ... SET stock = stock + :delta WHERE id = :id AND
+        stock + :delta >= 0 RETURNING ...": no hay lectura previa ni bloqueo
+        entre la lectura y la escritura, así que las ventas concurrentes del
+        mismo producto no pierden actualizaciones. Solo si no se actualiza
+        ninguna fila se consulta si el producto existe.
+
+        Args:
+            producto_id: UUID del producto
+            delta: Unidades a sumar (positivo) o restar (negativo)
+
+        Returns:
+            Producto con el stock resultante, o None si no existe
+
+        Raises:
+            StockInsuficiente: Si el stock quedaría negativo
+            ValueError: Si delta es 0
+        """
+        if delta == 0:
+            raise ValueError("El ajuste de stock no puede ser 0")
+
+        stock = func.coalesce(Producto.stock, 0)
+        producto = actualizar_returning(
+            self.db,
+            Producto,
+            and_(Producto.id_producto == producto_id, stock + delta >= 0),
+            {"stock": stock + delta},
+        )
+        if producto is not None:
+            self.db.commit()
+            return producto
+
+        self.db.rollback()
+        existe = self.db.execute(
+            select(Producto.id_producto).where(Producto.id_producto == producto_id)
+        ).first()
+        if existe is None:
+            return None
+        raise StockInsuficiente("Stock insuficiente para el ajuste solicitado")
+
+    @en_primario
+    def reservar_stock(self, items: List[Tuple[UUID, int]]) -> List[Producto]:
+        """
+        Descontar el stock de varios productos en una sola transacción
+
+        Cada producto se descuenta con un UPDATE condicional (como en
+        ajustar_stock) recorriendo los productos ordenados por id_producto:
+        todas las reservas bloquean las filas en el mismo orden, así que dos
+        reservas concurrentes no pueden bloquearse mutuamente. Si algún
+        producto no existe o no tiene stock suficiente se revierte todo.
+
+        Args:
+            items: Pares (producto_id, cantidad); un producto repetido suma
+                sus cantidades
+
+        Returns:
+            Productos con el stock resultante, ordenados por id_producto
+
+        Raises:
+            StockInsuficiente: Si algún producto no tiene stock suficiente
+            ValueError: Si la reserva está vacía, es demasiado grande, alguna
+                cantidad no es positiva o algún producto no existe
+        """
+        if not items:
+            raise ValueError("La reserva debe incluir al menos un producto")
+
+        cantidades = {}
+        for producto_id, cantidad in items:
+            if cantidad <= 0:
+                raise ValueError("Las cantidades a reservar deben ser mayores a 0")
+            cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+        if len(cantidades) > MAX_ITEMS_RESERVA:
+            raise ValueError(
+                f"Una reserva admite como máximo {MAX_ITEMS_RESERVA} productos"
+            )
+
+        stock = func.coalesce(Producto.stock, 0)
+        reservados = []
+        for producto_id in sorted(cantidades):
+            cantidad = cantidades[producto_id]
+            producto = actualizar_returning(
+                self.db,
+                Producto,
+                and_(Producto.id_producto == producto_id, stock >= cantidad),
+                {"stock": stock - cantidad},
+            )
+            if producto is None:
+                self.db.rollback()
+                self._rechazar_reserva(cantidades)
+            reservados.append(producto)
+
+        self.db.commit()
+        return reservados
+
+    def _rechazar_reserva(self, cantidades: dict):
+        """
+        Explicar por qué falló una reserva (tras revertirla)
+
+        Raises:
+            ValueError: Si algún producto no existe
+            StockInsuficiente: Si algún producto no tiene stock suficiente
+        """
+        disponibles = dict(
+            self.db.execute(
+                select(Producto.id_producto, func.coalesce(Producto.stock, 0)).where(
+                    Producto.id_producto.in_(list(cantidades))
+                )
+            ).all()
+        )
+        inexistentes = [str(i) for i in sorted(cantidades) if i not in disponibles]
+        if inexistentes:
+            raise ValueError(f"Productos no encontrados: {', '.join(inexistentes)}")
+        sin_stock = [
+            f"{producto_id} (disponible {disponibles[producto_id]}, pedido {cantidad})"
+            for producto_id, cantidad in sorted(cantidades.items())
+            if disponibles[producto_id] < cantidad
+        ]
+        raise StockInsuficiente(f"Stock insuficiente: {', '.join(sin_stock)}")
+
+    @en_primario
     def eliminar_producto(self, producto_id: UUID) -> bool:
         """
         Eliminar un producto
@@ -273,3 +730,126 @@ class ProductoCRUD:
             self.db.commit()
             return True
         return False
+
+
+class ProductoCRUDAsync(CRUDAsyncBase):
+    """Variante asíncrona de ProductoCRUD sobre AsyncSession"""
+
+    crud_sync = ProductoCRUD
+
+    async def crear_producto(self, *args, **kwargs) -> Producto:
+        """Crear un nuevo producto (ver ProductoCRUD.crear_producto)"""
+        return await self._ejecutar("crear_producto", *args, **kwargs)
+
+    async def crear_productos_lote(
+        self, filas: List[Tuple[int, dict]]
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        """Crear un lote de productos (ver ProductoCRUD.crear_productos_lote)"""
+        return await self._ejecutar("crear_productos_lote", filas)
+
+    async def obtener_producto(
+        self, producto_id: UUID, expandir: Sequence[str] = ()
+    ) -> Optional[Producto]:
+        """Obtener un producto por ID"""
+        return await self._ejecutar("obtener_producto", producto_id, expandir=expandir)
+
+    async def obtener_productos(
+        self, skip: int = 0, limit: int = 100, expandir: Sequence[str] = ()
+    ) -> List[Producto]:
+        """Obtener lista de productos con paginación"""
+        return await self._ejecutar(
+            "obtener_productos", skip=skip, limit=limit, expandir=expandir
+        )
+
+    async def exportar_productos(
+        self, tamano_lote: int = TAMANO_LOTE_EXPORTACION
+    ) -> AsyncIterator[List[Row]]:
+        """
+        Leer todo el catálogo en lotes (ver ProductoCRUD.exportar_productos)
+
+        Cada lote se pide al cursor dentro de run_sync, así que en memoria
+        solo hay un lote a la vez.
+        """
+        lotes = await self._ejecutar("exportar_productos", tamano_lote)
+        while True:
+            lote = await self.db.run_sync(lambda _: next(lotes, None))
+            if lote is None:
+                return
+            yield lote
+
+    async def obtener_productos_pagina(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = MAX_TAMANO_PAGINA,
+        filas: bool = False,
+        expandir: Sequence[str] = (),
+    ) -> Tuple[List[Producto], Optional[str]]:
+        """Obtener una página de productos con paginación por cursor"""
+        return await self._ejecutar(
+            "obtener_productos_pagina",
+            cursor=cursor,
+            limit=limit,
+            filas=filas,
+            expandir=expandir,
+        )
+
+    async def version_productos(
+        self, categoria_id: Optional[UUID] = None, usuario_id: Optional[UUID] = None
+    ) -> Tuple[int, Optional[datetime]]:
+        """Obtener el número de productos y su última modificación"""
+        return await self._ejecutar(
+            "version_productos", categoria_id=categoria_id, usuario_id=usuario_id
+        )
+
+    async def obtener_productos_por_categoria(
+        self, categoria_id: UUID, filas: bool = False, expandir: Sequence[str] = ()
+    ) -> List[Producto]:
+        """Obtener productos por categoría"""
+        return await self._ejecutar(
+            "obtener_productos_por_categoria",
+            categoria_id,
+            filas=filas,
+            expandir=expandir,
+        )
+
+    async def obtener_productos_por_usuario(
+        self, usuario_id: UUID, filas: bool = False, expandir: Sequence[str] = ()
+    ) -> List[Producto]:
+        """Obtener productos por usuario"""
+        return await self._ejecutar(
+            "obtener_productos_por_usuario", usuario_id, filas=filas, expandir=expandir
+        )
+
+    async def buscar_productos_por_nombre(
+        self, nombre: str, limit: int = LIMITE_BUSQUEDA, expandir: Sequence[str] = ()
+    ) -> List[Producto]:
+        """Buscar productos por nombre y descripción, ordenados por relevancia"""
+        return await self._ejecutar(
+            "buscar_productos_por_nombre", nombre, limit=limit, expandir=expandir
+        )
+
+    async def actualizar_producto(
+        self, producto_id: UUID, id_usuario_edita: UUID = None, **kwargs
+    ) -> Optional[Producto]:
+        """Actualizar un producto (ver ProductoCRUD.actualizar_producto)"""
+        return await self._ejecutar(
+            "actualizar_producto", producto_id, id_usuario_edita, **kwargs
+        )
+
+    async def actualizar_stock(
+        self, producto_id: UUID, nuevo_stock: int
+    ) -> Optional[Producto]:
+        """Actualizar el stock de un producto"""
+        return await self._ejecutar("actualizar_stock", producto_id, nuevo_stock)
+
+    async def ajustar_stock(self, producto_id: UUID, delta: int) -> Optional[Producto]:
+        """Sumar o restar unidades al stock (ver ProductoCRUD.ajustar_stock)"""
+        return await self._ejecutar("ajustar_stock", producto_id, delta)
+
+    async def reservar_stock(self, items: List[Tuple[UUID, int]]) -> List[Producto]:
+        """Descontar el stock de varios productos (ver ProductoCRUD.reservar_stock)"""
+        return await self._ejecutar("reservar_stock", items)
+
+    async def eliminar_producto(self, producto_id: UUID) -> bool:
+        """Eliminar un producto"""
+        return await self._ejecutar("eliminar_producto", producto_id)
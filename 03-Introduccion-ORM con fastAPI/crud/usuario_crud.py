@@ -2,14 +2,24 @@
 Operaciones CRUD para Usuario
 """
 
+import logging
 import re
+from datetime import datetime
 from typing import List, Optional, Tuple
 from uuid import UUID
 
 from auth.security import PasswordManager
+from crud.base_async import CRUDAsyncBase
+from crud.escritura import actualizar_returning
+from crud.paginacion import MAX_TAMANO_PAGINA, paginar_keyset
+from crud.versiones import version_coleccion
+from database.routing import en_primario, solo_lectura
 from entities.usuario import Usuario
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger(__name__)
+
 
 class UsuarioCRUD:
     def __init__(self, db: Session):
@@ -31,6 +41,7 @@ class UsuarioCRUD:
         pattern = r"^[a-zA-Z0-9_]{3,20}$"
         return re.match(pattern, nombre_usuario) is not None
 
+    @en_primario
     def crear_usuario(
         self,
         nombre: str,
@@ -39,6 +50,7 @@ class UsuarioCRUD:
         contraseña: str,
         telefono: str = None,
         es_admin: bool = False,
+        contraseña_hash: str = None,
     ) -> Usuario:
         """
         Crear un nuevo usuario con validaciones
@@ -50,6 +62,8 @@ class UsuarioCRUD:
             contraseña: Contraseña segura
             telefono: Teléfono opcional (formato internacional)
             es_admin: Si es administrador
+            contraseña_hash: Hash de la contraseña ya calculado (si es None
+                se calcula aquí)
 
         Returns:
             Usuario creado
@@ -87,7 +101,8 @@ class UsuarioCRUD:
         if telefono and not self._validar_telefono(telefono):
             raise ValueError("Formato de teléfono inválido")
 
-        contraseña_hash = PasswordManager.hash_password(contraseña)
+        if contraseña_hash is None:
+            contraseña_hash = PasswordManager.hash_password(contraseña)
 
         usuario = Usuario(
             nombre=nombre.strip(),
@@ -99,9 +114,9 @@ class UsuarioCRUD:
         )
         self.db.add(usuario)
         self.db.commit()
-        self.db.refresh(usuario)
         return usuario
 
+    @solo_lectura
     def obtener_usuario(self, usuario_id: UUID) -> Optional[Usuario]:
         """
         Obtener un usuario por ID
@@ -114,6 +129,7 @@ class UsuarioCRUD:
         """
         return self.db.query(Usuario).filter(Usuario.id == usuario_id).first()
 
+    @solo_lectura
     def obtener_usuario_por_email(self, email: str) -> Optional[Usuario]:
         """
         Obtener un usuario por email
@@ -130,6 +146,7 @@ class UsuarioCRUD:
             .first()
         )
 
+    @solo_lectura
     def obtener_usuario_por_nombre_usuario(
         self, nombre_usuario: str
     ) -> Optional[Usuario]:
@@ -148,6 +165,27 @@ class UsuarioCRUD:
             .first()
         )
 
+    @en_primario
+    def obtener_usuario_para_login(self, nombre_usuario: str) -> Optional[Usuario]:
+        """
+        Buscar el usuario activo que intenta iniciar sesión
+
+        Args:
+            nombre_usuario: Nombre de usuario o email
+
+        Returns:
+            Usuario activo o None
+        """
+        # Buscar por nombre de usuario o email
+        usuario = self.obtener_usuario_por_nombre_usuario(nombre_usuario)
+        if not usuario:
+            usuario = self.obtener_usuario_por_email(nombre_usuario)
+
+        if not usuario or not usuario.activo:
+            return None
+        return usuario
+
+    @en_primario
     def autenticar_usuario(
         self, nombre_usuario: str, contraseña: str
     ) -> Optional[Usuario]:
@@ -161,19 +199,48 @@ class UsuarioCRUD:
         Returns:
             Usuario autenticado o None si las credenciales son inválidas
         """
-        # Buscar por nombre de usuario o email
-        usuario = self.obtener_usuario_por_nombre_usuario(nombre_usuario)
+        usuario = self.obtener_usuario_para_login(nombre_usuario)
         if not usuario:
-            usuario = self.obtener_usuario_por_email(nombre_usuario)
+            return None
 
-        if not usuario or not usuario.activo:
+        if not PasswordManager.verify_password(contraseña, usuario.contraseña_hash):
             return None
 
-        if PasswordManager.verify_password(contraseña, usuario.contraseña_hash):
-            return usuario
+        # Migrar el hash al esquema y costes configurados ahora que se conoce
+        # la contraseña en texto plano
+        if PasswordManager.needs_rehash(usuario.contraseña_hash):
+            self.actualizar_hash_login(
+                usuario, PasswordManager.hash_password(contraseña)
+            )
+        return usuario
+
+    @en_primario
+    def actualizar_hash_login(self, usuario: Usuario, contraseña_hash: str) -> bool:
+        """
+        Guardar el hash recalculado de un usuario que acaba de autenticarse
+
+        Un error al guardar no impide el login: se revierte y se reintenta en
+        el siguiente inicio de sesión.
+
+        Args:
+            usuario: Usuario autenticado
+            contraseña_hash: Hash con el esquema configurado
 
-        return None
+        Returns:
+            True si se guardó el nuevo hash
+        """
+        try:
+            usuario.contraseña_hash = contraseña_hash
+            self.db.commit()
+            return True
+        except SQLAlchemyError:
+            self.db.rollback()
+            logger.warning(
+                "No se pudo actualizar el hash de la contraseña de %s", usuario.id
+            )
+            return False
 
+    @en_primario
     def cambiar_contraseña(
         self, usuario_id: UUID, contraseña_actual: str, nueva_contraseña: str
     ) -> bool:
@@ -210,6 +277,31 @@ class UsuarioCRUD:
         self.db.commit()
         return True
 
+    @en_primario
+    def guardar_contraseña_hash(self, usuario_id: UUID, contraseña_hash: str) -> bool:
+        """
+        Guardar un hash de contraseña ya calculado
+
+        Args:
+            usuario_id: UUID del usuario
+            contraseña_hash: Hash de la nueva contraseña
+
+        Returns:
+            True si se guardó, False si el usuario no existe
+        """
+        usuario = actualizar_returning(
+            self.db,
+            Usuario,
+            Usuario.id == usuario_id,
+            {"contraseña_hash": contraseña_hash},
+        )
+        if usuario is None:
+            self.db.rollback()
+            return False
+        self.db.commit()
+        return True
+
+    @solo_lectura
     def obtener_usuarios(self, skip: int = 0, limit: int = 100) -> List[Usuario]:
         """
         Obtener lista de usuarios con paginación
@@ -223,6 +315,38 @@ class UsuarioCRUD:
         """
         return self.db.query(Usuario).offset(skip).limit(limit).all()
 
+    @solo_lectura
+    def obtener_usuarios_pagina(
+        self, cursor: Optional[str] = None, limit: int = MAX_TAMANO_PAGINA
+    ) -> Tuple[List[Usuario], Optional[str]]:
+        """
+        Obtener una página de usuarios con paginación por cursor
+
+        Args:
+            cursor: Cursor devuelto por la página anterior (None = primera)
+            limit: Tamaño de página (máximo MAX_TAMANO_PAGINA)
+
+        Returns:
+            Tupla (lista de usuarios, cursor de la siguiente página o None)
+
+        Raises:
+            ValueError: Si el cursor o el límite no son válidos
+        """
+        return paginar_keyset(
+            self.db.query(Usuario), Usuario.fecha_creacion, Usuario.id, cursor, limit
+        )
+
+    @solo_lectura
+    def version_usuarios(self) -> Tuple[int, Optional[datetime]]:
+        """
+        Obtener el número de usuarios y su última modificación
+
+        Returns:
+            Tupla (número de usuarios, última fecha de edición o creación)
+        """
+        return version_coleccion(self.db, Usuario)
+
+    @en_primario
     def actualizar_usuario(self, usuario_id: UUID, **kwargs) -> Optional[Usuario]:
         """
         Actualizar un usuario con validaciones
@@ -237,18 +361,12 @@ class UsuarioCRUD:
         Raises:
             ValueError: Si los datos no son válidos
         """
-        usuario = self.obtener_usuario(usuario_id)
-        if not usuario:
-            return None
-
         if "email" in kwargs:
             email = kwargs["email"]
             if not self._validar_email(email):
                 raise ValueError("Email inválido")
-            if (
-                self.obtener_usuario_por_email(email)
-                and self.obtener_usuario_por_email(email).id != usuario_id
-            ):
+            existente = self.obtener_usuario_por_email(email)
+            if existente and existente.id != usuario_id:
                 raise ValueError("El email ya está registrado")
             kwargs["email"] = email.lower().strip()
 
@@ -271,11 +389,8 @@ class UsuarioCRUD:
                 raise ValueError(
                     "El nombre de usuario debe tener entre 3-20 caracteres y solo contener letras, números y guiones bajos"
                 )
-            if (
-                self.obtener_usuario_por_nombre_usuario(nombre_usuario)
-                and self.obtener_usuario_por_nombre_usuario(nombre_usuario).id
-                != usuario_id
-            ):
+            existente = self.obtener_usuario_por_nombre_usuario(nombre_usuario)
+            if existente and existente.id != usuario_id:
                 raise ValueError("El nombre de usuario ya está registrado")
             kwargs["nombre_usuario"] = nombre_usuario.strip().lower()
 
@@ -287,13 +402,16 @@ class UsuarioCRUD:
             kwargs["contraseña_hash"] = PasswordManager.hash_password(contraseña)
             del kwargs["contraseña"]  # Eliminar la contraseña en texto plano
 
-        for key, value in kwargs.items():
-            if hasattr(usuario, key):
-                setattr(usuario, key, value)
+        usuario = actualizar_returning(
+            self.db, Usuario, Usuario.id == usuario_id, kwargs
+        )
+        if usuario is None:
+            self.db.rollback()
+            return None
         self.db.commit()
-        self.db.refresh(usuario)
         return usuario
 
+    @en_primario
     def eliminar_usuario(self, usuario_id: UUID) -> bool:
         """
         Eliminar un usuario
@@ -311,6 +429,7 @@ class UsuarioCRUD:
             return True
         return False
 
+    @en_primario
     def desactivar_usuario(self, usuario_id: UUID) -> Optional[Usuario]:
         """
         Desactivar un usuario (soft delete)
@@ -323,6 +442,7 @@ class UsuarioCRUD:
         """
         return self.actualizar_usuario(usuario_id, activo=False)
 
+    @solo_lectura
     def obtener_usuarios_admin(self) -> List[Usuario]:
         """
         Obtener todos los usuarios administradores
@@ -332,6 +452,7 @@ class UsuarioCRUD:
         """
         return self.db.query(Usuario).filter(Usuario.es_admin == True).all()
 
+    @solo_lectura
     def es_admin(self, usuario_id: UUID) -> bool:
         """
         Verificar si un usuario es administrador
@@ -345,6 +466,7 @@ class UsuarioCRUD:
         usuario = self.obtener_usuario(usuario_id)
         return usuario.es_admin if usuario else False
 
+    @solo_lectura
     def obtener_admin_por_defecto(self) -> Optional[Usuario]:
         """
         Obtener el usuario administrador por defecto
@@ -357,3 +479,149 @@ class UsuarioCRUD:
             .filter(Usuario.email == "admin@system.com", Usuario.es_admin == True)
             .first()
         )
+
+
+class UsuarioCRUDAsync(CRUDAsyncBase):
+    """Variante asíncrona de UsuarioCRUD sobre AsyncSession"""
+
+    crud_sync = UsuarioCRUD
+
+    async def crear_usuario(
+        self,
+        nombre: str,
+        nombre_usuario: str,
+        email: str,
+        contraseña: str,
+        telefono: str = None,
+        es_admin: bool = False,
+    ) -> Usuario:
+        """
+        Crear un nuevo usuario (ver UsuarioCRUD.crear_usuario)
+
+        El hash de la contraseña se calcula en el pool de hash antes de abrir
+        la operación de base de datos; si la contraseña no es válida se deja
+        que UsuarioCRUD lance el error de validación habitual.
+        """
+        contraseña_hash = None
+        if contraseña and PasswordManager.validate_password_strength(contraseña)[0]:
+            contraseña_hash = await PasswordManager.hash_password_async(contraseña)
+        return await self._ejecutar(
+            "crear_usuario",
+            nombre,
+            nombre_usuario,
+            email,
+            contraseña,
+            telefono,
+            es_admin,
+            contraseña_hash=contraseña_hash,
+        )
+
+    async def obtener_usuario(self, usuario_id: UUID) -> Optional[Usuario]:
+        """Obtener un usuario por ID"""
+        return await self._ejecutar("obtener_usuario", usuario_id)
+
+    async def obtener_usuario_por_email(self, email: str) -> Optional[Usuario]:
+        """Obtener un usuario por email"""
+        return await self._ejecutar("obtener_usuario_por_email", email)
+
+    async def obtener_usuario_por_nombre_usuario(
+        self, nombre_usuario: str
+    ) -> Optional[Usuario]:
+        """Obtener un usuario por nombre de usuario"""
+        return await self._ejecutar(
+            "obtener_usuario_por_nombre_usuario", nombre_usuario
+        )
+
+    async def autenticar_usuario(
+        self, nombre_usuario: str, contraseña: str
+    ) -> Optional[Usuario]:
+        """
+        Autenticar un usuario con nombre de usuario y contraseña
+
+        La verificación y el rehash se hacen en el pool de hash, fuera del
+        event loop.
+        """
+        usuario = await self._ejecutar("obtener_usuario_para_login", nombre_usuario)
+        if not usuario or not await PasswordManager.verify_password_async(
+            contraseña, usuario.contraseña_hash
+        ):
+            return None
+
+        if PasswordManager.needs_rehash(usuario.contraseña_hash):
+            contraseña_hash = await PasswordManager.hash_password_async(contraseña)
+            await self._ejecutar("actualizar_hash_login", usuario, contraseña_hash)
+        return usuario
+
+    async def cambiar_contraseña(
+        self, usuario_id: UUID, contraseña_actual: str, nueva_contraseña: str
+    ) -> bool:
+        """
+        Cambiar la contraseña de un usuario (ver UsuarioCRUD.cambiar_contraseña)
+
+        La verificación y el nuevo hash se calculan en el pool de hash.
+        """
+        usuario = await self._ejecutar("obtener_usuario", usuario_id)
+        if not usuario:
+            return False
+
+        if not await PasswordManager.verify_password_async(
+            contraseña_actual, usuario.contraseña_hash
+        ):
+            raise ValueError("La contraseña actual es incorrecta")
+
+        es_valida, mensaje = PasswordManager.validate_password_strength(
+            nueva_contraseña
+        )
+        if not es_valida:
+            raise ValueError(f"Nueva contraseña inválida: {mensaje}")
+
+        contraseña_hash = await PasswordManager.hash_password_async(nueva_contraseña)
+        return await self._ejecutar(
+            "guardar_contraseña_hash", usuario_id, contraseña_hash
+        )
+
+    async def obtener_usuarios(self, skip: int = 0, limit: int = 100) -> List[Usuario]:
+        """Obtener lista de usuarios con paginación"""
+        return await self._ejecutar("obtener_usuarios", skip=skip, limit=limit)
+
+    async def obtener_usuarios_pagina(
+        self, cursor: Optional[str] = None, limit: int = MAX_TAMANO_PAGINA
+    ) -> Tuple[List[Usuario], Optional[str]]:
+        """Obtener una página de usuarios con paginación por cursor"""
+        return await self._ejecutar(
+            "obtener_usuarios_pagina", cursor=cursor, limit=limit
+        )
+
+    async def version_usuarios(self) -> Tuple[int, Optional[datetime]]:
+        """Obtener el número de usuarios y su última modificación"""
+        return await self._ejecutar("version_usuarios")
+
+    async def actualizar_usuario(self, usuario_id: UUID, **kwargs) -> Optional[Usuario]:
+        """Actualizar un usuario (ver UsuarioCRUD.actualizar_usuario)"""
+        contraseña = kwargs.get("contraseña")
+        if contraseña and PasswordManager.validate_password_strength(contraseña)[0]:
+            # Hash en el pool de hash; UsuarioCRUD guarda contraseña_hash tal cual
+            kwargs["contraseña_hash"] = await PasswordManager.hash_password_async(
+                kwargs.pop("contraseña")
+            )
+        return await self._ejecutar("actualizar_usuario", usuario_id, **kwargs)
+
+    async def eliminar_usuario(self, usuario_id: UUID) -> bool:
+        """Eliminar un usuario"""
+        return await self._ejecutar("eliminar_usuario", usuario_id)
+
+    async def desactivar_usuario(self, usuario_id: UUID) -> Optional[Usuario]:
+        """Desactivar un usuario (soft delete)"""
+        return await self._ejecutar("desactivar_usuario", usuario_id)
+
+    async def obtener_usuarios_admin(self) -> List[Usuario]:
+        """Obtener todos los usuarios administradores"""
+        return await self._ejecutar("obtener_usuarios_admin")
+
+    async def es_admin(self, usuario_id: UUID) -> bool:
+        """Verificar si un usuario es administrador"""
+        return await self._ejecutar("es_admin", usuario_id)
+
+    async def obtener_admin_por_defecto(self) -> Optional[Usuario]:
+        """Obtener el usuario administrador por defecto"""
+        return await self._ejecutar("obtener_admin_por_defecto")
@@ -0,0 +1,34 @@
+"""
+Versión de una colección para validar cachés HTTP (ETag de los listados)
+"""
+
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func, select
+
+
+def version_coleccion(db, entidad, *condiciones) -> Tuple[int, Optional[datetime]]:
+    """
+    Obtener el número de filas y la última modificación de una tabla
+
+    Cualquier alta, baja o edición (fecha_edicion se actualiza con cada
+    UPDATE del ORM) cambia al menos uno de los dos valores. Es una sola
+    consulta agregada, sin leer filas.
+
+    Args:
+        db: Sesión síncrona
+        entidad: Clase ORM con fecha_creacion y fecha_edicion
+        *condiciones: Filtros de la colección (p. ej. por categoría)
+
+    Returns:
+        Tupla (número de filas, última fecha de edición o creación)
+    """
+    consulta = select(
+        func.count(),
+        func.max(func.coalesce(entidad.fecha_edicion, entidad.fecha_creacion)),
+    ).select_from(entidad)
+    if condiciones:
+        consulta = consulta.where(*condiciones)
+    total, modificado = db.execute(consulta).one()
+    return total, modificado
@@ -0,0 +1,108 @@
+"""
+Índices de búsqueda de texto sobre productos (nombre y descripción)
+
+- PostgreSQL: índice GIN sobre to_tsvector (búsqueda por palabras con
+  ranking) e índice GIN pg_trgm sobre nombre (subcadenas y similitud).
+- SQLite: tabla virtual FTS5 sincronizada por triggers, para poder probar
+  la búsqueda sin servidor.
+
+Los índices de PostgreSQL se crean con la migración a1c3e5f7b901 y también
+al crear las tablas con create_all, para que ambos esquemas coincidan.
+"""
+
+import re
+from typing import List
+
+from sqlalchemy import DDL, event
+
+# Configuración de text search de PostgreSQL
+CONFIG_TEXTO = "spanish"
+
+# Expresión indexada; las consultas deben usar exactamente la misma
+DOCUMENTO_PG = (
+    f"to_tsvector('{CONFIG_TEXTO}', "
+    "coalesce(productos.nombre, '') || ' ' || coalesce(productos.descripcion, ''))"
+)
+
+TABLA_FTS = "productos_fts"
+
+SENTENCIAS_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_productos_busqueda ON productos "
+    f"USING gin ({DOCUMENTO_PG.replace('productos.', '')})",
+    "CREATE INDEX IF NOT EXISTS ix_productos_nombre_trgm ON productos "
+    "USING gin (nombre gin_trgm_ops)",
+]
+
+SENTENCIAS_SQLITE = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS} USING fts5("
+    "nombre, descripcion, content='productos', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_ai AFTER INSERT ON productos BEGIN "
+    f"INSERT INTO {TABLA_FTS}(rowid, nombre, descripcion) "
+    "VALUES (new.rowid, new.nombre, new.descripcion); END",
+    f"CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_ad AFTER DELETE ON productos BEGIN "
+    f"INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, nombre, descripcion) "
+    "VALUES ('delete', old.rowid, old.nombre, old.descripcion); END",
+    f"CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_au AFTER UPDATE ON productos BEGIN "
+    f"INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, nombre, descripcion) "
+    "VALUES ('delete', old.rowid, old.nombre, old.descripcion); "
+    f"INSERT INTO {TABLA_FTS}(rowid, nombre, descripcion) "
+    "VALUES (new.rowid, new.nombre, new.descripcion); END",
+    # Indexar las filas que ya existieran al crear la tabla virtual
+    f"INSERT INTO {TABLA_FTS}({TABLA_FTS}) VALUES ('rebuild')",
+]
+
+
+def instalar_indices_busqueda(tabla):
+    """
+    Crear los índices de búsqueda junto con la tabla de productos
+
+    Args:
+        tabla: Tabla productos (Producto.__table__)
+    """
+    for sentencia in SENTENCIAS_POSTGRES:
+        event.listen(
+            tabla, "after_create", DDL(sentencia).execute_if(dialect="postgresql")
+        )
+    for sentencia in SENTENCIAS_SQLITE:
+        event.listen(tabla, "after_create", DDL(sentencia).execute_if(dialect="sqlite"))
+    event.listen(
+        tabla,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {TABLA_FTS}").execute_if(dialect="sqlite"),
+    )
+
+
+def terminos_busqueda(texto: str) -> List[str]:
+    """
+    Separar el texto buscado en palabras, sin operadores ni signos
+
+    Args:
+        texto: Texto escrito por el usuario
+
+    Returns:
+        Lista de palabras en minúsculas
+    """
+    return re.findall(r"[^\W_]+", texto.lower())
+
+
+def patron_subcadena(texto: str) -> str:
+    """
+    Patrón LIKE '%texto%' con los comodines escapados
+
+    Se envía como un solo parámetro (no como '%' || :texto || '%') para que el
+    planificador vea el patrón completo y pueda usar el índice pg_trgm.
+    """
+    escapado = texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escapado}%"
+
+
+def consulta_tsquery(terminos: List[str]) -> str:
+    """Consulta to_tsquery con todas las palabras como prefijo (lapt -> laptop)"""
+    return " & ".join(f"{termino}:*" for termino in terminos)
+
+
+def consulta_fts5(terminos: List[str]) -> str:
+    """Consulta MATCH de FTS5 con todas las palabras como prefijo"""
+    return " ".join(f'"{termino}"*' for termino in terminos)
@@ -0,0 +1,258 @@
+"""
+Caché en memoria por proceso con invalidación entre workers
+
+- CacheTTL: entradas con tiempo de vida y número máximo (LRU).
+- CanalInvalidacion: avisa a los demás workers de que una tabla cambió.
+  En PostgreSQL usa NOTIFY dentro de la transacción de la escritura (el
+  aviso solo sale si hay COMMIT) y un hilo con LISTEN por proceso. Con otros
+  motores (SQLite en las pruebas) el aviso se entrega dentro del proceso
+  tras el COMMIT, como sustituto local.
+"""
+
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy import select as sql_select
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre comprobaciones de parada del hilo LISTEN y entre reconexiones
+INTERVALO_ESCUCHA = 5
+ESPERA_RECONEXION = 5
+
+
+def escucha_activa() -> bool:
+    """
+    Indicar si CACHE_ESCUCHA permite abrir el hilo LISTEN (activada por
+    defecto; las pruebas la desactivan y usan el aviso dentro del proceso)
+    """
+    return os.getenv("CACHE_ESCUCHA", "1").lower() in ("1", "true", "si", "sí")
+
+
+def _numero_env(nombre: str, por_defecto: int) -> int:
+    """
+    Leer una variable de entorno entera mayor o igual a 0
+
+    Raises:
+        ValueError: Si el valor no es un entero no negativo
+    """
+    valor = os.getenv(nombre, "").strip()
+    if not valor:
+        return por_defecto
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ValueError(f"La variable {nombre} debe ser un número entero")
+    if numero < 0:
+        raise ValueError(f"{nombre} no puede ser negativo")
+    return numero
+
+
+class CacheTTL:
+    """
+    Caché clave -> valor con TTL y tamaño máximo
+
+    Cada invalidación incrementa la generación. Quien consulta la base de
+    datos tras un fallo debe pasar a guardar() la generación leída antes de
+    la consulta: si entretanto hubo una invalidación, el valor (posiblemente
+    anterior a la escritura) se descarta en lugar de guardarse.
+    """
+
+    def __init__(self, ttl_segundos: float, max_entradas: int):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generacion = 0
+        self.reiniciar_estadisticas()
+
+    @classmethod
+    def desde_entorno(
+        cls, prefijo: str, ttl_defecto: int, max_defecto: int
+    ) -> "CacheTTL":
+        """
+        Crear la caché con <prefijo>_TTL (segundos) y <prefijo>_MAX
+
+        Un TTL o un máximo de 0 desactivan la caché.
+        """
+        return cls(
+            _numero_env(f"{prefijo}_TTL", ttl_defecto),
+            _numero_env(f"{prefijo}_MAX", max_defecto),
+        )
+
+    @property
+    def activa(self) -> bool:
+        return self.ttl_segundos > 0 and self.max_entradas > 0
+
+    def reiniciar_estadisticas(self):
+        with self._lock:
+            self.aciertos = 0
+            self.fallos = 0
+            self.expulsiones = 0
+            self.invalidaciones = 0
+
+    def obtener(self, clave: Hashable) -> Tuple[bool, Any]:
+        """
+        Buscar una clave vigente
+
+        Returns:
+            Tupla (encontrada, valor)
+        """
+        if not self.activa:
+            return False, None
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None or entrada[0] <= time.monotonic():
+                if entrada is not None:
+                    del self._datos[clave]
+                self.fallos += 1
+                return False, None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return True, entrada[1]
+
+    def guardar(self, clave: Hashable, valor: Any, generacion: int):
+        """
+        Guardar un valor leído de la base de datos
+
+        Args:
+            clave: Clave de la entrada
+            valor: Valor inmutable a guardar
+            generacion: Generación leída antes de consultar la base de datos
+        """
+        if not self.activa:
+            return
+        with self._lock:
+            if generacion != self.generacion:
+                return
+            self._datos[clave] = (time.monotonic() + self.ttl_segundos, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.expulsiones += 1
+
+    def invalidar(self):
+        """Vaciar la caché y descartar las lecturas en curso"""
+        with self._lock:
+            self._datos.clear()
+            self.generacion += 1
+            self.invalidaciones += 1
+
+    def resumen(self) -> Dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "activa": self.activa,
+                "ttl_segundos": self.ttl_segundos,
+                "max_entradas": self.max_entradas,
+                "entradas": len(self._datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": (
+                    round(self.aciertos / consultas, 3) if consultas else 0
+                ),
+                "expulsiones": self.expulsiones,
+                "invalidaciones": self.invalidaciones,
+            }
+
+
+class CanalInvalidacion:
+    """
+    Aviso de cambios entre los procesos que comparten la base de datos
+
+    publicar() se llama dentro de la transacción de la escritura, antes del
+    COMMIT; los suscriptores de todos los procesos se ejecutan cuando la
+    transacción se confirma.
+    """
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self._origen = uuid.uuid4().hex
+        self._suscriptores: List[Callable[[], None]] = []
+        self._hilo = None
+        self._detener = threading.Event()
+
+    def suscribir(self, funcion: Callable[[], None]):
+        """Registrar una función que se ejecuta con cada aviso"""
+        self._suscriptores.append(funcion)
+
+    def _entregar(self):
+        for funcion in list(self._suscriptores):
+            funcion()
+
+    def publicar(self, db):
+        """
+        Avisar del cambio en la transacción de la sesión
+
+        Args:
+            db: Sesión síncrona que está escribiendo
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(sql_select(func.pg_notify(self.nombre, self._origen)))
+        else:
+            event.listen(db, "after_commit", lambda sesion: self._entregar(), once=True)
+
+    def escuchar(self, engine):
+        """
+        Iniciar el hilo LISTEN del proceso (solo PostgreSQL)
+
+        Args:
+            engine: Engine síncrono (psycopg2) de la base de datos primaria
+        """
+        if engine.dialect.name != "postgresql" or self._hilo is not None:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(
+            target=self._bucle_escucha,
+            args=(engine,),
+            name=f"listen-{self.nombre}",
+            daemon=True,
+        )
+        self._hilo.start()
+
+    def detener(self):
+        """Detener el hilo LISTEN"""
+        hilo, self._hilo = self._hilo, None
+        if hilo is not None:
+            self._detener.set()
+            hilo.join(INTERVALO_ESCUCHA + 1)
+
+    def _bucle_escucha(self, engine):
+        while not self._detener.is_set():
+            conexion = None
+            try:
+                # Conexión propia fuera del pool: queda ocupada con LISTEN
+                conexion = engine.raw_connection()
+                conexion.detach()
+                dbapi = conexion.dbapi_connection
+                dbapi.autocommit = True
+                with dbapi.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.nombre}"')
+                # Los avisos emitidos mientras no se escuchaba se perdieron
+                self._entregar()
+                while not self._detener.is_set():
+                    if not select.select([dbapi], [], [], INTERVALO_ESCUCHA)[0]:
+                        continue
+                    dbapi.poll()
+                    avisos, dbapi.notifies[:] = list(dbapi.notifies), []
+                    if any(aviso.payload != self._origen for aviso in avisos):
+                        self._entregar()
+            except Exception:
+                logger.warning(
+                    "Se perdió la escucha del canal %s; se reintenta en %d s",
+                    self.nombre,
+                    ESPERA_RECONEXION,
+                    exc_info=True,
+                )
+                self._entregar()
+                self._detener.wait(ESPERA_RECONEXION)
+            finally:
+                if conexion is not None:
+                    conexion.close()
@@ -1,53 +1,292 @@
 """
 Configuración de la base de datos PostgreSQL con Neon
+
+Los engines se crean la primera vez que se usan (motores()), no al importar
+el módulo: importar los modelos o la app no lee .env, no exige DATABASE_URL
+y no carga los drivers. engine, SessionLocal, AsyncSessionLocal y el resto de
+nombres de siempre siguen disponibles como atributos del módulo.
 """
 
 import os
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, NamedTuple, Optional
 
+from database.instrumentacion import instrumentacion_activa, instrumentar_engine
+from database.pool import (
+    AsyncAdaptedQueuePoolMedido,
+    QueuePoolMedido,
+    calcular_config_pool,
+    estadisticas_pool,
+)
+from database.presupuesto import activar_conteo_engine, conteo_consultas_activo
+from database.routing import SesionEnrutada, marcar_ambito_peticion
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Cargar variables de entorno
-load_dotenv()
+# Base para los modelos
+Base = declarative_base()
 
-# Configuración de la base de datos Neon PostgreSQL
-# Obtener la URL completa de conexión desde las variables de entorno
-DATABASE_URL = os.getenv("DATABASE_URL")
+_lock_motores = threading.Lock()
+_motores: Optional["Motores"] = None
 
-if not DATABASE_URL:
-    raise ValueError("Se requiere DATABASE_URL en las variables de entorno")
 
-# Crear el motor de SQLAlchemy
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,  # Cambiar a True para ver consultas SQL
-    pool_pre_ping=True,  # Verificar conexión antes de usar
-    pool_recycle=300,  # Reciclar conexiones cada 5 minutos
-    connect_args={"sslmode": "require"},  # Requerir SSL para Neon
-)
+class Motores(NamedTuple):
+    """Engines y fábricas de sesiones de un proceso"""
 
-# Crear la sesión
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine: Engine
+    replica_engine: Optional[Engine]
+    async_engine: AsyncEngine
+    async_replica_engine: Optional[AsyncEngine]
+    SessionLocal: sessionmaker
+    AsyncSessionLocal: async_sessionmaker
+    POOL_CONFIG: dict
 
-# Base para los modelos
-Base = declarative_base()
+
+def _urls() -> tuple:
+    """
+    Leer DATABASE_URL y DATABASE_REPLICA_URL (cargando antes el archivo .env)
+
+    Raises:
+        ValueError: Si falta DATABASE_URL
+    """
+    load_dotenv()
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        raise ValueError("Se requiere DATABASE_URL en las variables de entorno")
+    # Réplica de solo lectura opcional para las consultas de catálogo
+    return url, os.getenv("DATABASE_REPLICA_URL") or None
+
+
+def motor_base_datos() -> str:
+    """
+    Nombre del motor de DATABASE_URL ("postgresql", "sqlite"...) sin crear
+    los engines
+
+    Raises:
+        ValueError: Si falta DATABASE_URL
+    """
+    return make_url(_urls()[0]).get_backend_name()
+
+
+def _crear_engine(url: str, pool_config: dict):
+    """Crear un motor síncrono con su porción del pool (pool_config["sincrono"])"""
+    return create_engine(
+        url,
+        echo=False,  # Cambiar a True para ver consultas SQL
+        pool_pre_ping=True,  # Verificar conexión antes de usar
+        poolclass=QueuePoolMedido,
+        pool_size=pool_config["sincrono"]["pool_size"],
+        max_overflow=pool_config["sincrono"]["max_overflow"],
+        pool_timeout=pool_config["pool_timeout"],
+        pool_recycle=pool_config["pool_recycle"],
+        connect_args={"sslmode": "require"},  # Requerir SSL para Neon
+    )
+
+
+def _url_asincrona(url: str):
+    """
+    Convertir la URL de conexión al driver asyncpg
+
+    asyncpg no entiende los parámetros de libpq (sslmode, channel_binding),
+    por lo que se retiran de la URL y el SSL se pasa en connect_args.
+    """
+    url_async = make_url(url).set(drivername="postgresql+asyncpg")
+    return url_async.difference_update_query(["sslmode", "channel_binding"])
+
+
+def _crear_async_engine(url: str, pool_config: dict):
+    """Crear un motor asíncrono (asyncpg) con la configuración del pool"""
+    return create_async_engine(
+        _url_asincrona(url),
+        echo=False,
+        pool_pre_ping=True,
+        poolclass=AsyncAdaptedQueuePoolMedido,
+        pool_size=pool_config["pool_size"],
+        max_overflow=pool_config["max_overflow"],
+        pool_timeout=pool_config["pool_timeout"],
+        pool_recycle=pool_config["pool_recycle"],
+        connect_args={"ssl": "require"},
+    )
+
+
+def _crear_motores() -> Motores:
+    url, url_replica = _urls()
+
+    # Parámetros del pool por worker (DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    # DB_POOL_TIMEOUT, DB_POOL_RECYCLE, o un presupuesto DB_MAX_CONEXIONES
+    # repartido entre WEB_CONCURRENCY); el motor asíncrono, el síncrono y la
+    # conexión de LISTEN comparten la porción del worker
+    pool_config = calcular_config_pool()
+
+    # Motor primario y, si existe, el de la réplica; los asíncronos (asyncpg)
+    # son los de las rutas, para no bloquear el event loop
+    engine = _crear_engine(url, pool_config)
+    replica_engine = _crear_engine(url_replica, pool_config) if url_replica else None
+    async_engine = _crear_async_engine(url, pool_config)
+    async_replica_engine = (
+        _crear_async_engine(url_replica, pool_config) if url_replica else None
+    )
+
+    # Medición de sentencias SQL (SQL_INSTRUMENTACION=1) y conteo por petición
+    # (SQL_CONTEO_CONSULTAS=1); sin listeners si están desactivados
+    for motor in (engine, replica_engine, async_engine, async_replica_engine):
+        if motor is None:
+            continue
+        if instrumentacion_activa():
+            instrumentar_engine(getattr(motor, "sync_engine", motor))
+        if conteo_consultas_activo():
+            activar_conteo_engine(getattr(motor, "sync_engine", motor))
+
+    return Motores(
+        engine=engine,
+        replica_engine=replica_engine,
+        async_engine=async_engine,
+        async_replica_engine=async_replica_engine,
+        # Las lecturas marcadas se enrutan a la réplica
+        SessionLocal=sessionmaker(
+            class_=SesionEnrutada,
+            autocommit=False,
+            autoflush=False,
+            bind=engine,
+            replica=replica_engine,
+        ),
+        # expire_on_commit=False: tras el commit no se puede recargar de
+        # forma perezosa
+        AsyncSessionLocal=async_sessionmaker(
+            bind=async_engine,
+            sync_session_class=SesionEnrutada,
+            autoflush=False,
+            expire_on_commit=False,
+            replica=async_replica_engine.sync_engine if async_replica_engine else None,
+        ),
+        POOL_CONFIG=pool_config,
+    )
+
+
+def motores() -> Motores:
+    """
+    Obtener los engines del proceso, creándolos la primera vez
+
+    Crear un engine no abre conexiones: la primera se abre con la primera
+    consulta.
+
+    Raises:
+        ValueError: Si falta DATABASE_URL
+    """
+    global _motores
+    with _lock_motores:
+        if _motores is None:
+            _motores = _crear_motores()
+        return _motores
+
+
+async def cerrar_motores():
+    """Cerrar los pools de conexiones; se vuelven a crear si se usan de nuevo"""
+    global _motores
+    with _lock_motores:
+        actuales, _motores = _motores, None
+    if actuales is None:
+        return
+    for motor in (actuales.async_engine, actuales.async_replica_engine):
+        if motor is not None:
+            await motor.dispose()
+    for motor in (actuales.engine, actuales.replica_engine):
+        if motor is not None:
+            motor.dispose()
+
+
+def __getattr__(nombre: str):
+    # engine, SessionLocal, AsyncSessionLocal, POOL_CONFIG...: se crean al
+    # primer acceso (from database.config import engine)
+    if nombre in Motores._fields:
+        return getattr(motores(), nombre)
+    if nombre == "DATABASE_URL":
+        return _urls()[0]
+    if nombre == "DATABASE_REPLICA_URL":
+        return _urls()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 
 def get_db():
     """
     Generador de sesiones de base de datos
     """
-    db = SessionLocal()
+    db = motores().SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
 
+async def get_async_db(request: Request):
+    """
+    Generador de sesiones asíncronas de base de datos
+
+    Las rutas GET pueden leer de la réplica; las mutaciones usan el primario.
+    """
+    async with motores().AsyncSessionLocal() as db:
+        marcar_ambito_peticion(db, request.method)
+        yield db
+
+
+@asynccontextmanager
+async def sesion_async(metodo: str = "GET") -> AsyncIterator[AsyncSession]:
+    """
+    Abrir una sesión asíncrona fuera de una dependencia
+
+    Para el código que sigue usando la base de datos después de que el
+    endpoint retorna (respuestas en streaming): la sesión se abre y se cierra
+    dentro del propio generador de la respuesta.
+
+    Args:
+        metodo: Método HTTP de la petición (los GET pueden leer de la réplica)
+    """
+    async with motores().AsyncSessionLocal() as db:
+        marcar_ambito_peticion(db, metodo)
+        yield db
+
+
+def get_fabrica_sesiones_async() -> Callable[..., AsyncIterator[AsyncSession]]:
+    """
+    Dependencia que entrega la fábrica de sesiones de las respuestas en
+    streaming (sesion_async); las pruebas la sustituyen
+    """
+    return sesion_async
+
+
 def create_tables():
     """
     Crear todas las tablas definidas en los modelos
     """
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=motores().engine)
+
+
+def obtener_estadisticas_pool() -> dict:
+    """
+    Obtener la configuración y el estado en vivo de los pools de conexiones
+    """
+    actuales = motores()
+    estadisticas = {
+        "configuracion": actuales.POOL_CONFIG,
+        "asincrono": estadisticas_pool(actuales.async_engine.sync_engine.pool),
+        "sincrono": estadisticas_pool(actuales.engine.pool),
+    }
+    if actuales.async_replica_engine is not None:
+        estadisticas["replica_asincrono"] = estadisticas_pool(
+            actuales.async_replica_engine.sync_engine.pool
+        )
+        estadisticas["replica_sincrono"] = estadisticas_pool(
+            actuales.replica_engine.pool
+        )
+    return estadisticas
@@ -0,0 +1,170 @@
+"""
+Comprobación de la versión del esquema al arrancar
+
+create_all en cada arranque consulta el catálogo tabla por tabla (varias
+idas y vueltas a Neon por worker). En su lugar se lee la revisión de Alembic
+con una sola consulta y se compara con la última de migrations/versions; las
+tablas se crean y actualizan antes de arrancar con migrar()
+(migrar_esquema.py, que ejecuta startup.sh).
+
+ESQUEMA_AL_INICIAR:
+    verificar (por defecto): el arranque falla si la revisión no coincide
+    crear: create_all como antes (desarrollo sin Alembic)
+    omitir: no se comprueba nada ni se crean los engines (p. ej. las
+        pruebas, que usan su propia base)
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+# Última revisión anterior a las migraciones de índices: el esquema que
+# creaban create_all y setup_database.py. Las bases sin alembic_version se
+# marcan en ella y las migraciones siguientes (CREATE INDEX IF NOT EXISTS)
+# se aplican encima.
+REVISION_CREATE_ALL = "04c005510a3f"
+
+VERIFICAR = "verificar"
+CREAR = "crear"
+OMITIR = "omitir"
+
+
+class EsquemaDesactualizado(RuntimeError):
+    """La base de datos no está en la revisión de Alembic que espera el código"""
+
+
+def modo_esquema() -> str:
+    """
+    Leer ESQUEMA_AL_INICIAR del entorno
+
+    Raises:
+        ValueError: Si el valor no es verificar, crear u omitir
+    """
+    modo = os.getenv("ESQUEMA_AL_INICIAR", VERIFICAR).strip().lower() or VERIFICAR
+    if modo not in (VERIFICAR, CREAR, OMITIR):
+        raise ValueError(
+            f"ESQUEMA_AL_INICIAR debe ser '{VERIFICAR}', '{CREAR}' u '{OMITIR}'"
+        )
+    return modo
+
+
+def config_alembic():
+    """Configuración de Alembic (alembic.ini) válida desde cualquier directorio"""
+    from alembic.config import Config
+
+    config = Config(str(RAIZ / "alembic.ini"))
+    config.set_main_option("script_location", str(RAIZ / "migrations"))
+    return config
+
+
+@lru_cache(maxsize=1)
+def version_esperada() -> str:
+    """
+    Obtener la última revisión de migrations/versions
+
+    Returns:
+        Revisión head de Alembic
+    """
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(config_alembic()).get_current_head()
+
+
+async def version_esquema(async_engine) -> Optional[str]:
+    """
+    Obtener la revisión de Alembic de la base de datos
+
+    Args:
+        async_engine: AsyncEngine de la base primaria
+
+    Returns:
+        Revisión actual, o None si la base no tiene tabla alembic_version
+    """
+    async with async_engine.connect() as conexion:
+        try:
+            resultado = await conexion.execute(
+                text("SELECT version_num FROM alembic_version")
+            )
+        except DBAPIError:
+            return None
+        return resultado.scalar()
+
+
+async def preparar_esquema(async_engine=None) -> str:
+    """
+    Comprobar (o crear) el esquema según ESQUEMA_AL_INICIAR
+
+    Args:
+        async_engine: AsyncEngine de la base primaria; por defecto el de
+            database.config, que solo se crea si el modo consulta la base
+
+    Returns:
+        Modo aplicado
+
+    Raises:
+        EsquemaDesactualizado: Si en modo verificar la revisión no coincide
+        ValueError: Si ESQUEMA_AL_INICIAR no es válido
+    """
+    modo = modo_esquema()
+    if modo == OMITIR:
+        return modo
+    if async_engine is None:
+        from database.config import motores
+
+        async_engine = motores().async_engine
+
+    if modo == CREAR:
+        from database.config import Base
+
+        async with async_engine.begin() as conexion:
+            await conexion.run_sync(Base.metadata.create_all)
+    else:
+        version = await version_esquema(async_engine)
+        esperada = version_esperada()
+        if version != esperada:
+            raise EsquemaDesactualizado(
+                f"La base de datos está en la revisión {version or '(ninguna)'} "
+                f"y la aplicación espera {esperada}: ejecute "
+                "'python migrar_esquema.py' (o 'alembic upgrade head')"
+            )
+    return modo
+
+
+def migrar(engine=None) -> str:
+    """
+    Llevar la base de datos a la última revisión de Alembic
+
+    Una base sin alembic_version (vacía, o creada con create_all) recibe las
+    tablas que falten con create_all y se marca en REVISION_CREATE_ALL antes
+    de aplicar las migraciones siguientes.
+
+    Args:
+        engine: Engine síncrono de DATABASE_URL (la base que migra Alembic);
+            por defecto el de database.config
+
+    Returns:
+        Revisión en la que queda la base de datos
+    """
+    from alembic import command
+    from alembic.runtime.migration import MigrationContext
+    from database.config import Base, motores
+
+    # Registrar los modelos en Base.metadata
+    from entities import categoria, producto, usuario  # noqa: F401
+
+    engine = engine if engine is not None else motores().engine
+    config = config_alembic()
+    with engine.begin() as conexion:
+        version = MigrationContext.configure(conexion).get_current_revision()
+        if version is None:
+            Base.metadata.create_all(conexion)
+    if version is None:
+        command.stamp(config, REVISION_CREATE_ALL)
+    command.upgrade(config, "head")
+    return version_esperada()
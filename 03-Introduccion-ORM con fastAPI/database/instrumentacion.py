@@ -0,0 +1,224 @@
+"""
+Instrumentación de sentencias SQL: latencia, filas, ruta de origen y log de lentas
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+logger_lento = logging.getLogger("sql.lento")
+
+# Límites superiores (ms) de los cubos del histograma; el último cubo es +inf
+CUBOS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+# Máximo de sentencias distintas con estadísticas propias
+MAX_SENTENCIAS = 200
+
+SIN_RUTA = "sin_ruta"
+
+# Scope ASGI de la petición en curso (lo fija MiddlewareContextoPeticion)
+_peticion_actual: ContextVar[Optional[dict]] = ContextVar(
+    "peticion_actual", default=None
+)
+
+
+def instrumentacion_activa() -> bool:
+    """Indicar si SQL_INSTRUMENTACION está activada en el entorno"""
+    return os.getenv("SQL_INSTRUMENTACION", "").lower() in ("1", "true", "si", "sí")
+
+
+def umbral_lento_ms() -> float:
+    """Umbral (SQL_LENTO_MS) a partir del cual una sentencia se registra como lenta"""
+    return float(os.getenv("SQL_LENTO_MS", "200"))
+
+
+def etiqueta_ruta() -> str:
+    """
+    Obtener la ruta de la petición en curso como "MÉTODO /plantilla/{param}"
+
+    Se usa la plantilla de la ruta (no la URL real) para que todas las
+    peticiones a un mismo endpoint compartan histograma.
+    """
+    scope = _peticion_actual.get()
+    if scope is None:
+        return SIN_RUTA
+    ruta = scope.get("route")
+    path = getattr(ruta, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+class MiddlewareContextoPeticion:
+    """Middleware ASGI que expone el scope de la petición a los listeners SQL"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _peticion_actual.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _peticion_actual.reset(token)
+
+
+class Histograma:
+    """Histograma de latencias con cubos fijos"""
+
+    def __init__(self):
+        self.conteo = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.filas = 0
+        self.cubos = [0] * (len(CUBOS_MS) + 1)
+
+    def registrar(self, duracion_ms: float, filas: Optional[int]):
+        self.conteo += 1
+        self.total_ms += duracion_ms
+        self.max_ms = max(self.max_ms, duracion_ms)
+        if filas is not None and filas > 0:
+            self.filas += filas
+        self.cubos[bisect_left(CUBOS_MS, duracion_ms)] += 1
+
+    def percentil(self, p: float) -> float:
+        """Aproximar un percentil con el límite superior de su cubo"""
+        if not self.conteo:
+            return 0.0
+        objetivo = p / 100 * self.conteo
+        acumulado = 0
+        for indice, cantidad in enumerate(self.cubos):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return (
+                    float(CUBOS_MS[indice]) if indice < len(CUBOS_MS) else self.max_ms
+                )
+        return self.max_ms
+
+    def resumen(self) -> Dict:
+        return {
+            "consultas": self.conteo,
+            "total_ms": round(self.total_ms, 3),
+            "promedio_ms": round(self.total_ms / self.conteo, 3) if self.conteo else 0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentil(50),
+            "p95_ms": self.percentil(95),
+            "p99_ms": self.percentil(99),
+            "filas": self.filas,
+            "cubos": {
+                **{f"<={limite}ms": n for limite, n in zip(CUBOS_MS, self.cubos)},
+                f">{CUBOS_MS[-1]}ms": self.cubos[-1],
+            },
+        }
+
+
+class RegistroSQL:
+    """Estadísticas acumuladas por ruta y por sentencia"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.por_ruta: Dict[str, Histograma] = {}
+            self.por_sentencia: Dict[str, Histograma] = {}
+            self.lentas = 0
+
+    def registrar(
+        self, ruta: str, sentencia: str, duracion_ms: float, filas: Optional[int]
+    ):
+        with self._lock:
+            self.por_ruta.setdefault(ruta, Histograma()).registrar(duracion_ms, filas)
+            histograma = self.por_sentencia.get(sentencia)
+            if histograma is None and len(self.por_sentencia) < MAX_SENTENCIAS:
+                histograma = self.por_sentencia[sentencia] = Histograma()
+            if histograma is not None:
+                histograma.registrar(duracion_ms, filas)
+
+    def registrar_lenta(self):
+        with self._lock:
+            self.lentas += 1
+
+    def resumen(self, top: int = 20) -> Dict:
+        """
+        Obtener las estadísticas por ruta y las sentencias más costosas
+
+        Args:
+            top: Número de sentencias a incluir, ordenadas por tiempo total
+        """
+        with self._lock:
+            sentencias: List = sorted(
+                self.por_sentencia.items(), key=lambda item: -item[1].total_ms
+            )[:top]
+            return {
+                "umbral_lento_ms": umbral_lento_ms(),
+                "sentencias_lentas": self.lentas,
+                "rutas": {
+                    ruta: histograma.resumen()
+                    for ruta, histograma in sorted(self.por_ruta.items())
+                },
+                "sentencias": [
+                    {"sql": sql, **histograma.resumen()}
+                    for sql, histograma in sentencias
+                ],
+            }
+
+
+registro_sql = RegistroSQL()
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    context._instrumentacion_inicio = time.perf_counter()
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_instrumentacion_inicio", None)
+    if inicio is None:
+        return
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+    filas = (
+        cursor.rowcount
+        if cursor.rowcount is not None and cursor.rowcount >= 0
+        else None
+    )
+    ruta = etiqueta_ruta()
+    registro_sql.registrar(ruta, statement, duracion_ms, filas)
+
+    if duracion_ms >= umbral_lento_ms():
+        registro_sql.registrar_lenta()
+        logger_lento.warning(
+            "Consulta lenta %.1f ms ruta=%s filas=%s sql=%s",
+            duracion_ms,
+            ruta,
+            filas,
+            " ".join(statement.split()),
+        )
+
+
+def instrumentar_engine(engine):
+    """
+    Registrar los listeners de medición en un engine síncrono
+
+    Para un AsyncEngine se debe pasar async_engine.sync_engine.
+
+    Args:
+        engine: Engine de SQLAlchemy
+    """
+    if not event.contains(engine, "before_cursor_execute", _antes_de_ejecutar):
+        event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+        event.listen(engine, "after_cursor_execute", _despues_de_ejecutar)
+
+
+def desinstrumentar_engine(engine):
+    """Retirar los listeners de medición de un engine"""
+    if event.contains(engine, "before_cursor_execute", _antes_de_ejecutar):
+        event.remove(engine, "before_cursor_execute", _antes_de_ejecutar)
+        event.remove(engine, "after_cursor_execute", _despues_de_ejecutar)
@@ -0,0 +1,149 @@
+"""
+Planes de ejecución de las consultas (EXPLAIN) y detección de recorridos completos
+
+Pensado para las pruebas de regresión de índices: se capturan las sentencias
+que emite un bloque de código y se pide su plan a la base de datos.
+
+- SQLite: EXPLAIN QUERY PLAN. "SCAN tabla" sin "USING ... INDEX" es un
+  recorrido completo; "SEARCH" o "SCAN ... USING INDEX" usan un índice.
+- PostgreSQL: EXPLAIN con enable_seqscan desactivado en la transacción, para
+  que con tablas casi vacías el planificador elija el índice si existe; un
+  "Seq Scan" que aparece igualmente indica que no hay índice utilizable.
+"""
+
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import event
+
+# Sentencias con plan de acceso a tablas (los INSERT no leen filas)
+_SENTENCIAS_CON_PLAN = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+# SQLite < 3.36 escribe "SCAN TABLE x"; con alias muestra "x AS a" o solo "a"
+_RECORRIDO_SQLITE = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+_RECORRIDO_POSTGRES = re.compile(r"Seq Scan on (\w+)")
+
+# Alias que genera SQLAlchemy para una tabla repetida (p. ej. categorias_1)
+_ALIAS = re.compile(r"^(\w+?)_\d+$")
+
+
+class RecorridoCompleto(AssertionError):
+    """Una consulta recorre una tabla completa en lugar de usar un índice"""
+
+
+@dataclass
+class ConsultaCapturada:
+    sentencia: str
+    parametros: Any
+
+
+@contextmanager
+def capturar_consultas(engine):
+    """
+    Guardar las sentencias (y sus parámetros) que un engine ejecuta en un bloque
+
+    Args:
+        engine: Engine síncrono a observar
+
+    Yields:
+        Lista de ConsultaCapturada, solo con sentencias que tienen plan
+    """
+    capturadas: List[ConsultaCapturada] = []
+
+    def _capturar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(_SENTENCIAS_CON_PLAN):
+            capturadas.append(ConsultaCapturada(statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capturar)
+    try:
+        yield capturadas
+    finally:
+        event.remove(engine, "before_cursor_execute", _capturar)
+
+
+def plan_consulta(conexion, consulta: ConsultaCapturada) -> List[str]:
+    """
+    Obtener el plan de ejecución de una sentencia capturada
+
+    Args:
+        conexion: Connection de SQLAlchemy (p. ej. sesion.connection())
+        consulta: Sentencia y parámetros tal como se enviaron al driver
+
+    Returns:
+        Líneas del plan
+    """
+    dialecto = conexion.dialect.name
+    if dialecto == "sqlite":
+        filas = conexion.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {consulta.sentencia}", consulta.parametros
+        )
+        return [fila[-1] for fila in filas]
+    if dialecto == "postgresql":
+        conexion.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        filas = conexion.exec_driver_sql(
+            f"EXPLAIN {consulta.sentencia}", consulta.parametros
+        )
+        return [fila[0] for fila in filas]
+    raise ValueError(f"EXPLAIN no soportado para el dialecto {dialecto}")
+
+
+def recorridos_completos(
+    dialecto: str, plan: Iterable[str], tablas: Optional[Iterable[str]] = None
+) -> List[str]:
+    """
+    Tablas que el plan recorre completas
+
+    Args:
+        dialecto: Nombre del dialecto ("sqlite" o "postgresql")
+        plan: Líneas devueltas por plan_consulta
+        tablas: Limitar la búsqueda a estas tablas (None = cualquiera);
+            sirve para ignorar CTE y subconsultas, que SQLite también "recorre"
+
+    Returns:
+        Nombres de las tablas recorridas sin índice
+    """
+    patron = _RECORRIDO_SQLITE if dialecto == "sqlite" else _RECORRIDO_POSTGRES
+    tablas = set(tablas) if tablas is not None else None
+    encontradas = []
+    for linea in plan:
+        coincidencia = patron.search(linea.strip())
+        if not coincidencia:
+            continue
+        tabla = coincidencia.group(1)
+        alias = _ALIAS.match(tabla)
+        if alias and tablas is not None and tabla not in tablas:
+            tabla = alias.group(1)
+        if tablas is None or tabla in tablas:
+            encontradas.append(tabla)
+    return encontradas
+
+
+def verificar_planes(
+    conexion, consultas: Iterable[ConsultaCapturada], tablas: Iterable[str]
+):
+    """
+    Comprobar que ninguna sentencia recorre completa alguna de las tablas
+
+    Args:
+        conexion: Connection sobre la que se piden los planes
+        consultas: Sentencias capturadas con capturar_consultas
+        tablas: Tablas del modelo que deben leerse por índice
+
+    Raises:
+        RecorridoCompleto: Con la sentencia y su plan si alguna no usa índice
+    """
+    tablas = list(tablas)
+    problemas = []
+    for consulta in consultas:
+        plan = plan_consulta(conexion, consulta)
+        recorridas = recorridos_completos(conexion.dialect.name, plan, tablas)
+        if recorridas:
+            detalle = "\n".join(f"    {linea}" for linea in plan)
+            problemas.append(
+                f"recorrido completo de {', '.join(recorridas)} en: "
+                f"{' '.join(consulta.sentencia.split())}\n  Plan:\n{detalle}"
+            )
+    if problemas:
+        raise RecorridoCompleto("\n".join(problemas))
@@ -0,0 +1,221 @@
+"""
+Configuración y medición del pool de conexiones
+"""
+
+import os
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Valores por defecto de SQLAlchemy cuando no hay presupuesto de conexiones
+POOL_SIZE_DEFECTO = 5
+MAX_OVERFLOW_DEFECTO = 10
+POOL_TIMEOUT_DEFECTO = 30
+POOL_RECYCLE_DEFECTO = 300
+WORKERS_DEFECTO = 4
+
+# Conexión que el hilo LISTEN de la caché de categorías mantiene fuera de
+# los pools (database/cache.py)
+CONEXIONES_ESCUCHA = 1
+# Pool del motor síncrono: en los workers las rutas usan el asíncrono y el
+# síncrono solo abre la conexión de LISTEN (que sale del pool)
+POOL_SINCRONO_SIZE = 1
+
+
+def _entero_env(nombre: str, por_defecto: int) -> int:
+    """
+    Leer una variable de entorno entera
+
+    Args:
+        nombre: Nombre de la variable
+        por_defecto: Valor si la variable no existe o está vacía
+
+    Returns:
+        Valor entero de la variable
+
+    Raises:
+        ValueError: Si la variable no es un entero válido
+    """
+    valor = os.getenv(nombre)
+    if valor is None or valor.strip() == "":
+        return por_defecto
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"La variable {nombre} debe ser un número entero")
+
+
+def calcular_config_pool() -> Dict[str, int]:
+    """
+    Calcular los parámetros del pool a partir de las variables de entorno
+
+    Variables:
+        DB_POOL_SIZE: Conexiones persistentes por worker
+        DB_MAX_OVERFLOW: Conexiones extra temporales por worker
+        DB_POOL_TIMEOUT: Segundos de espera máxima para obtener una conexión
+        DB_POOL_RECYCLE: Segundos antes de reciclar una conexión
+        DB_MAX_CONEXIONES: Presupuesto total de conexiones del servidor
+        WEB_CONCURRENCY: Número de workers de gunicorn
+
+    DB_POOL_SIZE y DB_MAX_OVERFLOW son los del motor asíncrono (el de las
+    rutas). Si se define DB_MAX_CONEXIONES, el presupuesto se reparte entre
+    los workers; de cada porción se reservan el pool del motor síncrono y la
+    conexión de LISTEN, y el resto es por defecto el pool asíncrono (dos
+    tercios persistentes y el resto como overflow).
+
+    Returns:
+        Diccionario con pool_size, max_overflow, pool_timeout, pool_recycle,
+        workers, presupuesto_worker y sincrono (pool_size y max_overflow
+        del motor síncrono)
+
+    Raises:
+        ValueError: Si una variable no es válida o el pool no cabe en la
+            porción del worker
+    """
+    workers = max(1, _entero_env("WEB_CONCURRENCY", WORKERS_DEFECTO))
+    max_conexiones = _entero_env("DB_MAX_CONEXIONES", 0)
+    reservadas = POOL_SINCRONO_SIZE + CONEXIONES_ESCUCHA
+
+    if max_conexiones > 0:
+        presupuesto_worker = max_conexiones // workers
+        if presupuesto_worker <= reservadas:
+            raise ValueError(
+                f"DB_MAX_CONEXIONES ({max_conexiones}) no alcanza para {workers} "
+                f"workers: cada uno necesita al menos {reservadas + 1} conexiones"
+            )
+        presupuesto_asincrono = presupuesto_worker - reservadas
+        pool_size_defecto = max(1, presupuesto_asincrono * 2 // 3)
+        max_overflow_defecto = presupuesto_asincrono - pool_size_defecto
+        sincrono = {"pool_size": POOL_SINCRONO_SIZE, "max_overflow": 0}
+    else:
+        presupuesto_worker = presupuesto_asincrono = 0
+        pool_size_defecto = POOL_SIZE_DEFECTO
+        max_overflow_defecto = MAX_OVERFLOW_DEFECTO
+        sincrono = {
+            "pool_size": POOL_SINCRONO_SIZE,
+            "max_overflow": MAX_OVERFLOW_DEFECTO,
+        }
+
+    pool_size = _entero_env("DB_POOL_SIZE", pool_size_defecto)
+    max_overflow = _entero_env("DB_MAX_OVERFLOW", max_overflow_defecto)
+
+    if pool_size < 1:
+        raise ValueError("DB_POOL_SIZE debe ser mayor o igual a 1")
+    if max_overflow < 0:
+        raise ValueError("DB_MAX_OVERFLOW no puede ser negativo")
+    if presupuesto_worker and pool_size + max_overflow > presupuesto_asincrono:
+        raise ValueError(
+            f"DB_POOL_SIZE + DB_MAX_OVERFLOW ({pool_size + max_overflow}) excede "
+            f"el presupuesto por worker ({presupuesto_worker}) menos las "
+            f"{reservadas} conexiones del motor síncrono y de LISTEN"
+        )
+
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": _entero_env("DB_POOL_TIMEOUT", POOL_TIMEOUT_DEFECTO),
+        "pool_recycle": _entero_env("DB_POOL_RECYCLE", POOL_RECYCLE_DEFECTO),
+        "workers": workers,
+        "presupuesto_worker": presupuesto_worker,
+        "sincrono": sincrono,
+    }
+
+
+class EstadisticasPool:
+    """Contadores acumulados de las esperas por una conexión del pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+
+    def registrar_espera(self, segundos: float, timeout: bool = False):
+        """Registrar una solicitud de conexión y su tiempo de espera"""
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.espera_total += segundos
+            self.espera_max = max(self.espera_max, segundos)
+
+    def reiniciar(self):
+        """Poner a cero los contadores"""
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.espera_total = 0.0
+            self.espera_max = 0.0
+
+    def resumen(self) -> Dict[str, float]:
+        """Obtener una copia de los contadores en milisegundos"""
+        with self._lock:
+            solicitudes = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "espera_promedio_ms": round(
+                    self.espera_total / solicitudes * 1000 if solicitudes else 0.0, 3
+                ),
+                "espera_max_ms": round(self.espera_max * 1000, 3),
+            }
+
+
+class _MedicionPoolMixin:
+    """Mide el tiempo de espera de cada checkout y cuenta los timeouts"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estadisticas = EstadisticasPool()
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super().connect()
+        except exc.TimeoutError:
+            self.estadisticas.registrar_espera(
+                time.perf_counter() - inicio, timeout=True
+            )
+            raise
+        self.estadisticas.registrar_espera(time.perf_counter() - inicio)
+        return conexion
+
+    def recreate(self):
+        # Conservar los contadores cuando el engine recrea el pool (dispose)
+        nuevo = super().recreate()
+        nuevo.estadisticas = self.estadisticas
+        return nuevo
+
+
+class QueuePoolMedido(_MedicionPoolMixin, QueuePool):
+    """QueuePool con medición de esperas para el motor síncrono"""
+
+
+class AsyncAdaptedQueuePoolMedido(_MedicionPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool con medición de esperas para el motor asyncpg"""
+
+
+def estadisticas_pool(pool) -> Dict[str, float]:
+    """
+    Obtener el estado actual de un pool de conexiones
+
+    Args:
+        pool: Pool del engine (engine.pool)
+
+    Returns:
+        Diccionario con tamaño, conexiones en uso, overflow y esperas
+    """
+    datos = {
+        "tamano": pool.size(),
+        "en_uso": pool.checkedout(),
+        "disponibles": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+    }
+    if hasattr(pool, "estadisticas"):
+        datos.update(pool.estadisticas.resumen())
+    return datos
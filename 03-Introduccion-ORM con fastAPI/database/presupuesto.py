@@ -0,0 +1,225 @@
+"""
+Conteo de consultas SQL por petición, presupuestos y detección de patrones N+1
+"""
+
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+logger_n_mas_1 = logging.getLogger("sql.n_mas_1")
+
+# Veces que una misma sentencia debe repetirse para considerarse un patrón N+1
+REPETICIONES_N_MAS_1 = 2
+
+# Control de transacciones: no son consultas y dependen de cómo se abra la
+# transacción (p. ej. las pruebas anidan cada commit en un SAVEPOINT)
+_CONTROL_TRANSACCION = (
+    "BEGIN",
+    "SAVEPOINT ",
+    "RELEASE SAVEPOINT ",
+    "ROLLBACK TO SAVEPOINT ",
+)
+
+# Contador de la petición en curso (lo fija MiddlewarePresupuestoConsultas)
+_contador_actual: ContextVar[Optional["ContadorConsultas"]] = ContextVar(
+    "contador_consultas", default=None
+)
+
+
+class PresupuestoConsultasExcedido(AssertionError):
+    """Un bloque de código emitió más consultas de las permitidas o repitió sentencias"""
+
+
+def conteo_consultas_activo() -> bool:
+    """Indicar si SQL_CONTEO_CONSULTAS está activado en el entorno"""
+    return os.getenv("SQL_CONTEO_CONSULTAS", "").lower() in ("1", "true", "si", "sí")
+
+
+def presupuesto_peticion() -> Optional[int]:
+    """
+    Máximo de consultas por petición (SQL_PRESUPUESTO_PETICION), si se definió
+
+    Raises:
+        ValueError: Si la variable no es un entero válido
+    """
+    valor = os.getenv("SQL_PRESUPUESTO_PETICION")
+    if valor is None or valor.strip() == "":
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(
+            "La variable SQL_PRESUPUESTO_PETICION debe ser un número entero"
+        )
+
+
+class ContadorConsultas:
+    """Sentencias SQL emitidas dentro de un bloque o de una petición"""
+
+    def __init__(self):
+        self.sentencias: List[str] = []
+
+    def registrar(self, sentencia: str):
+        sentencia = " ".join(sentencia.split())
+        if not sentencia.upper().startswith(_CONTROL_TRANSACCION):
+            self.sentencias.append(sentencia)
+
+    @property
+    def total(self) -> int:
+        return len(self.sentencias)
+
+    def repetidas(self, minimo: int = REPETICIONES_N_MAS_1) -> Dict[str, int]:
+        """
+        Obtener las sentencias idénticas ejecutadas varias veces
+
+        La misma sentencia con distintos parámetros dentro de una petición es
+        el síntoma típico de un N+1 (o de una consulta duplicada).
+
+        Args:
+            minimo: Número mínimo de repeticiones para reportarla
+
+        Returns:
+            Diccionario sentencia -> número de ejecuciones
+        """
+        return {
+            sentencia: veces
+            for sentencia, veces in Counter(self.sentencias).items()
+            if veces >= minimo
+        }
+
+    def verificar(self, maximo: Optional[int] = None, permitir_repetidas=False):
+        """
+        Comprobar el presupuesto de consultas
+
+        Args:
+            maximo: Número máximo de consultas permitidas (None = sin límite)
+            permitir_repetidas: No fallar por sentencias repetidas
+
+        Raises:
+            PresupuestoConsultasExcedido: Si se excede el máximo o hay repetidas
+        """
+        problemas = []
+        if maximo is not None and self.total > maximo:
+            problemas.append(
+                f"se emitieron {self.total} consultas y el máximo es {maximo}"
+            )
+        repetidas = {} if permitir_repetidas else self.repetidas()
+        for sentencia, veces in repetidas.items():
+            problemas.append(f"posible N+1: {veces} ejecuciones de: {sentencia}")
+        if problemas:
+            detalle = "\n".join(f"  {i}. {s}" for i, s in enumerate(self.sentencias, 1))
+            raise PresupuestoConsultasExcedido(
+                "; ".join(problemas) + f"\nConsultas emitidas:\n{detalle}"
+            )
+
+
+def _contar_en_peticion(conn, cursor, statement, parameters, context, executemany):
+    contador = _contador_actual.get()
+    if contador is not None:
+        contador.registrar(statement)
+
+
+def activar_conteo_engine(engine):
+    """
+    Registrar el listener que cuenta las sentencias de cada petición
+
+    Args:
+        engine: Engine síncrono (para un AsyncEngine, async_engine.sync_engine)
+    """
+    if not event.contains(engine, "before_cursor_execute", _contar_en_peticion):
+        event.listen(engine, "before_cursor_execute", _contar_en_peticion)
+
+
+def desactivar_conteo_engine(engine):
+    """Retirar el listener de conteo por petición de un engine"""
+    if event.contains(engine, "before_cursor_execute", _contar_en_peticion):
+        event.remove(engine, "before_cursor_execute", _contar_en_peticion)
+
+
+@contextmanager
+def contar_consultas(engine, maximo: Optional[int] = None, permitir_repetidas=False):
+    """
+    Contar las sentencias que un engine ejecuta dentro de un bloque
+
+    Pensado para las pruebas: al salir del bloque sin errores se verifica el
+    presupuesto y las sentencias repetidas.
+
+    Args:
+        engine: Engine síncrono a observar
+        maximo: Número máximo de consultas permitidas (None = solo contar)
+        permitir_repetidas: No fallar por sentencias repetidas
+
+    Yields:
+        ContadorConsultas con las sentencias emitidas
+    """
+    contador = ContadorConsultas()
+
+    def _contar(conn, cursor, statement, parameters, context, executemany):
+        contador.registrar(statement)
+
+    event.listen(engine, "before_cursor_execute", _contar)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, "before_cursor_execute", _contar)
+    contador.verificar(maximo, permitir_repetidas)
+
+
+class MiddlewarePresupuestoConsultas:
+    """
+    Middleware ASGI que cuenta las consultas de cada petición
+
+    Añade la cabecera X-Consultas-SQL con las consultas emitidas hasta el
+    inicio de la respuesta y escribe en el logger sql.n_mas_1 las peticiones
+    con sentencias repetidas o que superan SQL_PRESUPUESTO_PETICION.
+
+    SQL_PRESUPUESTO_PETICION se lee al construir el middleware (al arrancar
+    la aplicación): un valor inválido impide el arranque en lugar de hacer
+    fallar cada petición.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.maximo = presupuesto_peticion()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        contador = ContadorConsultas()
+        token = _contador_actual.set(contador)
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                cabeceras = list(mensaje.get("headers", []))
+                cabeceras.append((b"x-consultas-sql", str(contador.total).encode()))
+                mensaje = {**mensaje, "headers": cabeceras}
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _contador_actual.reset(token)
+            self._reportar(scope, contador)
+
+    def _reportar(self, scope, contador: ContadorConsultas):
+        ruta = scope.get("route")
+        etiqueta = f"{scope.get('method')} {getattr(ruta, 'path', scope.get('path'))}"
+        maximo = self.maximo
+        if maximo is not None and contador.total > maximo:
+            logger_n_mas_1.warning(
+                "%s emitió %d consultas (presupuesto %d)",
+                etiqueta,
+                contador.total,
+                maximo,
+            )
+        for sentencia, veces in contador.repetidas().items():
+            logger_n_mas_1.warning(
+                "%s posible N+1: %d ejecuciones de: %s", etiqueta, veces, sentencia
+            )
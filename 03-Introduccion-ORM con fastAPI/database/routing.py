@@ -0,0 +1,93 @@
+"""
+Enrutamiento de sesiones entre la base de datos primaria y la réplica de lectura
+"""
+
+import functools
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+# Claves en Session.info que controlan el enrutamiento
+CLAVE_LECTURA = "enrutamiento_lectura"
+CLAVE_PRIMARIO = "enrutamiento_primario"
+CLAVE_ESCRITO = "enrutamiento_escrito"
+
+
+class SesionEnrutada(Session):
+    """
+    Session que envía las consultas de solo lectura a la réplica
+
+    Una consulta va a la réplica solo si:
+    - hay una réplica configurada,
+    - es un SELECT y no forma parte de un flush,
+    - está dentro de un ámbito de lectura (método @solo_lectura o ruta GET),
+    - no está dentro de un ámbito primario (método @en_primario o ruta de escritura),
+    - la sesión todavía no ha escrito nada (lectura después de escritura).
+    """
+
+    def __init__(self, *args, replica=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def usa_replica(self, clause=None) -> bool:
+        """Indicar si una consulta debe ir a la réplica"""
+        return (
+            self.replica is not None
+            and isinstance(clause, Select)
+            and not self._flushing
+            and self.info.get(CLAVE_LECTURA, 0) > 0
+            and self.info.get(CLAVE_PRIMARIO, 0) == 0
+            and not self.info.get(CLAVE_ESCRITO, False)
+        )
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.usa_replica(clause):
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(SesionEnrutada, "after_flush")
+def _marcar_escritura(session, flush_context):
+    """A partir de la primera escritura todas las lecturas van al primario"""
+    session.info[CLAVE_ESCRITO] = True
+
+
+def _ambito(clave: str):
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            info = self.db.info
+            info[clave] = info.get(clave, 0) + 1
+            try:
+                return metodo(self, *args, **kwargs)
+            finally:
+                info[clave] -= 1
+
+        return envoltura
+
+    return decorador
+
+
+# Métodos CRUD que solo leen: pueden usar la réplica
+solo_lectura = _ambito(CLAVE_LECTURA)
+
+# Métodos CRUD que escriben: sus lecturas de validación van al primario
+en_primario = _ambito(CLAVE_PRIMARIO)
+
+
+def marcar_ambito_peticion(db, metodo_http: str):
+    """
+    Marcar la sesión de una petición según su método HTTP
+
+    Las peticiones GET/HEAD pueden leer de la réplica; el resto (mutaciones)
+    mantienen todas sus lecturas en el primario.
+
+    Args:
+        db: Session o AsyncSession de la petición
+        metodo_http: Método HTTP de la petición
+    """
+    if metodo_http in ("GET", "HEAD"):
+        db.info[CLAVE_LECTURA] = db.info.get(CLAVE_LECTURA, 0) + 1
+    else:
+        db.info[CLAVE_PRIMARIO] = db.info.get(CLAVE_PRIMARIO, 0) + 1
@@ -1,7 +1,7 @@
 import uuid
 
 from database.config import Base
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -29,5 +29,17 @@ class Categoria(Base):
 
     productos = relationship("Producto", back_populates="categoria")
 
+    # Índices de la paginación y de las claves foráneas (migración b7e2d9c4f610)
+    __table_args__ = (
+        Index("ix_categorias_fecha_creacion", "fecha_creacion", "id_categoria"),
+        Index("ix_categorias_id_usuario_crea", "id_usuario_crea"),
+        Index(
+            "ix_categorias_id_usuario_edita",
+            "id_usuario_edita",
+            postgresql_where=text("id_usuario_edita IS NOT NULL"),
+            sqlite_where=text("id_usuario_edita IS NOT NULL"),
+        ),
+    )
+
     def __repr__(self):
         return f"<Categoria(id_categoria={self.id_categoria}, nombre='{self.nombre}')>"
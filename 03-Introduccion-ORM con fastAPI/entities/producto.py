@@ -1,7 +1,18 @@
 import uuid
 
+from database.busqueda import instalar_indices_busqueda
 from database.config import Base
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -50,5 +61,31 @@ class Producto(Base):
         foreign_keys=[id_usuario_edita],
     )
 
+    # Índices de los filtros, del orden de la paginación (fecha_creacion, id)
+    # y de las claves foráneas; la migración b7e2d9c4f610 crea los mismos
+    __table_args__ = (
+        Index("ix_productos_fecha_creacion", "fecha_creacion", "id_producto"),
+        Index(
+            "ix_productos_categoria_fecha",
+            "categoria_id",
+            "fecha_creacion",
+            "id_producto",
+        ),
+        Index(
+            "ix_productos_usuario_fecha", "usuario_id", "fecha_creacion", "id_producto"
+        ),
+        Index("ix_productos_id_usuario_crea", "id_usuario_crea"),
+        Index(
+            "ix_productos_id_usuario_edita",
+            "id_usuario_edita",
+            postgresql_where=text("id_usuario_edita IS NOT NULL"),
+            sqlite_where=text("id_usuario_edita IS NOT NULL"),
+        ),
+    )
+
     def __repr__(self):
         return f"<Producto(id_producto={self.id_producto}, nombre='{self.nombre}', precio={self.precio})>"
+
+
+# Índices de búsqueda de texto (GIN en PostgreSQL, FTS5 en SQLite)
+instalar_indices_busqueda(Producto.__table__)
@@ -1,7 +1,7 @@
 import uuid
 
 from database.config import Base
-from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy import Boolean, Column, DateTime, Index, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -21,6 +21,18 @@ class Usuario(Base):
     fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
     fecha_edicion = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Índice de la paginación e índice parcial de administradores (pocas
+    # filas); la migración b7e2d9c4f610 crea los mismos
+    __table_args__ = (
+        Index("ix_tbl_usuarios_fecha_creacion", "fecha_creacion", "id"),
+        Index(
+            "ix_tbl_usuarios_admin",
+            "id",
+            postgresql_where=text("es_admin"),
+            sqlite_where=text("es_admin = 1"),
+        ),
+    )
+
     # productos = relationship(
     #     "Producto", back_populates="usuario", foreign_keys="Producto.usuario_id"
     # )
@@ -1,50 +1,127 @@
 """
 Sistema de gestión de productos con ORM SQLAlchemy y Neon PostgreSQL
 API REST con FastAPI - Sin interfaz de consola
+
+La app se construye con create_app(). Importar este módulo no importa los
+routers ni crea engines; main.app se crea la primera vez que se pide
+(gunicorn/uvicorn "main:app", pruebas).
 """
 
-import uvicorn
-from apis import auth, categoria, producto, usuario
-from database.config import create_tables
+import time
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-# Crear la aplicación FastAPI
-app = FastAPI(
-    title="Sistema de Gestión de Productos",
-    description="API REST para gestión de usuarios, categorías y productos con autenticación",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
-)
-
-# Configurar CORS para permitir peticiones desde el frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # En producción, especificar dominios específicos
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Incluir los routers de las APIs
-app.include_router(auth.router)
-app.include_router(usuario.router)
-app.include_router(categoria.router)
-app.include_router(producto.router)
-
-
-@app.on_event("startup")
+
+def create_app() -> FastAPI:
+    """
+    Crear la aplicación FastAPI con sus middlewares, routers y eventos
+
+    Los engines no se crean aquí sino con la primera consulta o en el evento
+    de inicio.
+
+    Returns:
+        Aplicación lista para servir
+    """
+    from dotenv import load_dotenv
+
+    # Los routers leen su configuración (TOKEN_SECRETO...) al importarse
+    load_dotenv()
+
+    # Los routers importan los CRUD, los modelos y la seguridad: se cargan
+    # al crear la app, no al importar main
+    from apis import auth, categoria, monitoreo, producto, usuario
+    from apis.serializacion import clase_respuesta
+    from crud.paginacion import CABECERA_SIGUIENTE_CURSOR
+    from database.instrumentacion import MiddlewareContextoPeticion
+    from database.presupuesto import (
+        MiddlewarePresupuestoConsultas,
+        conteo_consultas_activo,
+    )
+
+    # Crear la aplicación FastAPI
+    app = FastAPI(
+        title="Sistema de Gestión de Productos",
+        description="API REST para gestión de usuarios, categorías y productos con autenticación",
+        version="1.0.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        # Codificador JSON de las respuestas (orjson si está disponible)
+        default_response_class=clase_respuesta(),
+    )
+
+    # Configurar CORS para permitir peticiones desde el frontend
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # En producción, especificar dominios específicos
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[CABECERA_SIGUIENTE_CURSOR, "ETag", "Last-Modified"],
+    )
+
+    # Exponer la ruta de cada petición a la instrumentación SQL
+    app.add_middleware(MiddlewareContextoPeticion)
+
+    # Contar las consultas de cada petición y avisar de patrones N+1
+    if conteo_consultas_activo():
+        app.add_middleware(MiddlewarePresupuestoConsultas)
+
+    # Incluir los routers de las APIs
+    app.include_router(auth.router)
+    app.include_router(usuario.router)
+    app.include_router(categoria.router)
+    app.include_router(producto.router)
+    app.include_router(monitoreo.router)
+
+    # La revisión esperada (alembic lee migrations/) se calcula al crear la
+    # app: con gunicorn --preload, una sola vez en el proceso maestro
+    from database.esquema import VERIFICAR, modo_esquema, version_esperada
+
+    if modo_esquema() == VERIFICAR:
+        version_esperada()
+
+    app.add_event_handler("startup", startup_event)
+    app.add_event_handler("shutdown", shutdown_event)
+    app.add_api_route("/", root, methods=["GET"], tags=["raíz"])
+    return app
+
+
 async def startup_event():
     """Evento de inicio de la aplicación"""
+    from crud.categoria_crud import canal_categorias
+    from database.cache import escucha_activa
+    from database.config import motor_base_datos, motores
+    from database.esquema import preparar_esquema
+
     print("Iniciando Sistema de Gestión de Productos...")
-    print("Configurando base de datos...")
-    create_tables()
+    inicio = time.perf_counter()
+    # Una consulta a alembic_version en lugar de create_all (ESQUEMA_AL_INICIAR);
+    # con "omitir" no se crean los engines
+    modo = await preparar_esquema()
+    print(
+        f"Esquema de base de datos: {modo} "
+        f"({(time.perf_counter() - inicio) * 1000:.0f} ms)"
+    )
+    # Invalidar la caché de categorías cuando otro worker las modifique
+    # (LISTEN solo existe en PostgreSQL; CACHE_ESCUCHA=0 lo desactiva)
+    if escucha_activa() and motor_base_datos() == "postgresql":
+        canal_categorias.escuchar(motores().engine)
     print("Sistema listo para usar.")
     print("Documentación disponible en: http://localhost:8000/docs")
 
 
-@app.get("/", tags=["raíz"])
+async def shutdown_event():
+    """Evento de cierre de la aplicación"""
+    from auth.pool_hash import pool_hash
+    from crud.categoria_crud import canal_categorias
+    from database.config import cerrar_motores
+
+    pool_hash.cerrar()
+    canal_categorias.detener()
+    await cerrar_motores()
+
+
 async def root():
     """Endpoint raíz que devuelve información básica de la API."""
     return {
@@ -57,15 +134,28 @@ async def root():
             "usuarios": "/usuarios",
             "categorias": "/categorias",
             "productos": "/productos",
+            "monitoreo": "/monitoreo",
         },
     }
 
 
+def __getattr__(nombre: str):
+    # main.app para "main:app" y las pruebas: se crea al primer acceso
+    if nombre == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
 def main():
     """Función principal para ejecutar el servidor"""
+    import uvicorn
+
     print("Iniciando servidor FastAPI...")
     uvicorn.run(
-        "main:app",
+        "main:create_app",
+        factory=True,
         host="0.0.0.0",
         port=8000,
         reload=True,  # Recargar automáticamente en desarrollo
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Script para medir el tiempo de importación y arranque de la API
+
+Cada repetición se ejecuta en un proceso de Python nuevo (arranque en frío,
+como un worker recién creado por el autoescalado) y mide:
+
+- importar: import main (FastAPI y la configuración, sin routers ni engines)
+- crear_app: create_app() (routers, CRUD, modelos y seguridad)
+- arranque: eventos de inicio (comprobación del esquema según
+  ESQUEMA_AL_INICIAR e hilo LISTEN de la caché)
+- primera_respuesta: GET / con la app ya arrancada
+- proceso: el proceso completo, incluido el arranque del intérprete
+
+Con la configuración del despliegue (.env) la fase de arranque incluye la
+consulta a alembic_version; sin base de datos accesible se puede medir con
+ESQUEMA_AL_INICIAR=omitir y CACHE_ESCUCHA=0 (y TOKEN_SECRETO_TEMPORAL=1 si no
+hay TOKEN_SECRETO). Para ver qué módulos tardan más en importarse:
+python -X importtime -c "import main"
+
+Uso:
+    python medir_arranque.py --repeticiones 5
+    python medir_arranque.py --maximo-ms 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+FASES = ("importar", "crear_app", "arranque", "primera_respuesta")
+
+
+def medir_en_proceso() -> dict:
+    """Medir las fases en este proceso (debe ser un proceso nuevo)"""
+    tiempos = {}
+    inicio = time.perf_counter()
+    import main
+
+    tiempos["importar"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    app = main.create_app()
+    tiempos["crear_app"] = time.perf_counter() - inicio
+
+    async def arrancar_y_pedir():
+        import httpx
+
+        inicio = time.perf_counter()
+        await app.router.startup()
+        tiempos["arranque"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://arranque"
+        ) as cliente:
+            respuesta = await cliente.get("/")
+        tiempos["primera_respuesta"] = time.perf_counter() - inicio
+        respuesta.raise_for_status()
+        await app.router.shutdown()
+
+    asyncio.run(arrancar_y_pedir())
+    return {fase: segundos * 1000 for fase, segundos in tiempos.items()}
+
+
+def medir_proceso_nuevo() -> dict:
+    """Ejecutar una medición en un proceso de Python nuevo"""
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--hijo"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if proceso.returncode != 0:
+        # Configuración incompleta (DATABASE_URL, TOKEN_SECRETO...): mostrar el error
+        sys.exit(proceso.stderr.strip().splitlines()[-1])
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+    resultado["proceso"] = (time.perf_counter() - inicio) * 1000
+    return resultado
+
+
+def main():
+    """Funcion principal"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument(
+        "--maximo-ms",
+        type=float,
+        help="Fallar (código 1) si la mediana de importar+crear_app+arranque lo supera",
+    )
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        # La última línea es el resultado; el arranque de la app también imprime
+        print(json.dumps(medir_en_proceso()))
+        return
+
+    mediciones = [medir_proceso_nuevo() for _ in range(args.repeticiones)]
+    for medicion in mediciones:
+        medicion["listo"] = sum(medicion[fase] for fase in FASES[:3])
+
+    print(f"Arranque en frío, {args.repeticiones} procesos\n")
+    print(f"{'fase':<20}{'mediana ms':>12}{'max ms':>10}")
+    for fase in (*FASES, "listo", "proceso"):
+        valores = [medicion[fase] for medicion in mediciones]
+        print(f"{fase:<20}{statistics.median(valores):>12.1f}{max(valores):>10.1f}")
+
+    listo = statistics.median(medicion["listo"] for medicion in mediciones)
+    if args.maximo_ms is not None and listo > args.maximo_ms:
+        print(
+            f"\nEl arranque ({listo:.0f} ms) supera el máximo de {args.maximo_ms:.0f} ms"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Script para llevar la base de datos a la última migración de Alembic
+
+Equivale a "alembic upgrade head", y además prepara las bases sin tabla
+alembic_version (vacías o creadas con setup_database.py / create_all): crea
+las tablas que falten y las marca en la revisión que ya tienen antes de
+aplicar las migraciones siguientes. Se ejecuta una vez por despliegue
+(startup.sh) antes de arrancar los workers, que solo comprueban la revisión.
+
+Uso:
+    python migrar_esquema.py
+"""
+
+import sys
+
+from database.esquema import migrar
+
+
+def main():
+    """Funcion principal"""
+    try:
+        revision = migrar()
+    except Exception as e:
+        print(f"❌ Error al migrar la base de datos: {e}")
+        return False
+    print(f"✅ Base de datos en la revisión {revision}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
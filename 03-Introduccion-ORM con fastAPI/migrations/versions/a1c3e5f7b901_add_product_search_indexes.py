@@ -0,0 +1,40 @@
+"""Add full-text and trigram search indexes to productos
+
+Revision ID: a1c3e5f7b901
+Revises: 04c005510a3f
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a1c3e5f7b901"
+down_revision = "04c005510a3f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Extensión de trigramas para búsquedas por subcadena y similitud
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Índice GIN de texto completo sobre nombre + descripcion; la expresión
+    # debe coincidir con DOCUMENTO_PG (database/busqueda.py)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_productos_busqueda ON productos "
+        "USING gin (to_tsvector('spanish', "
+        "coalesce(nombre, '') || ' ' || coalesce(descripcion, '')))"
+    )
+
+    # Índice GIN de trigramas sobre nombre (ILIKE '%x%' y similarity)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_productos_nombre_trgm ON productos "
+        "USING gin (nombre gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    # La extensión pg_trgm se conserva: otros objetos pueden depender de ella
+    op.execute("DROP INDEX IF EXISTS ix_productos_nombre_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_productos_busqueda")
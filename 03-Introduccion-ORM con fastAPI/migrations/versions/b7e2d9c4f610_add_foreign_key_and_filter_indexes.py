@@ -0,0 +1,94 @@
+"""Add indexes for foreign keys, filters and cursor pagination
+
+Revision ID: b7e2d9c4f610
+Revises: a1c3e5f7b901
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7e2d9c4f610"
+down_revision = "a1c3e5f7b901"
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas, condición del índice parcial); deben coincidir con
+# los __table_args__ de entities/
+INDICES = [
+    # Paginación por cursor: ORDER BY fecha_creacion, id
+    (
+        "ix_productos_fecha_creacion",
+        "productos",
+        ["fecha_creacion", "id_producto"],
+        None,
+    ),
+    (
+        "ix_categorias_fecha_creacion",
+        "categorias",
+        ["fecha_creacion", "id_categoria"],
+        None,
+    ),
+    ("ix_tbl_usuarios_fecha_creacion", "tbl_usuarios", ["fecha_creacion", "id"], None),
+    # Listados por categoría y por usuario (filtro + orden de la página) y
+    # claves foráneas categoria_id y usuario_id
+    (
+        "ix_productos_categoria_fecha",
+        "productos",
+        ["categoria_id", "fecha_creacion", "id_producto"],
+        None,
+    ),
+    (
+        "ix_productos_usuario_fecha",
+        "productos",
+        ["usuario_id", "fecha_creacion", "id_producto"],
+        None,
+    ),
+    # Claves foráneas de auditoría (borrado de usuarios); id_usuario_edita es
+    # NULL hasta la primera edición, así que el índice es parcial
+    ("ix_productos_id_usuario_crea", "productos", ["id_usuario_crea"], None),
+    (
+        "ix_productos_id_usuario_edita",
+        "productos",
+        ["id_usuario_edita"],
+        "id_usuario_edita IS NOT NULL",
+    ),
+    ("ix_categorias_id_usuario_crea", "categorias", ["id_usuario_crea"], None),
+    (
+        "ix_categorias_id_usuario_edita",
+        "categorias",
+        ["id_usuario_edita"],
+        "id_usuario_edita IS NOT NULL",
+    ),
+    # Búsqueda del administrador por defecto (es_admin = true, pocas filas)
+    ("ix_tbl_usuarios_admin", "tbl_usuarios", ["id"], "es_admin"),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY no bloquea las escrituras mientras se crea el índice, pero
+    # no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas, condicion in INDICES:
+            op.create_index(
+                nombre,
+                tabla,
+                columnas,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(condicion) if condicion else None,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nombre, tabla, _, _ in reversed(INDICES):
+            op.drop_index(
+                nombre,
+                table_name=tabla,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
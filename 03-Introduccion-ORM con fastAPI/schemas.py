@@ -3,7 +3,7 @@ Modelos Pydantic para las respuestas de la API
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, EmailStr
@@ -54,6 +54,13 @@ class CambioContraseña(BaseModel):
 class loginResponse(BaseModel):
     clave: str
     nombre_usuario: UsuarioResponse
+    refresco: str
+    tipo_token: str = "bearer"
+    expira_en: int
+
+
+class RefrescoToken(BaseModel):
+    refresco: str
 
 
 # Modelos base para Categoría
@@ -80,6 +87,19 @@ class CategoriaResponse(CategoriaBase):
         from_attributes = True
 
 
+class ProductoMuestra(BaseModel):
+    id_producto: UUID
+    nombre: str
+    precio: float
+    stock: Optional[int] = None
+
+
+class CategoriaResumen(CategoriaResponse):
+    total_productos: int
+    stock_total: int
+    productos: List[ProductoMuestra] = []
+
+
 # Modelos base para Producto
 class ProductoBase(BaseModel):
     nombre: str
@@ -112,11 +132,43 @@ class ProductoResponse(ProductoBase):
         from_attributes = True
 
 
+class AjusteStock(BaseModel):
+    delta: int
+
+
+class ItemReserva(BaseModel):
+    producto_id: UUID
+    cantidad: int
+
+
+class ReservaStock(BaseModel):
+    items: List[ItemReserva]
+
+
+class ErrorCargaProducto(BaseModel):
+    indice: int
+    error: str
+
+
+class ResultadoCargaProductos(BaseModel):
+    total: int
+    creados: int
+    errores: List[ErrorCargaProducto] = []
+
+
 # Modelos de respuesta con relaciones
 class ProductoConCategoria(ProductoResponse):
     categoria: CategoriaResponse
 
 
+class ProductoExpandido(ProductoResponse):
+    """Producto de las rutas GET; solo incluye las relaciones pedidas en ?expand="""
+
+    categoria: Optional[CategoriaResponse] = None
+    usuario_crea: Optional[UsuarioResponse] = None
+    usuario_edita: Optional[UsuarioResponse] = None
+
+
 # class UsuarioConProductos(UsuarioResponse):
 #     productos: list[ProductoResponse] = []
 
@@ -1,4 +1,15 @@
 #!/bin/bash
-gunicorn main:app --workers 4 --worker-class uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
-
-
+# WEB_CONCURRENCY también reparte DB_MAX_CONEXIONES entre los workers (database/pool.py)
+export WEB_CONCURRENCY="${WEB_CONCURRENCY:-4}"
+# TOKEN_SECRETO (entorno o .env) debe ser el mismo en todos los workers: un
+# token emitido por uno se verifica en otro; sin él la app no arranca (auth/tokens.py)
+# Migraciones una vez por despliegue, antes de los workers (que solo comprueban
+# la revisión al arrancar). Las bases creadas con create_all se marcan en su
+# revisión y reciben las migraciones siguientes (migrar_esquema.py). Con varias
+# instancias autoescaladas se puede migrar en el despliegue y usar MIGRAR_AL_INICIAR=0
+if [ "${MIGRAR_AL_INICIAR:-1}" != "0" ]; then
+    python migrar_esquema.py || exit 1
+fi
+# --preload: main, los routers y sus dependencias se importan una vez en el maestro;
+# los engines se crean en cada worker después del fork (database/config.py)
+gunicorn main:app --preload --workers "$WEB_CONCURRENCY" --worker-class uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
@@ -1,78 +1,287 @@
 """
 Configuración compartida para todas las pruebas
 Fixtures y configuración común
+
+Las tablas se crean una sola vez, en una base plantilla (SQLite) que arma el
+proceso principal de pytest. Cada proceso de pruebas (cada worker de
+pytest-xdist, o el único proceso sin -n) trabaja sobre su propia copia de la
+plantilla, sin ejecutar DDL. Cada prueba corre dentro de una transacción que
+se deshace al terminar: los commit de la aplicación liberan un SAVEPOINT y no
+llegan a la base de datos.
+
+Variables de entorno:
+    TEST_DB: "memoria" (por defecto) copia la plantilla a una base en memoria
+        con una única conexión compartida; "archivo" la copia a un archivo
+    HASH_PBKDF2_ITERACIONES: coste del hash en las pruebas (por defecto el
+        mínimo, 1000; la aplicación usa 100000)
+    ESQUEMA_AL_INICIAR: "omitir" por defecto (ver database/esquema.py)
+    TOKEN_SECRETO_TEMPORAL: "1" por defecto (ver auth/tokens.py)
+    CACHE_ESCUCHA: "0" por defecto (ver database/cache.py)
 """
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import asynccontextmanager
+
 import pytest
 from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
-from database.config import Base, get_db
-from main import app
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import AsyncSession
 
-# Base de datos en memoria para testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# El coste de producción solo hace lentas las pruebas: los fixtures y los
+# endpoints de registro y login hashean contraseñas en cada prueba
+os.environ.setdefault("HASH_PBKDF2_ITERACIONES", "1000")
+# Las pruebas usan su propia base: el arranque de la app no comprueba la de
+# DATABASE_URL
+os.environ.setdefault("ESQUEMA_AL_INICIAR", "omitir")
+# Un solo proceso: basta un secreto de tokens aleatorio
+os.environ.setdefault("TOKEN_SECRETO_TEMPORAL", "1")
+# Sin hilo LISTEN: la caché se invalida con el aviso dentro del proceso
+os.environ.setdefault("CACHE_ESCUCHA", "0")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+from crud.categoria_crud import cache_categorias
+from database.config import (
+    Base,
+    get_async_db,
+    get_db,
+    get_fabrica_sesiones_async,
 )
+from database.presupuesto import contar_consultas
+from main import app
+
+TEST_DB = os.getenv("TEST_DB", "memoria")
+if TEST_DB not in ("memoria", "archivo"):
+    raise ValueError("TEST_DB debe ser 'memoria' o 'archivo'")
+
+# Nombre del proceso de pruebas: gw0, gw1... con pytest-xdist
+WORKER = os.getenv("PYTEST_XDIST_WORKER", "principal")
+
+
+@compiles(UUID, "sqlite")
+def _uuid_sqlite(type_, compiler, **kw):
+    """SQLite no tiene tipo UUID: se guarda como TEXT"""
+    return "TEXT"
+
+
+def pytest_configure(config):
+    """Crear la base plantilla (solo en el proceso principal)"""
+    if hasattr(config, "workerinput"):
+        config.directorio_bd = config.workerinput["directorio_bd"]
+        config.plantilla_bd = config.workerinput["plantilla_bd"]
+        return
+
+    config.directorio_bd = tempfile.mkdtemp(prefix="pruebas_bd_")
+    config.plantilla_bd = os.path.join(config.directorio_bd, "plantilla.db")
+    engine = create_engine(f"sqlite:///{config.plantilla_bd}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
 
-# Hacer que SQLite soporte UUID convirtiéndolos a String
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_conn, connection_record):
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Pasar la plantilla a cada worker de pytest-xdist"""
+    node.workerinput["directorio_bd"] = node.config.directorio_bd
+    node.workerinput["plantilla_bd"] = node.config.plantilla_bd
+
+
+def pytest_unconfigure(config):
+    """Borrar la plantilla y las copias de los workers"""
+    if not hasattr(config, "workerinput") and hasattr(config, "directorio_bd"):
+        shutil.rmtree(config.directorio_bd, ignore_errors=True)
+
+
+def _copia_plantilla(config, nombre: str) -> str:
+    """Copiar la plantilla a un archivo propio del worker"""
+    ruta = os.path.join(config.directorio_bd, f"{nombre}_{WORKER}.db")
+    shutil.copyfile(config.plantilla_bd, ruta)
+    return ruta
+
+
+def _set_sqlite_pragma(dbapi_conn, connection_record):
     """Configurar SQLite para soportar foreign keys"""
     cursor = dbapi_conn.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
     cursor.close()
 
-# Monkey patch para que SQLite soporte UUID como TEXT
-import sqlalchemy.dialects.sqlite.base as sqlite_base
-from sqlalchemy.dialects.postgresql import UUID
 
-# Agregar soporte para UUID en SQLite
-def visit_UUID(self, type_, **kw):
-    return "TEXT"
+def _sin_transaccion_implicita(dbapi_conn, connection_record):
+    # pysqlite abre y confirma transacciones por su cuenta, lo que rompe los
+    # SAVEPOINT; SQLAlchemy emite el BEGIN (evento "begin")
+    dbapi_conn.isolation_level = None
 
-if not hasattr(sqlite_base.SQLiteTypeCompiler, 'visit_UUID'):
-    sqlite_base.SQLiteTypeCompiler.visit_UUID = visit_UUID
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _begin(conexion):
+    conexion.exec_driver_sql("BEGIN")
+
+
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+@pytest.fixture(scope="session")
+def esquema(pytestconfig):
+    """Engine de la base del worker, copiada de la plantilla"""
+    if TEST_DB == "memoria":
+        plantilla = pytestconfig.plantilla_bd
+
+        def _conectar():
+            conexion = sqlite3.connect(":memory:", check_same_thread=False)
+            origen = sqlite3.connect(plantilla)
+            origen.backup(conexion)
+            origen.close()
+            return conexion
+
+        # Una sola conexión para todos los hilos: la base en memoria vive en ella
+        engine = create_engine("sqlite://", creator=_conectar, poolclass=StaticPool)
+    else:
+        ruta = _copia_plantilla(pytestconfig, "pruebas")
+        engine = create_engine(
+            f"sqlite:///{ruta}", connect_args={"check_same_thread": False}
+        )
+    event.listen(engine, "connect", _set_sqlite_pragma)
+    event.listen(engine, "connect", _sin_transaccion_implicita)
+    event.listen(engine, "begin", _begin)
+    yield engine
+    engine.dispose()
 
 
 @pytest.fixture(scope="function")
-def db_session():
+def db_session(request, esquema):
     """
     Crear una sesión de base de datos para cada test.
-    Se crea y destruye la base de datos para cada prueba.
+    La prueba corre dentro de una transacción que se deshace al terminar;
+    los commit de la sesión solo liberan un SAVEPOINT.
+
+    Las pruebas con sesiones_concurrentes necesitan datos confirmados que
+    vean otras conexiones: usan una copia nueva de la plantilla con commits
+    reales (bd_confirmada).
     """
-    # Crear todas las tablas
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+    # La caché de categorías sobrevive a la transacción deshecha
+    cache_categorias.invalidar()
+    if "sesiones_concurrentes" in request.fixturenames:
+        yield from _sesion_confirmada(request.getfixturevalue("bd_confirmada"))
+        return
+
+    conexion = esquema.connect()
+    transaccion = conexion.begin()
+    db = TestingSessionLocal(bind=conexion, join_transaction_mode="create_savepoint")
+    # Abrir ya el primer SAVEPOINT: no es una consulta de la prueba
+    db.connection()
+    try:
+        yield db
+    finally:
+        db.close()
+        transaccion.rollback()
+        conexion.close()
+        cache_categorias.invalidar()
+
+
+@pytest.fixture
+def bd_confirmada(pytestconfig):
+    """URL de una copia de la plantilla para una prueba con commits reales"""
+    ruta = _copia_plantilla(pytestconfig, "confirmada")
+    yield f"sqlite:///{ruta}"
+    os.remove(ruta)
+
+
+def _sesion_confirmada(url: str):
+    """Sesión con commits reales sobre la base de bd_confirmada"""
+    engine_archivo = create_engine(url, connect_args={"check_same_thread": False})
+    event.listen(engine_archivo, "connect", _set_sqlite_pragma)
+    db = TestingSessionLocal(bind=engine_archivo)
     try:
         yield db
     finally:
         db.close()
-        # Limpiar después de cada prueba
-        Base.metadata.drop_all(bind=engine)
+        engine_archivo.dispose()
+        cache_categorias.invalidar()
 
 
 @pytest.fixture(scope="function")
 def client(db_session):
     """
     Cliente de prueba para hacer requests HTTP a la API.
-    Sobrescribe la dependencia get_db para usar la sesión de prueba.
+    Sobrescribe las dependencias get_db y get_async_db para usar la sesión de prueba.
     """
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
-    
+
+    async def override_get_async_db():
+        # AsyncSession que envuelve la sesión síncrona de prueba: los routers
+        # usan la API asíncrona y los datos de los fixtures siguen visibles
+        yield AsyncSession(sync_session_class=lambda **kwargs: db_session)
+
+    @asynccontextmanager
+    async def sesion_prueba(metodo="GET"):
+        # Sesiones que abren las respuestas en streaming (exportación)
+        yield AsyncSession(sync_session_class=lambda **kwargs: db_session)
+
+    # Igual que AsyncSessionLocal: las entidades devueltas tras un commit no
+    # se vuelven a leer (las escrituras traen sus valores con RETURNING)
+    db_session.expire_on_commit = False
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_fabrica_sesiones_async] = lambda: sesion_prueba
     from fastapi.testclient import TestClient
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def presupuesto_consultas(db_session):
+    """
+    Verificar el número máximo de consultas SQL de un bloque.
+    Falla si se excede el máximo o si una misma sentencia se repite (N+1).
+
+    Uso:
+        with presupuesto_consultas(3):
+            client.get("/productos/")
+    """
+    engine = db_session.get_bind()
+
+    def _presupuesto(maximo, permitir_repetidas=False):
+        return contar_consultas(
+            engine, maximo=maximo, permitir_repetidas=permitir_repetidas
+        )
+
+    return _presupuesto
+
+
+@pytest.fixture
+def sesiones_concurrentes(db_session, bd_confirmada):
+    """
+    Fábrica de sesiones para pruebas con varios hilos escribiendo a la vez.
+
+    Cada transacción empieza con BEGIN IMMEDIATE: en SQLite los escritores
+    esperan su turno (como con los bloqueos de fila de PostgreSQL) en lugar
+    de fallar con "database is locked" al ampliar un bloqueo de lectura.
+    """
+    engine_hilos = create_engine(
+        bd_confirmada,
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+
+    @event.listens_for(engine_hilos, "connect")
+    def _sin_transaccion_implicita(dbapi_conn, connection_record):
+        dbapi_conn.isolation_level = None
+
+    @event.listens_for(engine_hilos, "begin")
+    def _begin_immediate(conexion):
+        conexion.exec_driver_sql("BEGIN IMMEDIATE")
+
+    # Los datos de los fixtures deben estar confirmados antes de los hilos
+    db_session.commit()
+    yield sessionmaker(bind=engine_hilos)
+    engine_hilos.dispose()
+    db_session.expire_all()
+
 @pytest.fixture
 def categoria_ejemplo(db_session, usuario_ejemplo):
     """Fixture para crear una categoría de ejemplo"""
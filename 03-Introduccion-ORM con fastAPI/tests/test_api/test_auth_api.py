@@ -0,0 +1,146 @@
+"""
+Pruebas del login con tokens, el refresco y la dependencia de sesión
+"""
+import pytest
+from fastapi import status
+
+from auth.security import PasswordManager
+
+
+def login(client, nombre_usuario="testuser", contraseña="Password123!"):
+    return client.post("/auth/login", json={
+        "nombre_usuario": nombre_usuario,
+        "contraseña": contraseña
+    })
+
+
+class TestLoginTokens:
+    """Pruebas de emisión de tokens en /auth/login"""
+
+    def test_login_emite_tokens(self, client, usuario_ejemplo):
+        """Prueba que el login devuelve el par de tokens y el usuario"""
+        response = login(client)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["clave"] and data["refresco"]
+        assert data["tipo_token"] == "bearer"
+        assert data["expira_en"] > 0
+        assert data["nombre_usuario"]["nombre_usuario"] == "testuser"
+
+    def test_login_incorrecto(self, client, usuario_ejemplo):
+        """Prueba que unas credenciales incorrectas no emiten tokens"""
+        response = login(client, contraseña="Incorrecta123!")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestSesionToken:
+    """Pruebas de la dependencia obtener_sesion"""
+
+    def test_sesion_sin_consultas(self, client, usuario_ejemplo, presupuesto_consultas):
+        """Prueba que un token válido se verifica sin consultar la base de datos"""
+        clave = login(client).json()["clave"]
+
+        with presupuesto_consultas(0):
+            response = client.get(
+                "/auth/sesion", headers={"Authorization": f"Bearer {clave}"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        datos = response.json()["datos"]
+        assert datos["usuario_id"] == str(usuario_ejemplo.id)
+        assert datos["es_admin"] is False
+
+    def test_sesion_sin_token(self, client):
+        """Prueba que sin token se responde 401"""
+        response = client.get("/auth/sesion")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.headers["www-authenticate"] == "Bearer"
+
+    def test_sesion_con_token_de_refresco(self, client, usuario_ejemplo):
+        """Prueba que el token de refresco no sirve como token de acceso"""
+        refresco = login(client).json()["refresco"]
+
+        response = client.get(
+            "/auth/sesion", headers={"Authorization": f"Bearer {refresco}"}
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestSesionAdmin:
+    """Pruebas de la dependencia obtener_sesion_admin"""
+
+    def test_admin_sin_consultas(self, client, admin_ejemplo, presupuesto_consultas):
+        """Prueba que el token de un administrador basta, sin consultar la base de datos"""
+        clave = login(client, "admin", "Admin123!").json()["clave"]
+
+        with presupuesto_consultas(0):
+            response = client.delete(
+                "/monitoreo/sql", headers={"Authorization": f"Bearer {clave}"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_usuario_no_admin(self):
+        """Prueba que un token válido sin es_admin se rechaza con 403"""
+        from uuid import uuid4
+        from fastapi import HTTPException
+        from auth.tokens import SesionToken, obtener_sesion_admin
+
+        sesion = SesionToken(
+            usuario_id=uuid4(), nombre_usuario="testuser", es_admin=False, expira=0
+        )
+
+        with pytest.raises(HTTPException) as error:
+            obtener_sesion_admin(sesion)
+
+        assert error.value.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestRefrescoToken:
+    """Pruebas de /auth/refrescar"""
+
+    def test_refrescar(self, client, usuario_ejemplo, presupuesto_consultas):
+        """Prueba que el refresco emite un nuevo par con una sola consulta"""
+        refresco = login(client).json()["refresco"]
+
+        with presupuesto_consultas(1):
+            response = client.post("/auth/refrescar", json={"refresco": refresco})
+
+        assert response.status_code == status.HTTP_200_OK
+        clave = response.json()["clave"]
+        response = client.get("/auth/sesion", headers={"Authorization": f"Bearer {clave}"})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_refrescar_con_token_de_acceso(self, client, usuario_ejemplo):
+        """Prueba que un token de acceso no sirve para refrescar"""
+        clave = login(client).json()["clave"]
+
+        response = client.post("/auth/refrescar", json={"refresco": clave})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_refresco_invalidado_por_cambio_de_contraseña(
+        self, client, db_session, usuario_ejemplo
+    ):
+        """Prueba que cambiar la contraseña invalida los tokens de refresco"""
+        refresco = login(client).json()["refresco"]
+
+        usuario_ejemplo.contraseña_hash = PasswordManager.hash_password("Nueva123!")
+        db_session.commit()
+
+        response = client.post("/auth/refrescar", json={"refresco": refresco})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_refresco_usuario_inactivo(self, client, db_session, usuario_ejemplo):
+        """Prueba que un usuario desactivado no puede refrescar"""
+        refresco = login(client).json()["refresco"]
+
+        usuario_ejemplo.activo = False
+        db_session.commit()
+
+        response = client.post("/auth/refrescar", json={"refresco": refresco})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
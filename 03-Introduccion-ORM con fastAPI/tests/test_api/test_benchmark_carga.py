@@ -0,0 +1,64 @@
+"""
+Pruebas del benchmark de carga en proceso (benchmark_carga.py)
+"""
+
+import pytest
+
+import benchmark_carga
+from main import app
+
+MEZCLA = benchmark_carga.parsear_mezcla(benchmark_carga.MEZCLA_DEFECTO)
+
+
+@pytest.mark.asyncio
+async def test_medir_todas_las_rutas_sin_errores(monkeypatch):
+    """Prueba una carga corta contra SQLite con todas las operaciones"""
+    monkeypatch.setenv("HASH_PBKDF2_ITERACIONES", "1000")
+    anterior = dict(app.dependency_overrides)
+
+    resumen = await benchmark_carga.medir(
+        app, None, MEZCLA, peticiones=60, concurrencia=4, productos=20, categorias=2
+    )
+
+    assert set(resumen) == set(MEZCLA) | {"total"}
+    assert resumen["total"]["peticiones"] == 60
+    assert all(datos["errores"] == 0 for datos in resumen.values())
+    assert 0 < resumen["total"]["p50_ms"] <= resumen["total"]["p99_ms"]
+    assert app.dependency_overrides == anterior
+
+
+def test_comparar_detecta_regresiones():
+    """Prueba las latencias, las peticiones por segundo y los errores nuevos"""
+    base = {
+        "listar": {"p50_ms": 10, "p95_ms": 20, "p99_ms": 30, "rps": 100, "errores": 0},
+        "login": {"p50_ms": 50, "p95_ms": 60, "p99_ms": 70, "rps": 10, "errores": 0},
+    }
+    actual = {
+        "listar": {"p50_ms": 11, "p95_ms": 30, "p99_ms": 30, "rps": 70, "errores": 0},
+        "login": {"p50_ms": 50, "p95_ms": 60, "p99_ms": 70, "rps": 10, "errores": 2},
+        "crear": {"p50_ms": 99, "p95_ms": 99, "p99_ms": 99, "rps": 1, "errores": 0},
+    }
+
+    regresiones = benchmark_carga.comparar(actual, base, tolerancia=0.2)
+
+    assert regresiones == [
+        "listar: p95_ms 20.00 -> 30.00 (+50%)",
+        "listar: rps 100.00 -> 70.00 (-30%)",
+        "login: 2 errores (base sin errores)",
+    ]
+    assert benchmark_carga.comparar(base, base, tolerancia=0.2) == []
+
+
+@pytest.mark.parametrize("mezcla", ["listar=1,borrar=1", "listar=x", "login=0"])
+def test_mezcla_invalida(mezcla):
+    """Prueba que las mezclas mal formadas se rechazan"""
+    with pytest.raises(ValueError):
+        benchmark_carga.parsear_mezcla(mezcla)
+
+
+def test_percentil():
+    """Prueba el percentil por rango más cercano"""
+    valores = list(range(1, 101))
+    assert benchmark_carga.percentil(valores, 50) == 50
+    assert benchmark_carga.percentil(valores, 99) == 99
+    assert benchmark_carga.percentil([], 95) == 0.0
@@ -0,0 +1,109 @@
+"""
+Pruebas de la carga masiva de productos (POST /productos/bulk)
+"""
+import json
+import uuid
+
+import pytest
+from fastapi import status
+
+
+@pytest.fixture
+def producto_valido(categoria_ejemplo, usuario_ejemplo):
+    """Generador de filas válidas para la carga"""
+    categoria_id = str(categoria_ejemplo.id_categoria)
+    usuario_id = str(usuario_ejemplo.id)
+
+    def _crear(i):
+        return {
+            "nombre": f"Producto {i}",
+            "descripcion": f"Descripción {i}",
+            "precio": 10.0 + i,
+            "stock": i,
+            "categoria_id": categoria_id,
+            "usuario_id": usuario_id
+        }
+
+    return _crear
+
+
+class TestCargaProductosAPI:
+    """Pruebas del endpoint de carga masiva"""
+
+    def test_carga_array_json(self, client, producto_valido):
+        """Prueba cargar un array JSON de productos válidos"""
+        # Act
+        response = client.post(
+            "/productos/bulk", json=[producto_valido(i) for i in range(5)]
+        )
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"total": 5, "creados": 5, "errores": []}
+        assert len(client.get("/productos/").json()) == 5
+
+    def test_errores_por_fila_no_detienen_la_carga(self, client, producto_valido):
+        """Prueba que las filas inválidas se reportan y las válidas se insertan"""
+        # Arrange
+        filas = [producto_valido(i) for i in range(4)]
+        filas[1]["precio"] = -5
+        filas[2]["categoria_id"] = str(uuid.uuid4())
+        filas[3].pop("nombre")
+
+        # Act
+        response = client.post("/productos/bulk", json=filas)
+
+        # Assert
+        data = response.json()
+        assert data["total"] == 4
+        assert data["creados"] == 1
+        assert [e["indice"] for e in data["errores"]] == [1, 2, 3]
+        assert data["errores"][0]["error"] == "El precio debe ser mayor a 0"
+        assert data["errores"][1]["error"] == "La categoría especificada no existe"
+        assert data["errores"][2]["error"].startswith("nombre:")
+
+    def test_carga_ndjson(self, client, producto_valido):
+        """Prueba cargar NDJSON con una línea mal formada"""
+        # Arrange
+        lineas = [json.dumps(producto_valido(i)) for i in range(3)]
+        lineas.insert(1, "{no es json")
+        cuerpo = "\n".join(lineas) + "\n"
+
+        # Act
+        response = client.post(
+            "/productos/bulk",
+            content=cuerpo.encode(),
+            headers={"content-type": "application/x-ndjson"}
+        )
+
+        # Assert
+        data = response.json()
+        assert data["total"] == 4
+        assert data["creados"] == 3
+        assert [e["indice"] for e in data["errores"]] == [1]
+
+    def test_consultas_por_lote(self, client, producto_valido, presupuesto_consultas):
+        """Prueba que cada lote cuesta dos consultas IN y un INSERT"""
+        # Arrange
+        filas = [producto_valido(i) for i in range(6)]
+
+        # Act: 3 lotes de 2 filas
+        with presupuesto_consultas(9, permitir_repetidas=True) as consultas:
+            response = client.post("/productos/bulk?tamano_lote=2", json=filas)
+
+        # Assert
+        assert response.json()["creados"] == 6
+        inserts = [s for s in consultas.sentencias if s.startswith("INSERT")]
+        assert len(inserts) == 3
+
+    def test_cuerpo_no_es_array(self, client):
+        """Prueba que un objeto JSON suelto se rechaza"""
+        response = client.post("/productos/bulk", json={"nombre": "x"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_tamano_lote_maximo(self, client):
+        """Prueba que el tamaño de lote está acotado"""
+        response = client.post("/productos/bulk?tamano_lote=100000", json=[])
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,189 @@
+"""
+Pruebas de ETag / Last-Modified y respuestas 304 en los GET
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from fastapi import status
+
+from entities.producto import Producto
+
+
+@pytest.fixture
+def producto(db_session, categoria_ejemplo, usuario_ejemplo):
+    """Producto de ejemplo"""
+    producto = Producto(
+        nombre="Producto Condicional",
+        descripcion="Descripción",
+        precio=10.0,
+        stock=5,
+        categoria_id=categoria_ejemplo.id_categoria,
+        usuario_id=usuario_ejemplo.id,
+        id_usuario_crea=usuario_ejemplo.id,
+    )
+    db_session.add(producto)
+    db_session.commit()
+    db_session.refresh(producto)
+    return producto
+
+
+class TestRecursoIndividual:
+    """ETag de recursos individuales (hash del cuerpo)"""
+
+    def test_etag_y_304(self, client, producto, presupuesto_consultas):
+        """Prueba que un ETag vigente devuelve 304 sin cuerpo"""
+        ruta = f"/productos/{producto.id_producto}"
+        response = client.get(ruta)
+        etag = response.headers["etag"]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert etag.startswith('"') and etag.endswith('"')
+        assert "last-modified" in response.headers
+        assert response.json()["nombre"] == "Producto Condicional"
+
+        with presupuesto_consultas(1):
+            response = client.get(ruta, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_etag_debil_y_lista(self, client, producto):
+        """Prueba la comparación débil y las listas de ETags en If-None-Match"""
+        ruta = f"/productos/{producto.id_producto}"
+        etag = client.get(ruta).headers["etag"]
+
+        response = client.get(ruta, headers={"If-None-Match": f'"otro", W/{etag}'})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_cambio_invalida_etag(self, client, db_session, producto):
+        """Prueba que modificar el recurso cambia el ETag"""
+        ruta = f"/productos/{producto.id_producto}"
+        etag = client.get(ruta).headers["etag"]
+
+        producto.precio = 12.5
+        db_session.commit()
+        response = client.get(ruta, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert response.json()["precio"] == 12.5
+
+    def test_if_modified_since(self, client, producto):
+        """Prueba If-Modified-Since con fechas anteriores y posteriores"""
+        ruta = f"/productos/{producto.id_producto}"
+        ultima = client.get(ruta).headers["last-modified"]
+        anterior = format_datetime(
+            datetime.now(timezone.utc) - timedelta(days=1), usegmt=True
+        )
+
+        assert (
+            client.get(ruta, headers={"If-Modified-Since": ultima}).status_code
+            == status.HTTP_304_NOT_MODIFIED
+        )
+        assert (
+            client.get(ruta, headers={"If-Modified-Since": anterior}).status_code
+            == status.HTTP_200_OK
+        )
+        assert (
+            client.get(ruta, headers={"If-Modified-Since": "no es fecha"}).status_code
+            == status.HTTP_200_OK
+        )
+
+    @pytest.mark.parametrize(
+        "ruta",
+        [
+            "/usuarios/{usuario.id}",
+            "/usuarios/username/testuser",
+            "/categorias/nombre/Electrónicos",
+        ],
+    )
+    def test_otros_recursos(self, client, usuario_ejemplo, categoria_ejemplo, ruta):
+        """Prueba que usuarios y categorías también responden 304"""
+        ruta = ruta.replace("{usuario.id}", str(usuario_ejemplo.id))
+        etag = client.get(ruta).headers["etag"]
+
+        response = client.get(ruta, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+class TestColecciones:
+    """Validador barato de los listados (número de filas y última modificación)"""
+
+    def test_lista_sin_cambios_una_consulta(
+        self, client, producto, presupuesto_consultas
+    ):
+        """Prueba que una lista sin cambios cuesta solo la consulta de versión"""
+        etag = client.get("/productos/").headers["etag"]
+
+        with presupuesto_consultas(1) as contador:
+            response = client.get("/productos/", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert "count(" in contador.sentencias[0].lower()
+
+    def test_alta_cambia_etag(
+        self, client, db_session, producto, categoria_ejemplo, usuario_ejemplo
+    ):
+        """Prueba que añadir un producto invalida el ETag del listado"""
+        etag = client.get("/productos/").headers["etag"]
+        db_session.add(
+            Producto(
+                nombre="Otro",
+                descripcion="Otro producto",
+                precio=1.0,
+                stock=1,
+                categoria_id=categoria_ejemplo.id_categoria,
+                usuario_id=usuario_ejemplo.id,
+                id_usuario_crea=usuario_ejemplo.id,
+            )
+        )
+        db_session.commit()
+
+        response = client.get("/productos/", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 2
+
+    def test_edicion_cambia_etag(self, client, db_session, producto):
+        """Prueba que editar un producto invalida el ETag del listado"""
+        etag = client.get("/productos/").headers["etag"]
+        producto.fecha_edicion = datetime.now(timezone.utc) + timedelta(minutes=1)
+        db_session.commit()
+
+        response = client.get("/productos/", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_parametros_forman_parte_del_etag(self, client, producto):
+        """Prueba que otra página u otro límite no reutilizan el ETag"""
+        etag = client.get("/productos/").headers["etag"]
+
+        response = client.get("/productos/?limit=1", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    def test_listas_filtradas(self, client, producto, categoria_ejemplo):
+        """Prueba el ETag de productos por categoría"""
+        ruta = f"/productos/categoria/{categoria_ejemplo.id_categoria}"
+        etag = client.get(ruta).headers["etag"]
+
+        response = client.get(ruta, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_categorias_sin_consultas(
+        self, client, categoria_ejemplo, presupuesto_consultas
+    ):
+        """Prueba que la versión de las categorías sale de la caché"""
+        etag = client.get("/categorias/").headers["etag"]
+
+        with presupuesto_consultas(0):
+            response = client.get("/categorias/", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
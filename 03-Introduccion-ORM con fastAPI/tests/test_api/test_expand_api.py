@@ -0,0 +1,161 @@
+"""
+Pruebas de ?expand= en las rutas GET de productos
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import status
+
+from entities.producto import Producto
+
+
+@pytest.fixture
+def productos(db_session, categoria_ejemplo, usuario_ejemplo, admin_ejemplo):
+    """100 productos creados por usuario_ejemplo; la mitad editados por el admin"""
+    db_session.add_all(
+        Producto(
+            nombre=f"Producto {i:03d}",
+            descripcion="Descripción",
+            precio=Decimal("10.00"),
+            stock=i,
+            categoria_id=categoria_ejemplo.id_categoria,
+            usuario_id=usuario_ejemplo.id,
+            id_usuario_crea=usuario_ejemplo.id,
+            id_usuario_edita=admin_ejemplo.id if i % 2 else None,
+        )
+        for i in range(100)
+    )
+    db_session.commit()
+    return db_session.query(Producto).order_by(Producto.nombre).all()
+
+
+def test_listado_incluye_relaciones(
+    client, productos, categoria_ejemplo, usuario_ejemplo, admin_ejemplo
+):
+    """Prueba que cada producto trae la categoría y los usuarios pedidos"""
+    response = client.get(
+        "/productos/?expand=categoria,usuario_crea,usuario_edita&limit=100"
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    datos = response.json()
+    assert len(datos) == 100
+    for producto in datos:
+        assert producto["categoria"]["nombre"] == categoria_ejemplo.nombre
+        assert producto["usuario_crea"]["id"] == str(usuario_ejemplo.id)
+        assert "contraseña_hash" not in producto["usuario_crea"]
+    editores = {
+        p["usuario_edita"]["id"] if p["usuario_edita"] else None for p in datos
+    }
+    assert editores == {str(admin_ejemplo.id), None}
+
+
+def test_sin_expand_no_incluye_relaciones(client, productos):
+    """Prueba que sin ?expand= la respuesta no cambia"""
+    producto = client.get("/productos/?limit=1").json()[0]
+    assert "categoria" not in producto
+    assert "usuario_crea" not in producto
+
+
+def test_openapi_documenta_las_relaciones(client):
+    """Prueba que el esquema OpenAPI de las rutas GET incluye las relaciones"""
+    openapi = client.get("/openapi.json").json()
+    esquema = openapi["components"]["schemas"]["ProductoExpandido"]
+    for relacion in ("categoria", "usuario_crea", "usuario_edita"):
+        assert relacion in esquema["properties"]
+        assert relacion not in esquema.get("required", [])
+
+    respuesta = openapi["paths"]["/productos/{producto_id}"]["get"]["responses"]["200"]
+    assert respuesta["content"]["application/json"]["schema"]["$ref"].endswith(
+        "/ProductoExpandido"
+    )
+
+
+def test_pagina_con_relaciones_coste_fijo(client, productos, presupuesto_consultas):
+    """
+    Prueba que una página de 100 productos con sus tres relaciones no emite
+    una consulta por producto: las versiones del ETag (productos, categorías
+    y usuarios) y la página con las relaciones unidas
+    """
+    with presupuesto_consultas(4):
+        response = client.get(
+            "/productos/?expand=categoria,usuario_crea,usuario_edita&limit=100"
+        )
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.parametrize(
+    "ruta",
+    [
+        "/productos/categoria/{categoria}?expand=categoria,usuario_crea",
+        "/productos/usuario/{usuario}?expand=categoria,usuario_crea",
+        "/productos/buscar/Producto?expand=categoria,usuario_crea",
+    ],
+)
+def test_otros_listados_con_relaciones(
+    client, productos, categoria_ejemplo, usuario_ejemplo, presupuesto_consultas, ruta
+):
+    """Prueba ?expand= en los listados por categoría, usuario y búsqueda"""
+    ruta = ruta.format(
+        categoria=categoria_ejemplo.id_categoria, usuario=usuario_ejemplo.id
+    )
+    with presupuesto_consultas(4):
+        response = client.get(ruta)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()
+    assert all(p["categoria"] and p["usuario_crea"] for p in response.json())
+
+
+def test_obtener_producto_con_relaciones(client, productos, categoria_ejemplo):
+    """Prueba ?expand= en un producto y que su ETag depende de las relaciones"""
+    ruta = f"/productos/{productos[0].id_producto}"
+    simple = client.get(ruta)
+    expandido = client.get(f"{ruta}?expand=categoria")
+
+    assert expandido.status_code == status.HTTP_200_OK
+    assert expandido.json()["categoria"]["id_categoria"] == str(
+        categoria_ejemplo.id_categoria
+    )
+    assert "usuario_crea" not in expandido.json()
+    assert expandido.headers["etag"] != simple.headers["etag"]
+
+    repetida = client.get(
+        f"{ruta}?expand=categoria",
+        headers={"If-None-Match": expandido.headers["etag"]},
+    )
+    assert repetida.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_etag_del_listado_cambia_con_la_categoria(
+    client, db_session, productos, categoria_ejemplo
+):
+    """Prueba que editar una categoría invalida los listados que la expanden"""
+    # SQLite guarda las fechas con resolución de segundos
+    ayer = datetime.now(timezone.utc) - timedelta(days=1)
+    categoria_ejemplo.fecha_creacion = categoria_ejemplo.fecha_edicion = ayer
+    db_session.commit()
+    ruta = "/productos/?expand=categoria&limit=10"
+    etag = client.get(ruta).headers["etag"]
+
+    response = client.put(
+        f"/categorias/{categoria_ejemplo.id_categoria}",
+        json={"nombre": "Categoría renombrada"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.get(ruta, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["categoria"]["nombre"] == "Categoría renombrada"
+
+
+@pytest.mark.parametrize(
+    "ruta", ["/productos/?expand=proveedor", "/productos/{producto}?expand=stock"]
+)
+def test_relacion_desconocida(client, productos, ruta):
+    """Prueba que una relación no expandible responde 400"""
+    response = client.get(ruta.format(producto=productos[0].id_producto))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "No se puede expandir" in response.json()["detail"]
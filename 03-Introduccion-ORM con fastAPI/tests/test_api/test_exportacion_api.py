@@ -0,0 +1,77 @@
+"""
+Pruebas de la exportación del catálogo (GET /productos/export)
+"""
+import csv
+import io
+import json
+
+import pytest
+from fastapi import status
+
+from crud.producto_crud import COLUMNAS_EXPORTACION, ProductoCRUD
+
+
+@pytest.fixture
+def catalogo(client, categoria_ejemplo, usuario_ejemplo):
+    """Cinco productos cargados en bloque"""
+    filas = [
+        {
+            "nombre": f"Producto {i}",
+            "descripcion": f"Descripción, con coma {i}",
+            "precio": 10.5 + i,
+            "stock": i,
+            "categoria_id": str(categoria_ejemplo.id_categoria),
+            "usuario_id": str(usuario_ejemplo.id)
+        }
+        for i in range(5)
+    ]
+    assert client.post("/productos/bulk", json=filas).json()["creados"] == 5
+    return filas
+
+
+class TestExportacionAPI:
+    """Pruebas del endpoint de exportación"""
+
+    def test_exportar_csv(self, client, catalogo):
+        """Prueba exportar en CSV con encabezado y una fila por producto"""
+        # Act
+        response = client.get("/productos/export?format=csv")
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "productos.csv" in response.headers["content-disposition"]
+        filas = list(csv.reader(io.StringIO(response.text)))
+        assert tuple(filas[0]) == COLUMNAS_EXPORTACION
+        assert len(filas) == 6
+        assert {f[1] for f in filas[1:]} == {p["nombre"] for p in catalogo}
+
+    def test_exportar_ndjson(self, client, catalogo):
+        """Prueba exportar en NDJSON, un objeto por línea"""
+        # Act
+        response = client.get("/productos/export?format=ndjson")
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        productos = [json.loads(linea) for linea in response.text.splitlines()]
+        assert len(productos) == 5
+        assert set(productos[0]) == set(COLUMNAS_EXPORTACION)
+        assert sorted(p["precio"] for p in productos) == [10.5, 11.5, 12.5, 13.5, 14.5]
+
+    def test_exportar_catalogo_vacio(self, client):
+        """Prueba que un catálogo vacío exporta solo el encabezado"""
+        response = client.get("/productos/export")
+
+        assert response.text.strip() == ",".join(COLUMNAS_EXPORTACION)
+
+    def test_formato_no_soportado(self, client):
+        """Prueba que un formato desconocido se rechaza"""
+        response = client.get("/productos/export?format=xml")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_exportar_por_lotes(self, db_session, catalogo):
+        """Prueba que el CRUD entrega el resultado en lotes del tamaño pedido"""
+        lotes = list(ProductoCRUD(db_session).exportar_productos(tamano_lote=2))
+
+        assert [len(lote) for lote in lotes] == [2, 2, 1]
@@ -0,0 +1,125 @@
+"""
+Pruebas de la paginación por cursor en los endpoints de listado
+"""
+import pytest
+from fastapi import status
+
+from crud.paginacion import (
+    CABECERA_SIGUIENTE_CURSOR,
+    MAX_TAMANO_PAGINA,
+    CursorInvalido,
+    codificar_cursor,
+    decodificar_cursor,
+)
+
+
+def recorrer_paginas(client, ruta, limit):
+    """Pedir todas las páginas siguiendo X-Next-Cursor"""
+    elementos, paginas, cursor = [], 0, None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(ruta, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) <= limit
+        elementos.extend(response.json())
+        paginas += 1
+        cursor = response.headers.get(CABECERA_SIGUIENTE_CURSOR)
+        if not cursor:
+            return elementos, paginas
+
+
+@pytest.fixture
+def categorias_varias(client, admin_ejemplo):
+    """Siete categorías creadas en el mismo segundo (fecha_creacion empatada)"""
+    ids = []
+    for i in range(7):
+        response = client.post("/categorias/", json={"nombre": f"Categoria {i}"})
+        assert response.status_code == status.HTTP_201_CREATED
+        ids.append(response.json()["id_categoria"])
+    return ids
+
+
+class TestCursor:
+    """Pruebas del token de paginación"""
+
+    def test_cursor_ida_y_vuelta(self):
+        """Prueba que un cursor se decodifica a la misma fecha y clave"""
+        from datetime import datetime
+        from uuid import uuid4
+
+        fecha, clave = datetime(2024, 1, 2, 3, 4, 5), uuid4()
+        assert decodificar_cursor(codificar_cursor(fecha, clave)) == (fecha, clave)
+
+    def test_cursor_invalido(self):
+        """Prueba que un token manipulado se rechaza"""
+        with pytest.raises(CursorInvalido):
+            decodificar_cursor("no-es-un-cursor")
+
+
+class TestPaginacionAPI:
+    """Pruebas de paginación en /productos, /categorias y /usuarios"""
+
+    def test_recorrer_categorias_sin_duplicados(self, client, categorias_varias):
+        """Prueba que recorrer las páginas devuelve cada categoría una sola vez"""
+        elementos, paginas = recorrer_paginas(client, "/categorias/", limit=3)
+
+        ids = [c["id_categoria"] for c in elementos]
+        assert sorted(ids) == sorted(categorias_varias)
+        assert paginas == 3
+
+    def test_ultima_pagina_sin_cursor(self, client, categorias_varias):
+        """Prueba que una página que contiene todo no devuelve cursor"""
+        response = client.get("/categorias/", params={"limit": 10})
+
+        assert len(response.json()) == 7
+        assert CABECERA_SIGUIENTE_CURSOR not in response.headers
+
+    def test_recorrer_productos(self, client, categoria_ejemplo, usuario_ejemplo):
+        """Prueba la paginación de productos"""
+        for i in range(5):
+            client.post("/productos/", json={
+                "nombre": f"Producto {i}",
+                "descripcion": "Descripción",
+                "precio": 1.0,
+                "stock": 1,
+                "categoria_id": str(categoria_ejemplo.id_categoria),
+                "usuario_id": str(usuario_ejemplo.id)
+            })
+
+        elementos, paginas = recorrer_paginas(client, "/productos/", limit=2)
+
+        assert len({p["id_producto"] for p in elementos}) == 5
+        assert paginas == 3
+
+    def test_recorrer_usuarios(self, client, usuario_ejemplo, admin_ejemplo):
+        """Prueba la paginación de usuarios"""
+        elementos, paginas = recorrer_paginas(client, "/usuarios/", limit=1)
+
+        assert {u["nombre_usuario"] for u in elementos} == {"testuser", "admin"}
+        assert paginas == 2
+
+    def test_limite_maximo(self, client):
+        """Prueba que no se aceptan páginas mayores que MAX_TAMANO_PAGINA"""
+        response = client.get("/productos/", params={"limit": MAX_TAMANO_PAGINA + 1})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_cursor_invalido_responde_400(self, client):
+        """Prueba que un cursor mal formado es un error del cliente"""
+        response = client.get("/categorias/", params={"cursor": "xyz"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_pagina_profunda_una_consulta(self, client, categorias_varias, presupuesto_consultas):
+        """Prueba que una página con cursor cuesta una consulta filtrada por clave"""
+        cursor = client.get("/categorias/", params={"limit": 5}).headers[
+            CABECERA_SIGUIENTE_CURSOR
+        ]
+
+        with presupuesto_consultas(1) as consultas:
+            response = client.get("/categorias/", params={"limit": 5, "cursor": cursor})
+
+        assert len(response.json()) == 2
+        assert "categorias.fecha_creacion >" in consultas.sentencias[0]
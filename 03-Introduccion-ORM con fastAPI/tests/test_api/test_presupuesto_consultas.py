@@ -0,0 +1,230 @@
+"""
+Pruebas de presupuesto de consultas SQL por endpoint (detección de N+1)
+"""
+import pytest
+from fastapi import status
+
+from database.presupuesto import (
+    ContadorConsultas,
+    MiddlewarePresupuestoConsultas,
+    PresupuestoConsultasExcedido,
+    activar_conteo_engine,
+    contar_consultas,
+    desactivar_conteo_engine,
+)
+
+
+@pytest.fixture
+def producto_api(client, categoria_ejemplo, usuario_ejemplo):
+    """Producto creado a través de la API"""
+    response = client.post("/productos/", json={
+        "nombre": "Producto Presupuesto",
+        "descripcion": "Descripción",
+        "precio": 10.0,
+        "stock": 5,
+        "categoria_id": str(categoria_ejemplo.id_categoria),
+        "usuario_id": str(usuario_ejemplo.id)
+    })
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+class TestContadorConsultas:
+    """Pruebas del contador y del detector de sentencias repetidas"""
+
+    def test_detecta_sentencias_repetidas(self):
+        """Prueba que la misma sentencia repetida se reporta como posible N+1"""
+        contador = ContadorConsultas()
+        contador.registrar("SELECT * FROM productos WHERE id = ?")
+        contador.registrar("SELECT *  FROM productos\n WHERE id = ?")
+        contador.registrar("SELECT * FROM categorias")
+
+        assert contador.total == 3
+        assert contador.repetidas() == {"SELECT * FROM productos WHERE id = ?": 2}
+
+    def test_verificar_excede_maximo(self):
+        """Prueba que superar el máximo lanza PresupuestoConsultasExcedido"""
+        contador = ContadorConsultas()
+        contador.registrar("SELECT 1")
+        contador.registrar("SELECT 2")
+
+        with pytest.raises(PresupuestoConsultasExcedido, match="máximo es 1"):
+            contador.verificar(maximo=1)
+        contador.verificar(maximo=2)
+
+    def test_verificar_permitir_repetidas(self):
+        """Prueba que las repeticiones pueden permitirse explícitamente"""
+        contador = ContadorConsultas()
+        contador.registrar("SELECT 1")
+        contador.registrar("SELECT 1")
+
+        with pytest.raises(PresupuestoConsultasExcedido, match="N\\+1"):
+            contador.verificar()
+        contador.verificar(permitir_repetidas=True)
+
+    def test_ignora_control_de_transacciones(self):
+        """Prueba que BEGIN y los SAVEPOINT no cuentan como consultas"""
+        contador = ContadorConsultas()
+        contador.registrar("BEGIN")
+        contador.registrar("SAVEPOINT sa_savepoint_1")
+        contador.registrar("SELECT 1")
+        contador.registrar("RELEASE SAVEPOINT sa_savepoint_1")
+        contador.registrar("ROLLBACK TO SAVEPOINT sa_savepoint_2")
+
+        assert contador.sentencias == ["SELECT 1"]
+
+    def test_contar_consultas_detecta_n_mas_1(self, db_session, categoria_ejemplo):
+        """Prueba que un bucle de consultas por fila falla el presupuesto"""
+        from entities.categoria import Categoria
+
+        with pytest.raises(PresupuestoConsultasExcedido):
+            with contar_consultas(db_session.get_bind(), maximo=10):
+                for _ in range(3):
+                    db_session.query(Categoria).filter(
+                        Categoria.id_categoria == categoria_ejemplo.id_categoria
+                    ).first()
+
+
+class TestPresupuestoEndpoints:
+    """Número máximo de consultas por endpoint; un cambio que lo supere es una regresión"""
+
+    def test_listar_productos(self, client, producto_api, presupuesto_consultas):
+        """Prueba que listar productos emite la consulta de versión (ETag) y la de la página"""
+        with presupuesto_consultas(2):
+            response = client.get("/productos/")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_obtener_producto(self, client, producto_api, presupuesto_consultas):
+        """Prueba que obtener un producto emite una sola consulta"""
+        with presupuesto_consultas(1):
+            response = client.get(f"/productos/{producto_api['id_producto']}")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_crear_producto(self, client, categoria_ejemplo, usuario_ejemplo, presupuesto_consultas):
+        """Prueba el presupuesto de crear producto (validaciones e INSERT ... RETURNING)"""
+        producto_data = {
+            "nombre": "Producto Nuevo",
+            "descripcion": "Descripción",
+            "precio": 1.0,
+            "stock": 1,
+            "categoria_id": str(categoria_ejemplo.id_categoria),
+            "usuario_id": str(usuario_ejemplo.id)
+        }
+        with presupuesto_consultas(3):
+            response = client.post("/productos/", json=producto_data)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_actualizar_producto(self, client, producto_api, admin_ejemplo, presupuesto_consultas):
+        """Prueba que actualizar es un solo UPDATE ... RETURNING (más el usuario editor)"""
+        with presupuesto_consultas(2):
+            response = client.put(
+                f"/productos/{producto_api['id_producto']}", json={"nombre": "Otro"}
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_actualizar_stock(self, client, producto_api, admin_ejemplo, presupuesto_consultas):
+        """Prueba que actualizar stock no lee el producto antes ni después"""
+        with presupuesto_consultas(2):
+            response = client.patch(
+                f"/productos/{producto_api['id_producto']}/stock?nuevo_stock=3"
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_eliminar_producto(self, client, producto_api, presupuesto_consultas):
+        """Prueba que eliminar consulta el producto una sola vez"""
+        with presupuesto_consultas(2):
+            response = client.delete(f"/productos/{producto_api['id_producto']}")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_actualizar_categoria(self, client, categoria_ejemplo, admin_ejemplo, presupuesto_consultas):
+        """Prueba que actualizar categoría no repite la búsqueda por nombre"""
+        with presupuesto_consultas(3):
+            response = client.put(
+                f"/categorias/{categoria_ejemplo.id_categoria}", json={"nombre": "Nueva"}
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_actualizar_usuario(self, client, usuario_ejemplo, presupuesto_consultas):
+        """Prueba que actualizar usuario no repite las búsquedas de unicidad"""
+        with presupuesto_consultas(3):
+            response = client.put(f"/usuarios/{usuario_ejemplo.id}", json={
+                "email": "nuevo@example.com",
+                "nombre_usuario": "nuevo_usuario"
+            })
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_listar_usuarios(self, client, usuario_ejemplo, admin_ejemplo, presupuesto_consultas):
+        """Prueba que listar usuarios emite la consulta de versión (ETag) y la de la página"""
+        with presupuesto_consultas(2):
+            response = client.get("/usuarios/")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_login(self, client, usuario_ejemplo, presupuesto_consultas):
+        """Prueba que el login emite una sola consulta"""
+        with presupuesto_consultas(1):
+            response = client.post("/auth/login", json={
+                "nombre_usuario": "testuser",
+                "contraseña": "Password123!"
+            })
+        assert response.status_code == status.HTTP_200_OK
+
+
+class TestMiddlewarePresupuesto:
+    """Pruebas del middleware que cuenta las consultas de cada petición"""
+
+    def test_cabecera_consultas_sql(self, client, db_session, producto_api):
+        """Prueba que la respuesta incluye X-Consultas-SQL"""
+        from fastapi.testclient import TestClient
+
+        engine = db_session.get_bind()
+        activar_conteo_engine(engine)
+        try:
+            cliente_conteo = TestClient(MiddlewarePresupuestoConsultas(client.app))
+            response = cliente_conteo.get(f"/productos/{producto_api['id_producto']}")
+        finally:
+            desactivar_conteo_engine(engine)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["x-consultas-sql"] == "1"
+
+    def test_contador_independiente_por_peticion(self, client, db_session, categoria_ejemplo, caplog):
+        """Prueba que el contador es por petición: repetir una petición no es un N+1"""
+        from fastapi.testclient import TestClient
+
+        engine = db_session.get_bind()
+        activar_conteo_engine(engine)
+        try:
+            cliente_conteo = TestClient(MiddlewarePresupuestoConsultas(client.app))
+            with caplog.at_level("WARNING", logger="sql.n_mas_1"):
+                for _ in range(2):
+                    # Dos peticiones independientes: cada una tiene su contador
+                    cliente_conteo.get(f"/categorias/{categoria_ejemplo.id_categoria}")
+        finally:
+            desactivar_conteo_engine(engine)
+
+        assert not [r for r in caplog.records if r.name == "sql.n_mas_1"]
+
+    def test_presupuesto_peticion_invalido(self, client, monkeypatch):
+        """Prueba que un SQL_PRESUPUESTO_PETICION inválido falla al construir el middleware"""
+        monkeypatch.setenv("SQL_PRESUPUESTO_PETICION", "diez")
+
+        with pytest.raises(ValueError, match="SQL_PRESUPUESTO_PETICION"):
+            MiddlewarePresupuestoConsultas(client.app)
+
+    def test_presupuesto_peticion_excedido(self, client, db_session, monkeypatch, caplog):
+        """Prueba que se avisa de las peticiones que superan el presupuesto"""
+        from fastapi.testclient import TestClient
+
+        monkeypatch.setenv("SQL_PRESUPUESTO_PETICION", "0")
+        engine = db_session.get_bind()
+        activar_conteo_engine(engine)
+        try:
+            cliente_conteo = TestClient(MiddlewarePresupuestoConsultas(client.app))
+            monkeypatch.delenv("SQL_PRESUPUESTO_PETICION")
+            with caplog.at_level("WARNING", logger="sql.n_mas_1"):
+                response = cliente_conteo.get("/productos/")
+        finally:
+            desactivar_conteo_engine(engine)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "(presupuesto 0)" in caplog.text
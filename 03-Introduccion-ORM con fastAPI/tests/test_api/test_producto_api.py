@@ -91,7 +91,7 @@ class TestProductoAPI:
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert "no encontrado" in response.json()["detail"].lower()
     
-    def test_actualizar_producto_via_api(self, client, categoria_ejemplo, usuario_ejemplo):
+    def test_actualizar_producto_via_api(self, client, categoria_ejemplo, usuario_ejemplo, admin_ejemplo):
         """Prueba actualizar un producto a través de la API"""
         # Arrange: Crear un producto primero
         producto_data = {
@@ -121,7 +121,7 @@ class TestProductoAPI:
         assert data["precio"] == 200.0
         assert data["descripcion"] == "Descripción original"  # No cambió
     
-    def test_actualizar_stock_via_api(self, client, categoria_ejemplo, usuario_ejemplo):
+    def test_actualizar_stock_via_api(self, client, categoria_ejemplo, usuario_ejemplo, admin_ejemplo):
         """Prueba actualizar el stock de un producto"""
         # Arrange: Crear un producto primero
         producto_data = {
@@ -0,0 +1,149 @@
+"""
+Pruebas de la reserva de stock de varios productos (POST /productos/stock/reserva)
+"""
+
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import status
+
+from crud.producto_crud import MAX_ITEMS_RESERVA, ProductoCRUD, StockInsuficiente
+from entities.producto import Producto
+
+RUTA = "/productos/stock/reserva"
+
+
+@pytest.fixture
+def productos(db_session, categoria_ejemplo, usuario_ejemplo):
+    """Tres productos con 10 unidades cada uno"""
+    productos = [
+        Producto(
+            nombre=f"Producto {i}",
+            descripcion="Descripción",
+            precio=10.0,
+            stock=10,
+            categoria_id=categoria_ejemplo.id_categoria,
+            usuario_id=usuario_ejemplo.id,
+            id_usuario_crea=usuario_ejemplo.id,
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(productos)
+    db_session.commit()
+    return [producto.id_producto for producto in productos]
+
+
+def _items(*pares):
+    return {
+        "items": [
+            {"producto_id": str(producto_id), "cantidad": cantidad}
+            for producto_id, cantidad in pares
+        ]
+    }
+
+
+def _stocks(db_session, ids):
+    db_session.expire_all()
+    return [db_session.get(Producto, producto_id).stock for producto_id in ids]
+
+
+class TestReservaStockAPI:
+    """Pruebas del endpoint de reserva"""
+
+    def test_reserva_completa(self, client, db_session, productos):
+        """Prueba que todos los productos se descuentan en una transacción"""
+        a, b, c = productos
+        response = client.post(RUTA, json=_items((a, 3), (b, 10), (a, 2)))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {p["id_producto"]: p["stock"] for p in response.json()} == {
+            str(a): 5,
+            str(b): 0,
+        }
+        assert _stocks(db_session, productos) == [5, 0, 10]
+
+    def test_sin_stock_no_descuenta_nada(self, client, db_session, productos):
+        """Prueba que si un producto no alcanza la reserva entera se revierte"""
+        a, b, c = productos
+        response = client.post(RUTA, json=_items((a, 1), (b, 11), (c, 1)))
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert str(b) in response.json()["detail"]
+        assert _stocks(db_session, productos) == [10, 10, 10]
+
+    def test_producto_inexistente(self, client, db_session, productos):
+        """Prueba que un producto inexistente rechaza la reserva"""
+        inexistente = uuid.uuid4()
+        response = client.post(RUTA, json=_items((productos[0], 1), (inexistente, 1)))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert str(inexistente) in response.json()["detail"]
+        assert _stocks(db_session, productos) == [10, 10, 10]
+
+    @pytest.mark.parametrize("cantidad", [0, -1])
+    def test_cantidad_no_positiva(self, client, productos, cantidad):
+        """Prueba que las cantidades deben ser positivas"""
+        response = client.post(RUTA, json=_items((productos[0], cantidad)))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_reserva_vacia_o_demasiado_grande(self, client, productos):
+        """Prueba los límites del número de productos"""
+        assert client.post(RUTA, json={"items": []}).status_code == 400
+        demasiados = _items(*[(uuid.uuid4(), 1) for _ in range(MAX_ITEMS_RESERVA + 1)])
+        assert client.post(RUTA, json=demasiados).status_code == 400
+
+    def test_bloqueo_en_orden_de_id(self, client, productos, presupuesto_consultas):
+        """Prueba que los UPDATE se emiten ordenados por id_producto"""
+        desordenados = sorted(productos, reverse=True)
+        with presupuesto_consultas(3, permitir_repetidas=True) as contador:
+            response = client.post(RUTA, json=_items(*[(p, 1) for p in desordenados]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["id_producto"] for p in response.json()] == [
+            str(p) for p in sorted(productos)
+        ]
+        assert all(s.lstrip().startswith("UPDATE") for s in contador.sentencias)
+
+
+def test_reservas_concurrentes_sin_sobreventa(
+    db_session, sesiones_concurrentes, productos
+):
+    """
+    Prueba de estrés: 60 cestas concurrentes sobre 3 productos con 10
+    unidades. Lo vendido de cada producto coincide con las cestas aceptadas
+    y ningún stock queda negativo.
+    """
+    Sesion = sesiones_concurrentes
+    generador = random.Random(18)
+    cestas = [
+        [
+            (producto_id, generador.randint(1, 3))
+            for producto_id in generador.sample(productos, 2)
+        ]
+        for _ in range(60)
+    ]
+
+    def reservar(cesta):
+        with Sesion() as sesion:
+            try:
+                ProductoCRUD(sesion).reservar_stock(cesta)
+                return True
+            except StockInsuficiente:
+                return False
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        aceptadas = list(executor.map(reservar, cestas))
+
+    vendido = dict.fromkeys(productos, 0)
+    for cesta, aceptada in zip(cestas, aceptadas):
+        if aceptada:
+            for producto_id, cantidad in cesta:
+                vendido[producto_id] += cantidad
+
+    stocks = _stocks(db_session, productos)
+    assert any(aceptadas) and not all(aceptadas)
+    assert all(stock >= 0 for stock in stocks)
+    assert stocks == [10 - vendido[producto_id] for producto_id in productos]
@@ -0,0 +1,129 @@
+"""
+Pruebas de GET /categorias/resumen (totales y muestras en una consulta)
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import status
+
+from entities.categoria import Categoria
+from entities.producto import Producto
+
+
+@pytest.fixture
+def catalogo(db_session, categoria_ejemplo, usuario_ejemplo):
+    """
+    categoria_ejemplo con 5 productos (stock 0..4, el más reciente es el 4)
+    y una segunda categoría sin productos, creada después
+    """
+    inicio = datetime.now(timezone.utc) - timedelta(days=1)
+    categoria_ejemplo.fecha_creacion = inicio
+    vacia = Categoria(
+        nombre="Vacía",
+        fecha_creacion=inicio + timedelta(hours=1),
+        id_usuario_crea=usuario_ejemplo.id,
+    )
+    db_session.add(vacia)
+    db_session.add_all(
+        Producto(
+            nombre=f"Producto {i}",
+            descripcion="Descripción",
+            precio=Decimal("10.50") + i,
+            stock=i,
+            categoria_id=categoria_ejemplo.id_categoria,
+            usuario_id=usuario_ejemplo.id,
+            id_usuario_crea=usuario_ejemplo.id,
+            fecha_creacion=inicio + timedelta(minutes=i),
+        )
+        for i in range(5)
+    )
+    db_session.commit()
+    return categoria_ejemplo, vacia
+
+
+def test_resumen_totales_y_muestras(client, catalogo):
+    """Prueba los totales y que las muestras son los productos más recientes"""
+    categoria, vacia = catalogo
+
+    response = client.get("/categorias/resumen?muestras=2")
+
+    assert response.status_code == status.HTTP_200_OK
+    datos = response.json()
+    assert [c["id_categoria"] for c in datos] == [
+        str(categoria.id_categoria),
+        str(vacia.id_categoria),
+    ]
+    assert datos[0]["nombre"] == categoria.nombre
+    assert datos[0]["total_productos"] == 5
+    assert datos[0]["stock_total"] == 10
+    assert [p["nombre"] for p in datos[0]["productos"]] == ["Producto 4", "Producto 3"]
+    assert datos[0]["productos"][0]["precio"] == 14.5
+    assert datos[1]["total_productos"] == 0
+    assert datos[1]["stock_total"] == 0
+    assert datos[1]["productos"] == []
+
+
+def test_resumen_sin_muestras_mantiene_totales(client, catalogo):
+    """Prueba que muestras=0 devuelve los totales sin productos"""
+    datos = client.get("/categorias/resumen?muestras=0").json()
+
+    assert datos[0]["total_productos"] == 5
+    assert datos[0]["productos"] == []
+
+
+def test_resumen_una_sola_consulta(client, catalogo, presupuesto_consultas):
+    """Prueba que el resumen cuesta las versiones del ETag y una consulta"""
+    with presupuesto_consultas(3):
+        response = client.get("/categorias/resumen")
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_resumen_paginado_por_cursor(client, catalogo):
+    """Prueba que el resumen se pagina con X-Next-Cursor"""
+    categoria, vacia = catalogo
+
+    primera = client.get("/categorias/resumen?limit=1")
+    cursor = primera.headers["x-next-cursor"]
+    segunda = client.get(f"/categorias/resumen?limit=1&cursor={cursor}")
+
+    assert [c["id_categoria"] for c in primera.json()] == [str(categoria.id_categoria)]
+    assert [c["id_categoria"] for c in segunda.json()] == [str(vacia.id_categoria)]
+    assert "x-next-cursor" not in segunda.headers
+
+
+def test_resumen_etag_cambia_con_productos(client, catalogo, usuario_ejemplo):
+    """Prueba que crear un producto invalida el ETag del resumen"""
+    categoria, _ = catalogo
+    etag = client.get("/categorias/resumen").headers["etag"]
+    assert (
+        client.get("/categorias/resumen", headers={"If-None-Match": etag}).status_code
+        == status.HTTP_304_NOT_MODIFIED
+    )
+
+    client.post(
+        "/productos/",
+        json={
+            "nombre": "Producto nuevo",
+            "descripcion": "Descripción",
+            "precio": 1.0,
+            "stock": 7,
+            "categoria_id": str(categoria.id_categoria),
+            "usuario_id": str(usuario_ejemplo.id),
+        },
+    )
+
+    response = client.get("/categorias/resumen", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["total_productos"] == 6
+
+
+@pytest.mark.parametrize("consulta", ["muestras=11", "muestras=-1", "cursor=xyz"])
+def test_resumen_parametros_invalidos(client, catalogo, consulta):
+    """Prueba que los parámetros fuera de rango se rechazan"""
+    response = client.get(f"/categorias/resumen?{consulta}")
+    assert response.status_code in (
+        status.HTTP_400_BAD_REQUEST,
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+    )
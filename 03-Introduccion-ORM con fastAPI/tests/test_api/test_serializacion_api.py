@@ -0,0 +1,118 @@
+"""
+Pruebas de la serialización rápida de los listados
+"""
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import status
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from apis.serializacion import clase_respuesta, codificar, codificador_configurado
+from crud.producto_crud import COLUMNAS_RESPUESTA
+from entities.producto import Producto
+from schemas import ProductoResponse
+
+
+@pytest.fixture
+def productos(db_session, categoria_ejemplo, usuario_ejemplo):
+    """Tres productos de ejemplo"""
+    for i in range(3):
+        db_session.add(
+            Producto(
+                nombre=f"Producto {i}",
+                descripcion="Descripción ñ",
+                precio=Decimal("10.50") + i,
+                stock=i,
+                categoria_id=categoria_ejemplo.id_categoria,
+                usuario_id=usuario_ejemplo.id,
+                id_usuario_crea=usuario_ejemplo.id,
+            )
+        )
+    db_session.commit()
+
+
+def test_columnas_coinciden_con_el_esquema():
+    """Prueba que las tuplas tienen los campos de ProductoResponse en su orden"""
+    assert COLUMNAS_RESPUESTA == tuple(ProductoResponse.model_fields)
+
+
+@pytest.mark.parametrize(
+    "ruta",
+    [
+        "/productos/?limit=2",
+        "/productos/categoria/{categoria}",
+        "/productos/usuario/{usuario}",
+    ],
+)
+def test_filas_y_orm_devuelven_el_mismo_cuerpo(
+    client, monkeypatch, productos, categoria_ejemplo, usuario_ejemplo, ruta
+):
+    """Prueba que el listado desde tuplas es idéntico al validado con Pydantic"""
+    ruta = ruta.format(
+        categoria=categoria_ejemplo.id_categoria, usuario=usuario_ejemplo.id
+    )
+    monkeypatch.setenv("LISTADOS_DESDE_FILAS", "1")
+    desde_filas = client.get(ruta)
+    monkeypatch.setenv("LISTADOS_DESDE_FILAS", "0")
+    desde_orm = client.get(ruta)
+
+    assert desde_filas.status_code == status.HTTP_200_OK
+    assert desde_filas.json() == desde_orm.json()
+    assert desde_filas.headers["content-type"] == "application/json"
+    assert desde_filas.headers["etag"] == desde_orm.headers["etag"]
+    assert desde_filas.headers.get("x-next-cursor") == desde_orm.headers.get(
+        "x-next-cursor"
+    )
+
+
+def test_filas_paginan_con_cursor(client, monkeypatch, productos):
+    """Prueba que el cursor de una página leída como tuplas es válido"""
+    monkeypatch.setenv("LISTADOS_DESDE_FILAS", "1")
+    primera = client.get("/productos/?limit=2")
+    cursor = primera.headers["x-next-cursor"]
+
+    segunda = client.get(f"/productos/?limit=2&cursor={cursor}")
+
+    nombres = [p["nombre"] for p in primera.json() + segunda.json()]
+    assert len(primera.json()) == 2
+    assert sorted(nombres) == ["Producto 0", "Producto 1", "Producto 2"]
+    assert "x-next-cursor" not in segunda.headers
+
+
+class TestCodificador:
+    """Selección y salida del codificador JSON"""
+
+    def test_clase_por_defecto(self, monkeypatch):
+        """Prueba que orjson es la clase por defecto si está instalado"""
+        monkeypatch.delenv("RESPUESTA_JSON", raising=False)
+        assert clase_respuesta() is ORJSONResponse
+
+        monkeypatch.setenv("RESPUESTA_JSON", "json")
+        assert clase_respuesta() is JSONResponse
+
+    def test_valor_invalido(self, monkeypatch):
+        """Prueba que un codificador desconocido se rechaza"""
+        monkeypatch.setenv("RESPUESTA_JSON", "ujson")
+        with pytest.raises(ValueError):
+            codificador_configurado()
+
+    def test_json_y_orjson_coinciden(self, monkeypatch):
+        """Prueba que ambos codificadores escriben igual UUID, Decimal y fechas"""
+        datos = [
+            {
+                "id": uuid.uuid4(),
+                "precio": Decimal("12.30"),
+                "utc": datetime(2024, 1, 2, 3, 4, 5, 6000, tzinfo=timezone.utc),
+                "local": datetime(2024, 1, 2, 3, 4, 5),
+                "texto": "ñandú",
+            }
+        ]
+        monkeypatch.setenv("RESPUESTA_JSON", "orjson")
+        rapido = codificar(datos)
+        monkeypatch.setenv("RESPUESTA_JSON", "json")
+
+        assert codificar(datos) == rapido
+        assert b'"2024-01-02T03:04:05.006000Z"' in rapido
@@ -0,0 +1,114 @@
+"""
+Pruebas del ajuste atómico de stock (POST /productos/{id}/stock/ajuste)
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import status
+
+from crud.producto_crud import ProductoCRUD, StockInsuficiente
+from entities.producto import Producto
+
+
+@pytest.fixture
+def producto(db_session, categoria_ejemplo, usuario_ejemplo):
+    """Producto con 10 unidades en stock"""
+    producto = Producto(
+        nombre="Producto Stock",
+        descripcion="Descripción",
+        precio=10.0,
+        stock=10,
+        categoria_id=categoria_ejemplo.id_categoria,
+        usuario_id=usuario_ejemplo.id,
+        id_usuario_crea=usuario_ejemplo.id,
+    )
+    db_session.add(producto)
+    db_session.commit()
+    return producto
+
+
+def _ruta(producto_id) -> str:
+    return f"/productos/{producto_id}/stock/ajuste"
+
+
+class TestAjusteStockAPI:
+    """Pruebas del endpoint de ajuste"""
+
+    def test_sumar_y_restar(self, client, producto):
+        """Prueba ajustes positivos y negativos"""
+        response = client.post(_ruta(producto.id_producto), json={"delta": 5})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["stock"] == 15
+
+        response = client.post(_ruta(producto.id_producto), json={"delta": -15})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["stock"] == 0
+        assert response.json()["fecha_edicion"] is not None
+
+    def test_stock_insuficiente(self, client, db_session, producto):
+        """Prueba que un ajuste que deja stock negativo responde 409 sin cambios"""
+        response = client.post(_ruta(producto.id_producto), json={"delta": -11})
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        db_session.expire_all()
+        assert db_session.get(Producto, producto.id_producto).stock == 10
+
+    def test_producto_inexistente(self, client, producto):
+        """Prueba que un producto inexistente responde 404"""
+        response = client.post(_ruta(uuid.uuid4()), json={"delta": -1})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_delta_cero(self, client, producto):
+        """Prueba que un ajuste de 0 unidades se rechaza"""
+        response = client.post(_ruta(producto.id_producto), json={"delta": 0})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_una_sola_consulta(self, client, producto, presupuesto_consultas):
+        """Prueba que un ajuste correcto es un único UPDATE ... RETURNING"""
+        ruta = _ruta(producto.id_producto)
+        with presupuesto_consultas(1) as contador:
+            response = client.post(ruta, json={"delta": -1})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert contador.sentencias[0].lstrip().upper().startswith("UPDATE")
+
+    def test_invalida_etag_del_listado(self, client, db_session, producto):
+        """Prueba que el ajuste actualiza fecha_edicion (validador de listados)"""
+        # CURRENT_TIMESTAMP de SQLite tiene resolución de segundos
+        ayer = datetime.now(timezone.utc) - timedelta(days=1)
+        producto.fecha_creacion = producto.fecha_edicion = ayer
+        db_session.commit()
+        etag = client.get("/productos/").headers["etag"]
+        client.post(_ruta(producto.id_producto), json={"delta": 1})
+
+        response = client.get("/productos/", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+
+
+def test_ventas_concurrentes_no_pierden_unidades(
+    db_session, sesiones_concurrentes, producto
+):
+    """Prueba que 30 ventas concurrentes de 1 unidad venden exactamente 10"""
+    producto_id = producto.id_producto
+    Sesion = sesiones_concurrentes
+
+    def vender(_):
+        with Sesion() as sesion:
+            try:
+                ProductoCRUD(sesion).ajustar_stock(producto_id, -1)
+                return True
+            except StockInsuficiente:
+                return False
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        resultados = list(executor.map(vender, range(30)))
+
+    db_session.expire_all()
+    assert resultados.count(True) == 10
+    assert db_session.get(Producto, producto_id).stock == 0
@@ -0,0 +1,92 @@
+"""
+Pruebas de la búsqueda de productos con índice de texto (FTS5 en SQLite)
+"""
+import pytest
+
+from crud.producto_crud import ProductoCRUD
+from database.busqueda import consulta_fts5, patron_subcadena, terminos_busqueda
+
+
+@pytest.fixture
+def catalogo(db_session, categoria_ejemplo, usuario_ejemplo):
+    """Productos con nombres y descripciones variados"""
+    producto_crud = ProductoCRUD(db_session)
+    datos = [
+        ("Laptop HP", "Portátil con pantalla de 15 pulgadas"),
+        ("Mouse Logitech", "Ratón inalámbrico para laptop"),
+        ("Teclado Mecánico", "Teclado con interruptores rojos"),
+        ("Monitor Samsung", "Pantalla LED de 27 pulgadas"),
+    ]
+    return {
+        nombre: producto_crud.crear_producto(
+            nombre=nombre,
+            descripcion=descripcion,
+            precio=100.0,
+            stock=1,
+            categoria_id=categoria_ejemplo.id_categoria,
+            usuario_id=usuario_ejemplo.id
+        )
+        for nombre, descripcion in datos
+    }
+
+
+class TestTerminosBusqueda:
+    """Pruebas de la preparación del texto buscado"""
+
+    def test_terminos_sin_operadores(self):
+        """Prueba que los operadores de FTS se descartan"""
+        assert terminos_busqueda('Laptop "HP" OR -x*') == ["laptop", "hp", "or", "x"]
+
+    def test_consulta_fts5_por_prefijo(self):
+        """Prueba que cada término se busca como prefijo"""
+        assert consulta_fts5(["lap", "hp"]) == '"lap"* "hp"*'
+
+    def test_patron_subcadena_escapa_comodines(self):
+        """Prueba que % y _ se buscan literalmente"""
+        assert patron_subcadena("50%_") == "%50\\%\\_%"
+
+
+class TestBusquedaProductos:
+    """Pruebas de ProductoCRUD.buscar_productos_por_nombre"""
+
+    def test_busqueda_por_prefijo(self, db_session, catalogo):
+        """Prueba que un prefijo (lo escrito hasta ahora) encuentra el producto"""
+        productos = ProductoCRUD(db_session).buscar_productos_por_nombre("Lapt")
+
+        assert {p.nombre for p in productos} == {"Laptop HP", "Mouse Logitech"}
+
+    def test_coincidencia_en_nombre_primero(self, db_session, catalogo):
+        """Prueba que los resultados se ordenan por relevancia"""
+        productos = ProductoCRUD(db_session).buscar_productos_por_nombre("laptop hp")
+
+        assert [p.nombre for p in productos] == ["Laptop HP"]
+
+    def test_busqueda_en_descripcion_sin_acentos(self, db_session, catalogo):
+        """Prueba que se busca en la descripción ignorando tildes"""
+        productos = ProductoCRUD(db_session).buscar_productos_por_nombre("portatil")
+
+        assert [p.nombre for p in productos] == ["Laptop HP"]
+
+    def test_limite_de_resultados(self, db_session, catalogo):
+        """Prueba que se respeta el número máximo de resultados"""
+        productos = ProductoCRUD(db_session).buscar_productos_por_nombre(
+            "pulgadas", limit=1
+        )
+
+        assert len(productos) == 1
+
+    def test_texto_sin_palabras(self, db_session, catalogo):
+        """Prueba que un texto sin palabras no devuelve nada"""
+        assert ProductoCRUD(db_session).buscar_productos_por_nombre("***") == []
+
+    def test_indice_refleja_actualizaciones(self, db_session, catalogo, admin_ejemplo):
+        """Prueba que los triggers mantienen el índice al editar y eliminar"""
+        producto_crud = ProductoCRUD(db_session)
+        teclado = catalogo["Teclado Mecánico"]
+
+        producto_crud.actualizar_producto(teclado.id_producto, nombre="Keyboard")
+        assert producto_crud.buscar_productos_por_nombre("mecanico") == []
+        assert len(producto_crud.buscar_productos_por_nombre("keyboard")) == 1
+
+        producto_crud.eliminar_producto(teclado.id_producto)
+        assert producto_crud.buscar_productos_por_nombre("keyboard") == []
@@ -0,0 +1,251 @@
+"""
+Pruebas de la caché de categorías y de su invalidación
+"""
+import asyncio
+
+import pytest
+
+from crud.categoria_crud import CategoriaCRUD, cache_categorias, canal_categorias
+from database.cache import CacheTTL
+from database.routing import en_primario
+
+
+@pytest.fixture
+def cache_limpia():
+    """Caché de categorías vacía y con estadísticas a cero"""
+    cache_categorias.invalidar()
+    cache_categorias.reiniciar_estadisticas()
+    return cache_categorias
+
+
+class TestCacheTTL:
+    """Pruebas de CacheTTL"""
+
+    def test_expira_tras_ttl(self, monkeypatch):
+        """Prueba que una entrada deja de servirse al vencer su TTL"""
+        ahora = [100.0]
+        monkeypatch.setattr("database.cache.time.monotonic", lambda: ahora[0])
+        cache = CacheTTL(ttl_segundos=10, max_entradas=5)
+
+        cache.guardar("a", 1, cache.generacion)
+        ahora[0] = 109.9
+        assert cache.obtener("a") == (True, 1)
+        ahora[0] = 110.0
+        assert cache.obtener("a") == (False, None)
+
+    def test_expulsa_la_menos_usada(self):
+        """Prueba que al superar el máximo se expulsa la entrada menos reciente"""
+        cache = CacheTTL(ttl_segundos=60, max_entradas=2)
+        cache.guardar("a", 1, cache.generacion)
+        cache.guardar("b", 2, cache.generacion)
+        cache.obtener("a")
+
+        cache.guardar("c", 3, cache.generacion)
+
+        assert cache.obtener("a") == (True, 1)
+        assert cache.obtener("b") == (False, None)
+        assert cache.resumen()["expulsiones"] == 1
+
+    def test_descarta_lecturas_anteriores_a_invalidar(self):
+        """Prueba que no se guarda un valor leído antes de una invalidación"""
+        cache = CacheTTL(ttl_segundos=60, max_entradas=5)
+        generacion = cache.generacion
+
+        cache.invalidar()
+        cache.guardar("a", "valor anterior", generacion)
+
+        assert cache.obtener("a") == (False, None)
+
+    def test_desactivada_con_ttl_cero(self, monkeypatch):
+        """Prueba que CACHE_<X>_TTL=0 desactiva la caché"""
+        monkeypatch.setenv("CACHE_PRUEBA_TTL", "0")
+        cache = CacheTTL.desde_entorno("CACHE_PRUEBA", ttl_defecto=60, max_defecto=5)
+
+        cache.guardar("a", 1, cache.generacion)
+
+        assert not cache.activa
+        assert cache.obtener("a") == (False, None)
+
+
+class TestCacheCategorias:
+    """Pruebas de la caché en CategoriaCRUD"""
+
+    def test_lecturas_repetidas_sin_consultas(
+        self, db_session, categoria_ejemplo, cache_limpia, presupuesto_consultas
+    ):
+        """Prueba que por ID, por nombre y el listado se sirven desde la caché"""
+        categoria_crud = CategoriaCRUD(db_session)
+        categoria_crud.obtener_categoria(categoria_ejemplo.id_categoria)
+        categoria_crud.obtener_categoria_por_nombre("Electrónicos")
+        categoria_crud.obtener_categorias_pagina(limit=10)
+        db_session.expunge_all()
+
+        with presupuesto_consultas(0):
+            por_id = categoria_crud.obtener_categoria(categoria_ejemplo.id_categoria)
+            por_nombre = categoria_crud.obtener_categoria_por_nombre(" Electrónicos ")
+            pagina, siguiente = categoria_crud.obtener_categorias_pagina(limit=10)
+
+        assert por_id.nombre == "Electrónicos"
+        assert por_nombre is por_id
+        assert [c.id_categoria for c in pagina] == [categoria_ejemplo.id_categoria]
+        assert siguiente is None
+        assert cache_limpia.resumen()["aciertos"] == 3
+
+    def test_no_guarda_inexistentes(self, db_session, cache_limpia):
+        """Prueba que una categoría inexistente no se guarda en la caché"""
+        import uuid
+
+        categoria_crud = CategoriaCRUD(db_session)
+
+        assert categoria_crud.obtener_categoria(uuid.uuid4()) is None
+        assert cache_limpia.resumen()["entradas"] == 0
+
+    def test_actualizar_invalida(
+        self, db_session, categoria_ejemplo, usuario_ejemplo, cache_limpia
+    ):
+        """Prueba que actualizar una categoría invalida la caché"""
+        categoria_crud = CategoriaCRUD(db_session)
+        categoria_crud.obtener_categoria_por_nombre("Electrónicos")
+
+        categoria_crud.actualizar_categoria(
+            categoria_ejemplo.id_categoria,
+            id_usuario_edita=usuario_ejemplo.id,
+            nombre="Electrónica",
+        )
+
+        assert categoria_crud.obtener_categoria_por_nombre("Electrónicos") is None
+        assert categoria_crud.obtener_categoria_por_nombre("Electrónica") is not None
+
+    def test_crear_y_eliminar_invalidan(
+        self, db_session, categoria_ejemplo, usuario_ejemplo, cache_limpia
+    ):
+        """Prueba que crear y eliminar categorías invalidan el listado"""
+        categoria_crud = CategoriaCRUD(db_session)
+        assert len(categoria_crud.obtener_categorias()) == 1
+
+        nueva = categoria_crud.crear_categoria(
+            nombre="Hogar", id_usuario_crea=usuario_ejemplo.id
+        )
+        assert len(categoria_crud.obtener_categorias()) == 2
+
+        categoria_crud.eliminar_categoria(nueva.id_categoria)
+        assert len(categoria_crud.obtener_categorias()) == 1
+
+    def test_escrituras_leen_de_la_base_de_datos(
+        self, db_session, categoria_ejemplo, cache_limpia, presupuesto_consultas
+    ):
+        """Prueba que las lecturas dentro de una escritura no usan la caché"""
+        categoria_crud = CategoriaCRUD(db_session)
+        categoria_crud.obtener_categoria(categoria_ejemplo.id_categoria)
+
+        @en_primario
+        def leer_en_escritura(crud):
+            return crud.obtener_categoria(categoria_ejemplo.id_categoria)
+
+        with presupuesto_consultas(1):
+            assert leer_en_escritura(categoria_crud) is not None
+
+    def test_existencia_en_escritura_usa_cache(
+        self, db_session, categoria_ejemplo, cache_limpia, presupuesto_consultas
+    ):
+        """Prueba que la comprobación de existencia de crear_producto usa la caché"""
+        import uuid
+
+        categoria_crud = CategoriaCRUD(db_session)
+        inexistente = uuid.uuid4()
+        ids = [categoria_ejemplo.id_categoria, inexistente]
+        assert categoria_crud.categorias_existentes(ids) == {
+            categoria_ejemplo.id_categoria
+        }
+
+        # Solo la inexistente vuelve a consultarse
+        with presupuesto_consultas(1):
+            existentes = categoria_crud.categorias_existentes(ids)
+
+        assert existentes == {categoria_ejemplo.id_categoria}
+
+    def test_crear_y_actualizar_producto_no_leen_categorias(
+        self, db_session, categoria_ejemplo, usuario_ejemplo, cache_limpia
+    ):
+        """Prueba que crear_producto y actualizar_producto validan la categoría con la caché"""
+        from crud.producto_crud import ProductoCRUD
+        from database.presupuesto import contar_consultas
+
+        categoria_id = categoria_ejemplo.id_categoria
+        usuario_id = usuario_ejemplo.id
+        CategoriaCRUD(db_session).categorias_existentes([categoria_id])
+        producto_crud = ProductoCRUD(db_session)
+        # Como AsyncSessionLocal: el COMMIT no obliga a releer las entidades
+        db_session.expire_on_commit = False
+
+        with contar_consultas(db_session.get_bind()) as contador:
+            producto = producto_crud.crear_producto(
+                nombre="Producto",
+                descripcion="Descripción",
+                precio=10.0,
+                stock=1,
+                categoria_id=categoria_id,
+                usuario_id=usuario_id,
+            )
+            producto_crud.actualizar_producto(
+                producto.id_producto,
+                id_usuario_edita=usuario_id,
+                categoria_id=categoria_id,
+            )
+
+        # Usuario e INSERT; UPDATE ... RETURNING: ninguna lee categorias
+        assert contador.total == 3
+        assert not [s for s in contador.sentencias if "FROM categorias" in s]
+
+    def test_invalida_otros_workers(
+        self, db_session, categoria_ejemplo, usuario_ejemplo, cache_limpia
+    ):
+        """Prueba que una escritura avisa a las cachés suscritas al canal"""
+        otro_worker = CacheTTL(ttl_segundos=60, max_entradas=10)
+        otro_worker.guardar("clave", "valor", otro_worker.generacion)
+        canal_categorias.suscribir(otro_worker.invalidar)
+        try:
+            CategoriaCRUD(db_session).actualizar_categoria(
+                categoria_ejemplo.id_categoria,
+                id_usuario_edita=usuario_ejemplo.id,
+                descripcion="Nueva descripción",
+            )
+        finally:
+            canal_categorias._suscriptores.remove(otro_worker.invalidar)
+
+        assert otro_worker.obtener("clave") == (False, None)
+        assert otro_worker.resumen()["invalidaciones"] == 1
+
+    @pytest.mark.parametrize(
+        "url, escucha, esperado",
+        [
+            ("postgresql://u:p@localhost:5432/db", "1", 1),
+            ("postgresql://u:p@localhost:5432/db", "0", 0),
+            ("sqlite:///categorias.db", "1", 0),
+        ],
+    )
+    def test_escucha_al_arrancar(self, monkeypatch, url, escucha, esperado):
+        """Prueba que LISTEN solo se abre con PostgreSQL y CACHE_ESCUCHA activa"""
+        import main
+        from database import config
+
+        monkeypatch.setenv("DATABASE_URL", url)
+        monkeypatch.setenv("CACHE_ESCUCHA", escucha)
+        monkeypatch.setattr(config, "load_dotenv", lambda: None)
+        monkeypatch.setattr(config, "_motores", None)
+        escuchas = []
+        monkeypatch.setattr(canal_categorias, "escuchar", escuchas.append)
+
+        asyncio.run(main.startup_event())
+
+        assert len(escuchas) == esperado
+
+    def test_estado_en_monitoreo(self, client, categoria_ejemplo, cache_limpia):
+        """Prueba que GET /categorias/ usa la caché y se ve en /monitoreo/cache"""
+        client.get("/categorias/")
+        client.get("/categorias/")
+
+        # Versión del listado (ETag) y página: fallan la primera vez
+        datos = client.get("/monitoreo/cache").json()["datos"]["categorias"]
+        assert datos["aciertos"] == 2
+        assert datos["fallos"] == 2
@@ -0,0 +1,92 @@
+"""
+Pruebas para las variantes asíncronas de las clases CRUD
+"""
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud.categoria_crud import CategoriaCRUDAsync
+from crud.producto_crud import ProductoCRUDAsync
+from crud.usuario_crud import UsuarioCRUDAsync
+
+
+@pytest.fixture
+def async_session(db_session):
+    """AsyncSession que delega en la sesión síncrona de prueba"""
+    return AsyncSession(sync_session_class=lambda **kwargs: db_session)
+
+
+class TestCRUDAsync:
+    """Pruebas para ProductoCRUDAsync, CategoriaCRUDAsync y UsuarioCRUDAsync"""
+
+    @pytest.mark.asyncio
+    async def test_crear_y_obtener_producto(
+        self, async_session, categoria_ejemplo, usuario_ejemplo
+    ):
+        """Prueba crear y leer un producto con la variante asíncrona"""
+        # Arrange
+        producto_crud = ProductoCRUDAsync(async_session)
+
+        # Act
+        producto = await producto_crud.crear_producto(
+            nombre="Producto Async",
+            descripcion="Descripción async",
+            precio=10.0,
+            stock=3,
+            categoria_id=categoria_ejemplo.id_categoria,
+            usuario_id=usuario_ejemplo.id,
+        )
+        obtenido = await producto_crud.obtener_producto(producto.id_producto)
+
+        # Assert
+        assert obtenido is not None
+        assert obtenido.nombre == "Producto Async"
+        assert len(await producto_crud.obtener_productos()) == 1
+
+    @pytest.mark.asyncio
+    async def test_validaciones_se_propagan(self, async_session, usuario_ejemplo):
+        """Prueba que los ValueError de la clase síncrona llegan al llamador"""
+        # Arrange
+        categoria_crud = CategoriaCRUDAsync(async_session)
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="obligatorio"):
+            await categoria_crud.crear_categoria(
+                nombre="", id_usuario_crea=usuario_ejemplo.id
+            )
+
+    @pytest.mark.asyncio
+    async def test_autenticar_usuario(self, async_session, usuario_ejemplo):
+        """Prueba autenticar un usuario con la variante asíncrona"""
+        # Arrange
+        usuario_crud = UsuarioCRUDAsync(async_session)
+
+        # Act
+        usuario = await usuario_crud.autenticar_usuario("testuser", "Password123!")
+        rechazado = await usuario_crud.autenticar_usuario("testuser", "Incorrecta1!")
+
+        # Assert
+        assert usuario is not None
+        assert usuario.id == usuario_ejemplo.id
+        assert rechazado is None
+
+    @pytest.mark.asyncio
+    async def test_autenticar_actualiza_hash_antiguo(
+        self, async_session, db_session, usuario_ejemplo, monkeypatch
+    ):
+        """Prueba que un login correcto migra el hash al esquema configurado"""
+        # Arrange
+        monkeypatch.setenv("HASH_PBKDF2_ITERACIONES", "2000")
+        usuario_crud = UsuarioCRUDAsync(async_session)
+        hash_anterior = usuario_ejemplo.contraseña_hash
+
+        # Act
+        fallido = await usuario_crud.autenticar_usuario("testuser", "Incorrecta123!")
+        sin_migrar = usuario_ejemplo.contraseña_hash
+        usuario = await usuario_crud.autenticar_usuario("testuser", "Password123!")
+
+        # Assert
+        assert fallido is None
+        assert sin_migrar == hash_anterior
+        assert usuario is not None
+        db_session.expire_all()
+        assert usuario_ejemplo.contraseña_hash.startswith("pbkdf2_sha256:2000:")
+        assert await usuario_crud.autenticar_usuario("testuser", "Password123!")
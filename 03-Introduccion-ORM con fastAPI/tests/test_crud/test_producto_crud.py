@@ -152,6 +152,40 @@ class TestProductoCRUD:
         assert producto_obtenido.id_producto == producto.id_producto
         assert producto_obtenido.nombre == "Producto Test"
     
+    def test_obtener_pagina_con_relaciones_en_una_consulta(self, db_session, categoria_ejemplo, usuario_ejemplo, presupuesto_consultas):
+        """Prueba que expandir las relaciones no añade una consulta por producto"""
+        # Arrange
+        producto_crud = ProductoCRUD(db_session)
+        for i in range(20):
+            producto_crud.crear_producto(
+                nombre=f"Producto {i}",
+                descripcion="Descripción",
+                precio=10.0,
+                stock=i,
+                categoria_id=categoria_ejemplo.id_categoria,
+                usuario_id=usuario_ejemplo.id
+            )
+        esperado = {(categoria_ejemplo.nombre, usuario_ejemplo.nombre_usuario, None)}
+        db_session.expunge_all()
+
+        # Act
+        with presupuesto_consultas(1):
+            productos, _ = producto_crud.obtener_productos_pagina(
+                expandir=("categoria", "usuario_crea", "usuario_edita")
+            )
+            nombres = {(p.categoria.nombre, p.usuario_crea.nombre_usuario, p.usuario_edita) for p in productos}
+
+        # Assert
+        assert len(productos) == 20
+        assert nombres == esperado
+
+    def test_expandir_relacion_desconocida(self, db_session):
+        """Prueba que expandir una relación inexistente lanza ValueError"""
+        producto_crud = ProductoCRUD(db_session)
+
+        with pytest.raises(ValueError, match="No se puede expandir"):
+            producto_crud.obtener_productos_pagina(expandir=("proveedor",))
+
     def test_obtener_producto_por_id_no_existente(self, db_session):
         """Prueba obtener un producto por ID cuando no existe"""
         # Arrange
@@ -216,6 +250,61 @@ class TestProductoCRUD:
         assert float(producto_actualizado.precio) == 200.75
         assert producto_actualizado.descripcion == "Descripción original"  # No cambió
     
+    def test_actualizar_producto_en_un_solo_update(self, db_session, categoria_ejemplo, usuario_ejemplo, admin_ejemplo, presupuesto_consultas):
+        """Prueba que actualizar es un UPDATE ... RETURNING que fija fecha_edicion"""
+        # Arrange
+        producto_crud = ProductoCRUD(db_session)
+        producto = producto_crud.crear_producto(
+            nombre="Producto Original",
+            descripcion="Descripción original",
+            precio=100.50,
+            stock=10,
+            categoria_id=categoria_ejemplo.id_categoria,
+            usuario_id=usuario_ejemplo.id
+        )
+        producto_id, admin_id = producto.id_producto, admin_ejemplo.id
+        db_session.expire_on_commit = False
+
+        # Act
+        with presupuesto_consultas(1) as contador:
+            producto_actualizado = producto_crud.actualizar_producto(
+                producto_id, id_usuario_edita=admin_id, stock=3
+            )
+
+        # Assert
+        assert "RETURNING" in contador.sentencias[0]
+        assert producto_actualizado is producto
+        assert producto.stock == 3
+        assert producto.fecha_edicion is not None
+        assert producto.id_usuario_edita == admin_id
+
+    def test_actualizar_producto_ignora_lo_que_no_es_columna(self, db_session, categoria_ejemplo, usuario_ejemplo, admin_ejemplo):
+        """Prueba que las relaciones y otros atributos no llegan al UPDATE"""
+        # Arrange
+        producto_crud = ProductoCRUD(db_session)
+        producto = producto_crud.crear_producto(
+            nombre="Producto Original",
+            descripcion="Descripción original",
+            precio=100.50,
+            stock=10,
+            categoria_id=categoria_ejemplo.id_categoria,
+            usuario_id=usuario_ejemplo.id
+        )
+
+        # Act
+        producto_actualizado = producto_crud.actualizar_producto(
+            producto.id_producto,
+            id_usuario_edita=admin_ejemplo.id,
+            nombre="Producto Nuevo",
+            categoria=None,
+            usuario_crea=None,
+            __repr__="no es una columna",
+        )
+
+        # Assert
+        assert producto_actualizado.nombre == "Producto Nuevo"
+        assert producto_actualizado.categoria_id == categoria_ejemplo.id_categoria
+
     def test_actualizar_producto_no_existente(self, db_session, admin_ejemplo):
         """Prueba actualizar un producto que no existe"""
         # Arrange
@@ -0,0 +1,157 @@
+"""
+Pruebas de las sesiones asíncronas de database.config sobre un AsyncEngine
+real (SQLite con aiosqlite en lugar de asyncpg)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from crud.usuario_crud import UsuarioCRUDAsync
+from database import config
+from database.config import Base, get_async_db
+from database.pool import AsyncAdaptedQueuePoolMedido, calcular_config_pool
+
+
+def _engine_sqlite(url, pool_config):
+    return create_engine(url, poolclass=NullPool)
+
+
+def _async_engine_sqlite(url, pool_config):
+    return create_async_engine(
+        make_url(url).set(drivername="sqlite+aiosqlite"), poolclass=NullPool
+    )
+
+
+@pytest.fixture
+def motores_sqlite(tmp_path, monkeypatch):
+    """
+    Motores de database.config sobre dos bases SQLite (primaria y réplica)
+
+    _crear_motores se ejecuta tal cual; solo cambian los engines, que usan
+    aiosqlite y NullPool (no queda ninguna conexión abierta al terminar).
+    """
+    urls = []
+    for nombre in ("primaria", "replica"):
+        url = f"sqlite:///{tmp_path / nombre}.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+        urls.append(url)
+    monkeypatch.setattr(config, "load_dotenv", lambda: None)
+    monkeypatch.setenv("DATABASE_URL", urls[0])
+    monkeypatch.setenv("DATABASE_REPLICA_URL", urls[1])
+    monkeypatch.setattr(config, "_crear_engine", _engine_sqlite)
+    monkeypatch.setattr(config, "_crear_async_engine", _async_engine_sqlite)
+    monkeypatch.setattr(config, "_motores", None)
+    return config.motores()
+
+
+async def _sesion_peticion(metodo):
+    """Abrir la sesión de get_async_db para una petición con ese método"""
+    dependencia = get_async_db(SimpleNamespace(method=metodo))
+    return dependencia, await dependencia.__anext__()
+
+
+async def _crear_usuario(db, nombre_usuario="asyncuser"):
+    return await UsuarioCRUDAsync(db).crear_usuario(
+        nombre="Usuario Async",
+        nombre_usuario=nombre_usuario,
+        email=f"{nombre_usuario}@example.com",
+        contraseña="Password123!",
+    )
+
+
+def test_url_asincrona_retira_parametros_de_libpq():
+    """Prueba que la URL usa asyncpg y pierde sslmode y channel_binding"""
+    # Act
+    url = config._url_asincrona(
+        "postgresql://u:p@host:5432/db"
+        "?sslmode=require&channel_binding=require&application_name=api"
+    )
+
+    # Assert
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.database == "db"
+    assert dict(url.query) == {"application_name": "api"}
+
+
+def test_crear_async_engine(monkeypatch):
+    """Prueba el engine asyncpg: URL sin parámetros de libpq y pool medido"""
+    # Arrange
+    for variable in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_MAX_CONEXIONES"):
+        monkeypatch.delenv(variable, raising=False)
+    pool_config = calcular_config_pool()
+
+    # Act
+    engine = config._crear_async_engine(
+        "postgresql://u:p@host:5432/db?sslmode=require", pool_config
+    )
+    engine.sync_engine.dispose()
+
+    # Assert
+    assert engine.url.drivername == "postgresql+asyncpg"
+    assert "sslmode" not in engine.url.query
+    assert isinstance(engine.sync_engine.pool, AsyncAdaptedQueuePoolMedido)
+    assert engine.sync_engine.pool.size() == pool_config["pool_size"]
+
+
+@pytest.mark.asyncio
+async def test_sesion_no_expira_al_confirmar(motores_sqlite):
+    """Prueba que los objetos se leen sin ir a la base después del commit"""
+    # Arrange
+    async with motores_sqlite.AsyncSessionLocal() as db:
+        # Act
+        usuario = await _crear_usuario(db)
+
+        # Assert: con expire_on_commit=True el acceso fallaría (MissingGreenlet)
+        assert usuario.nombre_usuario == "asyncuser"
+        assert usuario.id is not None
+
+    dependencia, db = await _sesion_peticion("POST")
+    guardado = await UsuarioCRUDAsync(db).obtener_usuario(usuario.id)
+    await dependencia.aclose()
+    assert guardado.email == "asyncuser@example.com"
+
+
+@pytest.mark.asyncio
+async def test_get_async_db_lecturas_get_van_a_la_replica(motores_sqlite):
+    """Prueba que get_async_db enruta los GET a la réplica y el resto al primario"""
+    # Arrange: el usuario solo existe en la base primaria
+    dependencia, db = await _sesion_peticion("POST")
+    usuario = await _crear_usuario(db)
+    await dependencia.aclose()
+
+    # Act
+    dependencia, db = await _sesion_peticion("GET")
+    en_get = await UsuarioCRUDAsync(db).obtener_usuario(usuario.id)
+    await dependencia.aclose()
+    dependencia, db = await _sesion_peticion("PUT")
+    en_put = await UsuarioCRUDAsync(db).obtener_usuario(usuario.id)
+    await dependencia.aclose()
+
+    # Assert
+    assert motores_sqlite.AsyncSessionLocal.kw["replica"] is (
+        motores_sqlite.async_replica_engine.sync_engine
+    )
+    assert en_get is None
+    assert en_put is not None
+
+
+@pytest.mark.asyncio
+async def test_get_async_db_lectura_despues_de_escritura(motores_sqlite):
+    """Prueba que un GET que escribe vuelve a leer del primario"""
+    # Arrange
+    dependencia, db = await _sesion_peticion("GET")
+
+    # Act
+    usuario = await _crear_usuario(db, "escritor")
+    leido = await UsuarioCRUDAsync(db).obtener_usuario(usuario.id)
+    await dependencia.aclose()
+
+    # Assert
+    assert leido is not None
@@ -0,0 +1,173 @@
+"""
+Pruebas de la comprobación del esquema al arrancar y de la carga perezosa
+de la configuración
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from database.esquema import (
+    REVISION_CREATE_ALL,
+    EsquemaDesactualizado,
+    migrar,
+    modo_esquema,
+    preparar_esquema,
+    version_esperada,
+)
+
+RAIZ = Path(__file__).parents[2]
+
+
+@pytest.fixture
+def engine_vacio(tmp_path):
+    """AsyncEngine sobre una base SQLite vacía (sin pool que cerrar)"""
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'esquema.db'}", poolclass=NullPool
+    )
+
+
+async def _fijar_version(engine, version):
+    async with engine.begin() as conexion:
+        await conexion.execute(
+            text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)")
+        )
+        await conexion.execute(
+            text("INSERT INTO alembic_version VALUES (:version)"), {"version": version}
+        )
+
+
+def test_version_esperada_es_la_ultima_migracion():
+    """Prueba que la revisión esperada es la cabeza de migrations/versions"""
+    from alembic.script import ScriptDirectory
+
+    scripts = ScriptDirectory(str(RAIZ / "migrations"))
+    assert version_esperada() == scripts.get_current_head()
+    # La revisión de las bases creadas con create_all es anterior a la cabeza
+    assert REVISION_CREATE_ALL in {
+        revision.revision for revision in scripts.iterate_revisions("head", "base")
+    }
+
+
+@pytest.mark.asyncio
+async def test_verificar_acepta_la_version_esperada(engine_vacio, monkeypatch):
+    """Prueba que una base en la revisión esperada arranca"""
+    monkeypatch.setenv("ESQUEMA_AL_INICIAR", "verificar")
+    await _fijar_version(engine_vacio, version_esperada())
+
+    assert await preparar_esquema(engine_vacio) == "verificar"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("version", [None, "a1c3e5f7b901"])
+async def test_verificar_rechaza_otra_version(engine_vacio, monkeypatch, version):
+    """Prueba que sin migraciones o con una revisión anterior el arranque falla"""
+    monkeypatch.setenv("ESQUEMA_AL_INICIAR", "verificar")
+    if version:
+        await _fijar_version(engine_vacio, version)
+
+    with pytest.raises(EsquemaDesactualizado, match="migrar_esquema.py"):
+        await preparar_esquema(engine_vacio)
+
+
+@pytest.mark.asyncio
+async def test_crear_crea_las_tablas(engine_vacio, monkeypatch):
+    """Prueba el modo de desarrollo con create_all"""
+    monkeypatch.setenv("ESQUEMA_AL_INICIAR", "crear")
+
+    assert await preparar_esquema(engine_vacio) == "crear"
+
+    async with engine_vacio.connect() as conexion:
+        tablas = await conexion.run_sync(
+            lambda conexion_sync: inspect(conexion_sync).get_table_names()
+        )
+    assert {"productos", "categorias", "tbl_usuarios"} <= set(tablas)
+
+
+@pytest.mark.asyncio
+async def test_omitir_no_crea_engines(monkeypatch):
+    """Prueba que en modo omitir no se crean los engines ni se exige DATABASE_URL"""
+    import database.config as config
+
+    monkeypatch.setenv("ESQUEMA_AL_INICIAR", "omitir")
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(config, "load_dotenv", lambda: None)
+    monkeypatch.setattr(config, "_motores", None)
+
+    assert await preparar_esquema() == "omitir"
+    assert config._motores is None
+
+
+@pytest.mark.parametrize("version, marcas", [(None, [REVISION_CREATE_ALL]), ("x", [])])
+def test_migrar(tmp_path, monkeypatch, version, marcas):
+    """
+    Prueba que una base sin alembic_version recibe las tablas y se marca en
+    REVISION_CREATE_ALL antes de aplicar las migraciones
+    """
+    from alembic import command
+    from sqlalchemy import create_engine
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrar.db'}")
+    if version:
+        with engine.begin() as conexion:
+            conexion.execute(text("CREATE TABLE alembic_version (version_num TEXT)"))
+            conexion.execute(text(f"INSERT INTO alembic_version VALUES ('{version}')"))
+    estampadas, actualizadas = [], []
+    monkeypatch.setattr(command, "stamp", lambda config, rev: estampadas.append(rev))
+    monkeypatch.setattr(command, "upgrade", lambda config, rev: actualizadas.append(rev))
+
+    assert migrar(engine) == version_esperada()
+
+    tablas = set(inspect(engine).get_table_names())
+    engine.dispose()
+    assert estampadas == marcas
+    assert actualizadas == ["head"]
+    assert ("productos" in tablas) is (version is None)
+
+
+def test_modo_invalido(monkeypatch):
+    """Prueba que un valor desconocido de ESQUEMA_AL_INICIAR se rechaza"""
+    monkeypatch.setenv("ESQUEMA_AL_INICIAR", "migrar")
+    with pytest.raises(ValueError, match="ESQUEMA_AL_INICIAR"):
+        modo_esquema()
+
+
+def test_importar_main_no_crea_engines():
+    """
+    Prueba que importar main no exige DATABASE_URL, no crea engines y no
+    importa los routers; la app se crea al pedir main.app
+    """
+    codigo = (
+        "import sys, main, database.config as config\n"
+        "assert config._motores is None\n"
+        "assert 'apis.auth' not in sys.modules\n"
+        "assert main.app.title\n"
+        "assert config._motores is None\n"
+    )
+    entorno = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    resultado = subprocess.run(
+        [sys.executable, "-c", codigo],
+        cwd=RAIZ,
+        env=entorno,
+        capture_output=True,
+        text=True,
+    )
+    assert resultado.returncode == 0, resultado.stderr
+
+
+def test_engine_sin_database_url(monkeypatch):
+    """Prueba que el error por falta de DATABASE_URL llega al primer uso"""
+    import database.config as config
+
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(config, "load_dotenv", lambda: None)
+    monkeypatch.setattr(config, "_motores", None)
+
+    with pytest.raises(ValueError, match="DATABASE_URL"):
+        config.motores()
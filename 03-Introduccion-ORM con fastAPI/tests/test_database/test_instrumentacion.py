@@ -0,0 +1,105 @@
+"""
+Pruebas para la instrumentación de sentencias SQL
+"""
+import logging
+import pytest
+from database.instrumentacion import (
+    desinstrumentar_engine,
+    instrumentar_engine,
+    registro_sql,
+)
+
+
+@pytest.fixture
+def engine_instrumentado(db_session):
+    """Instrumentar el engine de pruebas durante un test"""
+    engine = db_session.get_bind()
+    registro_sql.reiniciar()
+    instrumentar_engine(engine)
+    yield engine
+    desinstrumentar_engine(engine)
+    registro_sql.reiniciar()
+
+
+class TestInstrumentacionSQL:
+    """Pruebas para los listeners de medición y el log de consultas lentas"""
+
+    def test_registra_consultas_por_ruta(self, client, engine_instrumentado):
+        """Las consultas de una petición se agrupan por la plantilla de la ruta"""
+        # Act
+        client.get("/productos/")
+        client.get("/productos/00000000-0000-0000-0000-000000000000")
+        resumen = registro_sql.resumen()
+
+        # Assert
+        assert resumen["rutas"]["GET /productos/"]["consultas"] >= 1
+        assert resumen["rutas"]["GET /productos/{producto_id}"]["consultas"] >= 1
+        assert any("FROM productos" in s["sql"] for s in resumen["sentencias"])
+
+    def test_reiniciar_requiere_admin(
+        self, client, usuario_ejemplo, admin_ejemplo, engine_instrumentado
+    ):
+        """Solo un administrador puede borrar las estadísticas"""
+        # Arrange
+        client.get("/productos/")
+
+        def encabezado(nombre_usuario, contraseña):
+            clave = client.post("/auth/login", json={
+                "nombre_usuario": nombre_usuario, "contraseña": contraseña
+            }).json()["clave"]
+            return {"Authorization": f"Bearer {clave}"}
+
+        # Act
+        sin_token = client.delete("/monitoreo/sql")
+        usuario = client.delete(
+            "/monitoreo/sql", headers=encabezado("testuser", "Password123!")
+        )
+        rutas_antes = registro_sql.resumen()["rutas"]
+        admin = client.delete("/monitoreo/sql", headers=encabezado("admin", "Admin123!"))
+
+        # Assert
+        assert sin_token.status_code == 401
+        assert usuario.status_code == 403
+        assert "GET /productos/" in rutas_antes
+        assert admin.status_code == 200
+        assert registro_sql.resumen()["rutas"] == {}
+
+    def test_consulta_fuera_de_peticion(self, db_session, engine_instrumentado):
+        """Las consultas sin petición HTTP se registran como sin_ruta"""
+        # Act
+        from entities.producto import Producto
+
+        db_session.query(Producto).all()
+
+        # Assert
+        assert registro_sql.resumen()["rutas"]["sin_ruta"]["consultas"] == 1
+
+    def test_log_de_consultas_lentas(
+        self, db_session, engine_instrumentado, monkeypatch, caplog
+    ):
+        """Las sentencias que superan SQL_LENTO_MS se escriben en el log"""
+        # Arrange
+        from entities.producto import Producto
+
+        monkeypatch.setenv("SQL_LENTO_MS", "0")
+
+        # Act
+        with caplog.at_level(logging.WARNING, logger="sql.lento"):
+            db_session.query(Producto).all()
+
+        # Assert
+        assert "Consulta lenta" in caplog.text
+        assert registro_sql.resumen()["sentencias_lentas"] == 1
+
+    def test_desactivada_no_registra(self, db_session):
+        """Sin listeners no se acumula ninguna estadística"""
+        # Arrange
+        from entities.producto import Producto
+
+        registro_sql.reiniciar()
+
+        # Act
+        db_session.query(Producto).all()
+
+        # Assert
+        assert registro_sql.resumen()["rutas"] == {}
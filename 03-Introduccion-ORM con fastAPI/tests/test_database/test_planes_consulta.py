@@ -0,0 +1,177 @@
+"""
+Pruebas de regresión de planes de ejecución: cada consulta de los CRUD debe
+leer productos, categorias y tbl_usuarios por índice, nunca completas
+"""
+
+import pytest
+
+from crud.categoria_crud import CategoriaCRUD, cache_categorias
+from crud.producto_crud import ProductoCRUD
+from crud.usuario_crud import UsuarioCRUD
+from database.planes import (
+    RecorridoCompleto,
+    capturar_consultas,
+    recorridos_completos,
+    verificar_planes,
+)
+
+TABLAS = ("productos", "categorias", "tbl_usuarios")
+
+
+@pytest.fixture
+def datos(db_session, categoria_ejemplo, usuario_ejemplo, admin_ejemplo):
+    """Dos productos de ejemplo y los identificadores que usan las consultas"""
+    for nombre in ("Producto plan", "Otro producto"):
+        producto = ProductoCRUD(db_session).crear_producto(
+            nombre=nombre,
+            descripcion="Descripción",
+            precio=10.0,
+            stock=5,
+            categoria_id=categoria_ejemplo.id_categoria,
+            usuario_id=usuario_ejemplo.id,
+        )
+    _, cursor = ProductoCRUD(db_session).obtener_productos_pagina(limit=1)
+    assert cursor is not None
+    cache_categorias.invalidar()
+    return {
+        "producto": producto.id_producto,
+        "categoria": categoria_ejemplo.id_categoria,
+        "nombre_categoria": categoria_ejemplo.nombre,
+        "usuario": usuario_ejemplo.id,
+        "email": usuario_ejemplo.email,
+        "nombre_usuario": usuario_ejemplo.nombre_usuario,
+        "cursor": cursor,
+    }
+
+
+CONSULTAS = {
+    # Productos
+    "obtener_producto": lambda db, d: ProductoCRUD(db).obtener_producto(
+        d["producto"], expandir=("categoria", "usuario_crea", "usuario_edita")
+    ),
+    "productos_primera_pagina": lambda db, d: ProductoCRUD(db).obtener_productos_pagina(
+        limit=1
+    ),
+    "productos_pagina_siguiente": lambda db, d: ProductoCRUD(
+        db
+    ).obtener_productos_pagina(cursor=d["cursor"], limit=1),
+    "productos_por_categoria": lambda db, d: ProductoCRUD(
+        db
+    ).obtener_productos_por_categoria(d["categoria"]),
+    "productos_por_usuario": lambda db, d: ProductoCRUD(
+        db
+    ).obtener_productos_por_usuario(d["usuario"]),
+    "version_productos_categoria": lambda db, d: ProductoCRUD(db).version_productos(
+        categoria_id=d["categoria"]
+    ),
+    "version_productos_usuario": lambda db, d: ProductoCRUD(db).version_productos(
+        usuario_id=d["usuario"]
+    ),
+    "buscar_productos": lambda db, d: ProductoCRUD(db).buscar_productos_por_nombre(
+        "plan"
+    ),
+    "actualizar_producto_admin_por_defecto": lambda db, d: ProductoCRUD(
+        db
+    ).actualizar_producto(d["producto"], precio=11.0),
+    "ajustar_stock": lambda db, d: ProductoCRUD(db).ajustar_stock(d["producto"], -1),
+    "reservar_stock": lambda db, d: ProductoCRUD(db).reservar_stock(
+        [(d["producto"], 1)]
+    ),
+    # Categorías
+    "obtener_categoria": lambda db, d: CategoriaCRUD(db).obtener_categoria(
+        d["categoria"]
+    ),
+    "categoria_por_nombre": lambda db, d: CategoriaCRUD(
+        db
+    ).obtener_categoria_por_nombre(d["nombre_categoria"]),
+    "categorias_pagina": lambda db, d: CategoriaCRUD(db).obtener_categorias_pagina(
+        limit=1
+    ),
+    "resumen_categorias": lambda db, d: CategoriaCRUD(db).obtener_resumen_categorias(
+        limit=10
+    ),
+    # Usuarios
+    "obtener_usuario": lambda db, d: UsuarioCRUD(db).obtener_usuario(d["usuario"]),
+    "usuario_por_email": lambda db, d: UsuarioCRUD(db).obtener_usuario_por_email(
+        d["email"]
+    ),
+    "usuario_por_nombre_usuario": lambda db, d: UsuarioCRUD(
+        db
+    ).obtener_usuario_por_nombre_usuario(d["nombre_usuario"]),
+    "usuarios_pagina": lambda db, d: UsuarioCRUD(db).obtener_usuarios_pagina(limit=1),
+    "usuarios_admin": lambda db, d: UsuarioCRUD(db).obtener_usuarios_admin(),
+}
+
+
+@pytest.mark.parametrize("nombre", CONSULTAS)
+def test_consulta_usa_indices(db_session, datos, nombre):
+    """Prueba que la consulta no recorre completa ninguna tabla del modelo"""
+    engine = db_session.get_bind()
+    with capturar_consultas(engine) as consultas:
+        CONSULTAS[nombre](db_session, datos)
+
+    assert consultas, "la operación no emitió ninguna consulta"
+    verificar_planes(db_session.connection(), consultas, TABLAS)
+
+
+def test_detecta_recorrido_completo(db_session, datos):
+    """Prueba que un filtro sobre una columna sin índice se reporta"""
+    from entities.producto import Producto
+
+    with capturar_consultas(db_session.get_bind()) as consultas:
+        db_session.query(Producto).filter(Producto.descripcion == "x").all()
+
+    with pytest.raises(RecorridoCompleto, match="recorrido completo de productos"):
+        verificar_planes(db_session.connection(), consultas, TABLAS)
+
+
+@pytest.mark.parametrize(
+    "dialecto, plan, esperado",
+    [
+        ("sqlite", ["SCAN productos"], ["productos"]),
+        ("sqlite", ["SCAN TABLE productos AS p"], ["productos"]),
+        ("sqlite", ["SCAN categorias_1"], ["categorias"]),
+        ("sqlite", ["SCAN productos USING INDEX ix_productos_fecha"], []),
+        ("sqlite", ["SEARCH productos USING INDEX ix (categoria_id=?)"], []),
+        ("sqlite", ["SCAN pagina"], []),
+        (
+            "postgresql",
+            ["  ->  Seq Scan on productos  (cost=0.00..1.01)"],
+            ["productos"],
+        ),
+        ("postgresql", ["Index Scan using ix on productos  (cost=0.15..8.17)"], []),
+    ],
+)
+def test_recorridos_completos(dialecto, plan, esperado):
+    """Prueba la lectura de los planes de SQLite y PostgreSQL"""
+    assert recorridos_completos(dialecto, plan, TABLAS) == esperado
+
+
+def test_migracion_crea_los_indices_del_modelo():
+    """Prueba que la migración de índices y los __table_args__ coinciden"""
+    import importlib.util
+    from pathlib import Path
+
+    from database.config import Base
+
+    ruta = (
+        Path(__file__).parents[2]
+        / "migrations"
+        / "versions"
+        / "b7e2d9c4f610_add_foreign_key_and_filter_indexes.py"
+    )
+    especificacion = importlib.util.spec_from_file_location("migracion", ruta)
+    migracion = importlib.util.module_from_spec(especificacion)
+    especificacion.loader.exec_module(migracion)
+
+    del_modelo = {
+        (indice.name, tabla.name, tuple(columna.name for columna in indice.columns))
+        for tabla in Base.metadata.tables.values()
+        for indice in tabla.indexes
+        if indice.name in {nombre for nombre, *_ in migracion.INDICES}
+    }
+    de_migracion = {
+        (nombre, tabla, tuple(columnas))
+        for nombre, tabla, columnas, _ in migracion.INDICES
+    }
+    assert del_modelo == de_migracion
@@ -0,0 +1,197 @@
+"""
+Pruebas para la configuración y medición del pool de conexiones
+"""
+import pytest
+from sqlalchemy import create_engine, exc, text
+from database.pool import (
+    CONEXIONES_ESCUCHA,
+    QueuePoolMedido,
+    calcular_config_pool,
+    estadisticas_pool,
+)
+
+VARIABLES_POOL = [
+    "WEB_CONCURRENCY",
+    "DB_MAX_CONEXIONES",
+    "DB_POOL_SIZE",
+    "DB_MAX_OVERFLOW",
+    "DB_POOL_TIMEOUT",
+    "DB_POOL_RECYCLE",
+]
+
+
+@pytest.fixture
+def entorno_limpio(monkeypatch):
+    """Eliminar las variables de entorno del pool"""
+    for variable in VARIABLES_POOL:
+        monkeypatch.delenv(variable, raising=False)
+    return monkeypatch
+
+
+class TestConfiguracionPool:
+    """Pruebas para calcular_config_pool"""
+
+    def test_valores_por_defecto(self, entorno_limpio):
+        """Sin variables se usan los valores por defecto de SQLAlchemy"""
+        # Act
+        config = calcular_config_pool()
+
+        # Assert
+        assert config["pool_size"] == 5
+        assert config["max_overflow"] == 10
+        assert config["pool_timeout"] == 30
+        assert config["pool_recycle"] == 300
+        assert config["presupuesto_worker"] == 0
+
+    def test_presupuesto_repartido_entre_workers(self, entorno_limpio):
+        """El presupuesto total se divide entre los workers de gunicorn"""
+        # Arrange
+        entorno_limpio.setenv("DB_MAX_CONEXIONES", "48")
+        entorno_limpio.setenv("WEB_CONCURRENCY", "4")
+
+        # Act
+        config = calcular_config_pool()
+
+        # Assert
+        assert config["presupuesto_worker"] == 12
+        assert config["pool_size"] == 6
+        assert config["max_overflow"] == 4
+        assert config["sincrono"] == {"pool_size": 1, "max_overflow": 0}
+
+    def test_motores_y_escucha_dentro_del_presupuesto(self, entorno_limpio):
+        """Motor asíncrono, síncrono y LISTEN de cada worker caben en el presupuesto"""
+        # Arrange
+        entorno_limpio.setenv("DB_MAX_CONEXIONES", "20")
+        entorno_limpio.setenv("WEB_CONCURRENCY", "4")
+
+        # Act
+        config = calcular_config_pool()
+
+        # Assert
+        por_worker = (
+            config["pool_size"]
+            + config["max_overflow"]
+            + config["sincrono"]["pool_size"]
+            + config["sincrono"]["max_overflow"]
+            + CONEXIONES_ESCUCHA
+        )
+        assert por_worker <= config["presupuesto_worker"]
+        assert por_worker * config["workers"] <= 20
+
+    def test_presupuesto_insuficiente_falla(self, entorno_limpio):
+        """Una porción que no cubre las conexiones reservadas produce un error claro"""
+        # Arrange
+        entorno_limpio.setenv("DB_MAX_CONEXIONES", "8")
+        entorno_limpio.setenv("WEB_CONCURRENCY", "4")
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="no alcanza"):
+            calcular_config_pool()
+
+    def test_valores_explicitos(self, entorno_limpio):
+        """Las variables explícitas tienen prioridad"""
+        # Arrange
+        entorno_limpio.setenv("DB_POOL_SIZE", "3")
+        entorno_limpio.setenv("DB_MAX_OVERFLOW", "0")
+        entorno_limpio.setenv("DB_POOL_TIMEOUT", "5")
+        entorno_limpio.setenv("DB_POOL_RECYCLE", "120")
+
+        # Act
+        config = calcular_config_pool()
+
+        # Assert
+        assert config["pool_size"] == 3
+        assert config["max_overflow"] == 0
+        assert config["pool_timeout"] == 5
+        assert config["pool_recycle"] == 120
+
+    def test_exceder_presupuesto_falla(self, entorno_limpio):
+        """No se permite un pool mayor que la porción del worker"""
+        # Arrange
+        entorno_limpio.setenv("DB_MAX_CONEXIONES", "20")
+        entorno_limpio.setenv("WEB_CONCURRENCY", "4")
+        entorno_limpio.setenv("DB_POOL_SIZE", "10")
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="presupuesto"):
+            calcular_config_pool()
+
+    def test_valor_no_entero_falla(self, entorno_limpio):
+        """Una variable no numérica produce un error claro"""
+        # Arrange
+        entorno_limpio.setenv("DB_POOL_SIZE", "muchos")
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="DB_POOL_SIZE"):
+            calcular_config_pool()
+
+
+class TestPoolMedido:
+    """Pruebas para QueuePoolMedido"""
+
+    def test_registra_checkouts_y_timeouts(self, tmp_path):
+        """El pool cuenta las conexiones entregadas y los timeouts"""
+        # Arrange
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=QueuePoolMedido,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+
+        # Act
+        with engine.connect() as conexion:
+            conexion.execute(text("SELECT 1"))
+            en_uso = estadisticas_pool(engine.pool)["en_uso"]
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        datos = estadisticas_pool(engine.pool)
+        engine.dispose()
+
+        # Assert
+        assert en_uso == 1
+        assert datos["en_uso"] == 0
+        assert datos["checkouts"] == 1
+        assert datos["timeouts"] == 1
+        assert datos["espera_max_ms"] >= 50
+
+    def test_estadisticas_sobreviven_dispose(self, tmp_path):
+        """Los contadores se conservan cuando el engine recrea el pool"""
+        # Arrange
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePoolMedido
+        )
+        with engine.connect():
+            pass
+
+        # Act
+        engine.dispose()
+
+        # Assert
+        assert estadisticas_pool(engine.pool)["checkouts"] == 1
+
+
+class TestPoolMotores:
+    """Pruebas del reparto del presupuesto entre los motores de un worker"""
+
+    def test_motores_respetan_el_presupuesto(self, entorno_limpio):
+        """Los pools creados por database.config más LISTEN no exceden la porción"""
+        # Arrange
+        from database import config
+
+        entorno_limpio.setenv("DATABASE_URL", "postgresql://u:p@localhost:5432/db")
+        entorno_limpio.delenv("DATABASE_REPLICA_URL", raising=False)
+        entorno_limpio.setattr(config, "load_dotenv", lambda: None)
+        entorno_limpio.setenv("DB_MAX_CONEXIONES", "24")
+        entorno_limpio.setenv("WEB_CONCURRENCY", "3")
+
+        # Act
+        motores = config._crear_motores()
+        pools = (motores.engine.pool, motores.async_engine.sync_engine.pool)
+        conexiones = sum(pool.size() + pool._max_overflow for pool in pools)
+        for pool in pools:
+            pool.dispose()
+
+        # Assert
+        assert conexiones + CONEXIONES_ESCUCHA <= 8
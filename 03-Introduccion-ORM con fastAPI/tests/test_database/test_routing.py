@@ -0,0 +1,110 @@
+"""
+Pruebas para el enrutamiento de lecturas a la réplica
+"""
+import uuid
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from crud.categoria_crud import CategoriaCRUD
+from database.config import Base
+from database.routing import SesionEnrutada, marcar_ambito_peticion
+from entities.categoria import Categoria
+
+
+def _crear_bd(ruta, nombre_categoria):
+    """Crear una base de datos SQLite con una categoría que la identifica"""
+    engine = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as sesion:
+        sesion.add(Categoria(nombre=nombre_categoria, id_usuario_crea=uuid.uuid4()))
+        sesion.commit()
+    return engine
+
+
+@pytest.fixture
+def motores(tmp_path):
+    """Motores primario y réplica con datos distintos"""
+    primario = _crear_bd(tmp_path / "primario.db", "En primario")
+    replica = _crear_bd(tmp_path / "replica.db", "En replica")
+    yield primario, replica
+    primario.dispose()
+    replica.dispose()
+
+
+def _nombres(categorias):
+    return [categoria.nombre for categoria in categorias]
+
+
+class TestSesionEnrutada:
+    """Pruebas para SesionEnrutada y los decoradores de ámbito"""
+
+    def test_metodo_solo_lectura_usa_replica(self, motores):
+        """Los métodos @solo_lectura consultan la réplica"""
+        # Arrange
+        primario, replica = motores
+        sesion = SesionEnrutada(bind=primario, replica=replica)
+
+        # Act
+        categorias = CategoriaCRUD(sesion).obtener_categorias()
+
+        # Assert
+        assert _nombres(categorias) == ["En replica"]
+        sesion.close()
+
+    def test_sin_replica_usa_primario(self, motores):
+        """Sin réplica configurada todo va al primario"""
+        # Arrange
+        primario, _ = motores
+        sesion = SesionEnrutada(bind=primario)
+
+        # Act
+        categorias = CategoriaCRUD(sesion).obtener_categorias()
+
+        # Assert
+        assert _nombres(categorias) == ["En primario"]
+        sesion.close()
+
+    def test_peticion_de_escritura_usa_primario(self, motores):
+        """Las lecturas de una petición POST/PUT/DELETE van al primario"""
+        # Arrange
+        primario, replica = motores
+        sesion = SesionEnrutada(bind=primario, replica=replica)
+        marcar_ambito_peticion(sesion, "PUT")
+
+        # Act
+        categorias = CategoriaCRUD(sesion).obtener_categorias()
+
+        # Assert
+        assert _nombres(categorias) == ["En primario"]
+        sesion.close()
+
+    def test_peticion_get_usa_replica(self, motores):
+        """Las consultas directas de una petición GET van a la réplica"""
+        # Arrange
+        primario, replica = motores
+        sesion = SesionEnrutada(bind=primario, replica=replica)
+        marcar_ambito_peticion(sesion, "GET")
+
+        # Act
+        categorias = sesion.query(Categoria).all()
+
+        # Assert
+        assert _nombres(categorias) == ["En replica"]
+        sesion.close()
+
+    def test_lectura_despues_de_escritura_usa_primario(self, motores):
+        """Tras escribir, las lecturas de la sesión van al primario"""
+        # Arrange
+        primario, replica = motores
+        sesion = SesionEnrutada(bind=primario, replica=replica)
+        categoria_crud = CategoriaCRUD(sesion)
+
+        # Act
+        categoria_crud.crear_categoria(
+            nombre="Nueva", descripcion="Recién creada", id_usuario_crea=uuid.uuid4()
+        )
+        categorias = categoria_crud.obtener_categorias()
+
+        # Assert
+        assert sorted(_nombres(categorias)) == ["En primario", "Nueva"]
+        sesion.close()
@@ -0,0 +1,124 @@
+"""
+Pruebas de los esquemas de hash versionados y de la calibración
+"""
+import hashlib
+
+import pytest
+
+from auth.esquemas_hash import (
+    EsquemaHash,
+    EsquemaPBKDF2,
+    EsquemaScrypt,
+    calibrar_pbkdf2,
+    calibrar_scrypt,
+    descomponer_hash,
+    esquema_configurado,
+    necesita_rehash,
+    variables_entorno,
+    verificar_hash,
+)
+from auth.security import PasswordManager
+
+
+def hash_legado(password: str, salt: str = "a" * 64) -> str:
+    """Hash en el formato original salt:hash"""
+    derivado = hashlib.pbkdf2_hmac(
+        "sha256", password.encode("utf-8"), salt.encode("utf-8"), 100000
+    )
+    return f"{salt}:{derivado.hex()}"
+
+
+class TestEsquemasHash:
+    """Pruebas de formato, verificación y detección de hashes antiguos"""
+
+    @pytest.mark.parametrize(
+        "esquema, prefijo",
+        [
+            (EsquemaPBKDF2(2000), "pbkdf2_sha256:2000:"),
+            (EsquemaScrypt(2**10, 8, 1), "scrypt:1024:8:1:"),
+        ],
+    )
+    def test_hash_versionado(self, esquema, prefijo):
+        """Prueba que el hash guarda el esquema y sus parámetros"""
+        password_hash = esquema.hashear("MiPassword123!")
+
+        assert password_hash.startswith(prefijo)
+        assert verificar_hash("MiPassword123!", password_hash)
+        assert not verificar_hash("Otra123!", password_hash)
+
+    def test_verificar_formato_original(self):
+        """Prueba que los hashes salt:hash existentes siguen siendo válidos"""
+        password_hash = hash_legado("MiPassword123!")
+
+        assert PasswordManager.verify_password("MiPassword123!", password_hash)
+        assert not PasswordManager.verify_password("Otra123!", password_hash)
+        assert PasswordManager.needs_rehash(password_hash)
+
+    @pytest.mark.parametrize(
+        "password_hash",
+        ["", "sin_formato", "md5:1:a:b", "pbkdf2_sha256:x:a:b", "scrypt:1024:a:b"],
+    )
+    def test_hash_no_reconocible(self, password_hash):
+        """Prueba que un hash con formato desconocido no verifica"""
+        assert descomponer_hash(password_hash) is None
+        assert not verificar_hash("MiPassword123!", password_hash)
+
+    def test_necesita_rehash_por_costes(self):
+        """Prueba que cambiar las iteraciones o el algoritmo pide rehash"""
+        password_hash = EsquemaPBKDF2(2000).hashear("MiPassword123!")
+
+        assert not necesita_rehash(password_hash, EsquemaPBKDF2(2000))
+        assert necesita_rehash(password_hash, EsquemaPBKDF2(3000))
+        assert necesita_rehash(password_hash, EsquemaScrypt(2**10))
+
+    def test_esquema_desde_entorno(self, monkeypatch):
+        """Prueba la selección del esquema con variables de entorno"""
+        monkeypatch.setenv("HASH_ESQUEMA", "scrypt")
+        monkeypatch.setenv("HASH_SCRYPT_N", "1024")
+        esquema = esquema_configurado()
+        assert esquema.parametros() == (1024, 8, 1)
+        assert PasswordManager.hash_password("MiPassword123!").startswith("scrypt:1024:")
+
+        monkeypatch.setenv("HASH_SCRYPT_N", "1000")
+        with pytest.raises(ValueError, match="potencia de 2"):
+            esquema_configurado()
+
+        monkeypatch.setenv("HASH_ESQUEMA", "md5")
+        with pytest.raises(ValueError, match="HASH_ESQUEMA"):
+            esquema_configurado()
+
+    def test_esquema_incompleto_no_se_instancia(self):
+        """Prueba que un esquema sin derivar falla al crearse, no al hashear"""
+
+        class EsquemaIncompleto(EsquemaHash):
+            nombre = "incompleto"
+
+            def parametros(self):
+                return (1,)
+
+        with pytest.raises(TypeError, match="derivar"):
+            EsquemaIncompleto()
+
+
+class TestCalibracion:
+    """Pruebas de la calibración de costes"""
+
+    def test_calibrar_pbkdf2(self):
+        """Prueba que un objetivo mayor produce más iteraciones"""
+        rapido = calibrar_pbkdf2(2, repeticiones=1)
+        lento = calibrar_pbkdf2(20, repeticiones=1)
+
+        assert rapido.iteraciones >= 1000
+        assert lento.iteraciones > rapido.iteraciones
+        assert variables_entorno(lento) == {
+            "HASH_ESQUEMA": "pbkdf2_sha256",
+            "HASH_PBKDF2_ITERACIONES": str(lento.iteraciones),
+        }
+
+    def test_calibrar_scrypt_respeta_memoria(self):
+        """Prueba que n no supera el límite de memoria"""
+        esquema = calibrar_scrypt(10_000, max_memoria_mb=8, repeticiones=1)
+
+        assert esquema.n == 2**13
+        assert 128 * esquema.n * esquema.r <= 8 * 1024 * 1024
+        assert variables_entorno(esquema)["HASH_SCRYPT_N"] == str(esquema.n)
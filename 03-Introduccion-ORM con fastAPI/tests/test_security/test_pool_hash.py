@@ -0,0 +1,120 @@
+"""
+Pruebas del pool de hash de contraseñas
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from auth.pool_hash import PoolHash, workers_hash
+from auth.security import PasswordManager
+
+
+@pytest.fixture
+def pool():
+    """Pool de un solo hilo, cerrado al terminar"""
+    pool = PoolHash(workers=1)
+    yield pool
+    pool.cerrar()
+
+
+class TestPoolHash:
+    """Pruebas de PoolHash y de la API asíncrona de PasswordManager"""
+
+    @pytest.mark.asyncio
+    async def test_hash_y_verificacion_asincronos(self):
+        """Prueba que el hash asíncrono es compatible con la verificación"""
+        password_hash = await PasswordManager.hash_password_async("MiPassword123!")
+
+        assert await PasswordManager.verify_password_async("MiPassword123!", password_hash)
+        assert not await PasswordManager.verify_password_async("Otra123!", password_hash)
+        assert PasswordManager.verify_password("MiPassword123!", password_hash)
+
+    @pytest.mark.asyncio
+    async def test_se_ejecuta_en_hilo_del_pool(self, pool):
+        """Prueba que la función no se ejecuta en el hilo del event loop"""
+        nombre = await pool.ejecutar(lambda: threading.current_thread().name)
+
+        assert nombre.startswith("hash")
+
+    @pytest.mark.asyncio
+    async def test_no_bloquea_el_event_loop(self, pool):
+        """Prueba que otras corrutinas avanzan mientras se calcula un hash"""
+        ticks = 0
+
+        async def contar():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        contador = asyncio.create_task(contar())
+        await pool.ejecutar(time.sleep, 0.2)
+        contador.cancel()
+
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_metricas_de_cola_y_latencia(self, pool):
+        """Prueba que se registran la profundidad de la cola y las latencias"""
+        # La primera tarea ocupa el único hilo hasta que las demás están en cola
+        bloqueo = threading.Event()
+        tareas = [asyncio.ensure_future(pool.ejecutar(bloqueo.wait, 5))]
+        tareas += [
+            asyncio.ensure_future(pool.ejecutar(time.sleep, 0.02)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        bloqueo.set()
+        await asyncio.gather(*tareas)
+
+        resumen = pool.resumen()
+        assert resumen["workers"] == 1
+        assert resumen["completadas"] == 4
+        assert resumen["en_cola"] == 0
+        assert resumen["en_cola_max"] >= 3
+        assert resumen["calculo"]["max_ms"] >= 20
+        assert resumen["espera"]["max_ms"] >= 40
+
+    @pytest.mark.asyncio
+    async def test_cancelar_en_cola(self, pool):
+        """Prueba que una llamada cancelada antes de tener hilo sale de la cola"""
+        bloqueo = threading.Event()
+        ocupada = asyncio.ensure_future(pool.ejecutar(bloqueo.wait, 5))
+        en_cola = asyncio.ensure_future(pool.ejecutar(time.sleep, 0))
+        await asyncio.sleep(0)
+        assert pool.resumen()["en_cola"] == 1
+
+        en_cola.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await en_cola
+        bloqueo.set()
+        await ocupada
+
+        resumen = pool.resumen()
+        assert resumen["en_cola"] == 0
+        assert resumen["en_curso"] == 0
+        assert resumen["completadas"] == 1
+
+    def test_workers_desde_entorno(self, monkeypatch):
+        """Prueba la lectura y validación de HASH_WORKERS"""
+        monkeypatch.setenv("HASH_WORKERS", "3")
+        assert workers_hash() == 3
+
+        monkeypatch.setenv("HASH_WORKERS", "0")
+        with pytest.raises(ValueError):
+            workers_hash()
+
+    def test_estado_en_monitoreo(self, client, usuario_ejemplo):
+        """Prueba que el login pasa por el pool y se ve en /monitoreo/hash"""
+        from auth.pool_hash import pool_hash
+
+        pool_hash.reiniciar()
+        client.post("/auth/login", json={
+            "nombre_usuario": "testuser",
+            "contraseña": "Password123!"
+        })
+
+        datos = client.get("/monitoreo/hash").json()["datos"]
+        assert datos["completadas"] == 1
+        assert datos["calculo"]["max_ms"] > 0
@@ -0,0 +1,106 @@
+"""
+Pruebas de los tokens de sesión firmados
+"""
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from auth.tokens import (
+    TIPO_ACCESO,
+    TIPO_REFRESCO,
+    FirmadorTokens,
+    TokenInvalido,
+)
+
+
+@pytest.fixture
+def firmador():
+    return FirmadorTokens(b"secreto-de-prueba", acceso_segundos=60, refresco_segundos=3600)
+
+
+@pytest.fixture
+def usuario():
+    return SimpleNamespace(
+        id=uuid4(), nombre_usuario="testuser", es_admin=True, contraseña_hash="sal:hash"
+    )
+
+
+class TestFirmadorTokens:
+    """Pruebas de emisión y verificación de tokens"""
+
+    def test_verificar_acceso(self, firmador, usuario):
+        """Prueba que un token de acceso recién emitido es válido"""
+        sesion = firmador.verificar_acceso(firmador.emitir_acceso(usuario))
+
+        assert sesion.usuario_id == usuario.id
+        assert sesion.nombre_usuario == "testuser"
+        assert sesion.es_admin is True
+
+    def test_token_expirado(self, firmador, usuario):
+        """Prueba que un token fuera de su vigencia se rechaza"""
+        token = firmador.emitir_acceso(usuario, ahora=1000)
+
+        assert firmador.verificar(token, TIPO_ACCESO, ahora=1059)
+        with pytest.raises(TokenInvalido, match="expiró"):
+            firmador.verificar(token, TIPO_ACCESO, ahora=1060)
+
+    def test_token_alterado(self, firmador, usuario):
+        """Prueba que modificar los datos invalida la firma"""
+        cuerpo, firma = firmador.emitir_acceso(usuario).split(".")
+        otro_cuerpo, _ = firmador.emitir_acceso(
+            SimpleNamespace(**{**vars(usuario), "id": uuid4()})
+        ).split(".")
+
+        with pytest.raises(TokenInvalido, match="firma"):
+            firmador.verificar(f"{otro_cuerpo}.{firma}", TIPO_ACCESO)
+
+    def test_otro_secreto(self, firmador, usuario):
+        """Prueba que un token firmado con otro secreto se rechaza"""
+        token = FirmadorTokens(b"otro-secreto").emitir_acceso(usuario)
+
+        with pytest.raises(TokenInvalido):
+            firmador.verificar(token, TIPO_ACCESO)
+
+    def test_tipo_incorrecto(self, firmador, usuario):
+        """Prueba que un token de refresco no sirve como acceso y viceversa"""
+        with pytest.raises(TokenInvalido, match="tipo"):
+            firmador.verificar_acceso(firmador.emitir_refresco(usuario))
+        with pytest.raises(TokenInvalido, match="tipo"):
+            firmador.verificar(firmador.emitir_acceso(usuario), TIPO_REFRESCO)
+
+    @pytest.mark.parametrize("token", ["", "abc", "a.b.c", "no!base64.x", "e30.e30"])
+    def test_token_mal_formado(self, firmador, token):
+        """Prueba que los tokens mal formados lanzan TokenInvalido"""
+        with pytest.raises(TokenInvalido):
+            firmador.verificar(token, TIPO_ACCESO)
+
+    def test_huella_cambia_con_la_contraseña(self, firmador):
+        """Prueba que la huella del refresco depende del hash de la contraseña"""
+        assert firmador.huella_contraseña("a:1") == firmador.huella_contraseña("a:1")
+        assert firmador.huella_contraseña("a:1") != firmador.huella_contraseña("a:2")
+
+    def test_desde_entorno(self, monkeypatch):
+        """Prueba la configuración desde variables de entorno"""
+        monkeypatch.setenv("TOKEN_SECRETO", "desde-entorno")
+        monkeypatch.setenv("TOKEN_ACCESO_MINUTOS", "5")
+        monkeypatch.setenv("TOKEN_REFRESCO_DIAS", "2")
+        firmador = FirmadorTokens.desde_entorno()
+
+        assert firmador.acceso_segundos == 300
+        assert firmador.refresco_segundos == 2 * 86400
+
+        monkeypatch.setenv("TOKEN_ACCESO_MINUTOS", "0")
+        with pytest.raises(ValueError):
+            FirmadorTokens.desde_entorno()
+
+    def test_sin_secreto_falla(self, monkeypatch):
+        """Prueba que sin TOKEN_SECRETO solo se arranca si se pide un secreto temporal"""
+        monkeypatch.delenv("TOKEN_SECRETO", raising=False)
+        monkeypatch.delenv("TOKEN_SECRETO_TEMPORAL", raising=False)
+        with pytest.raises(ValueError, match="TOKEN_SECRETO"):
+            FirmadorTokens.desde_entorno()
+
+        monkeypatch.setenv("TOKEN_SECRETO_TEMPORAL", "1")
+        firmador = FirmadorTokens.desde_entorno()
+        assert firmador is not FirmadorTokens.desde_entorno()